@@ -3,34 +3,113 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from config import Config
+from app.replica import RoutingSession
+from sqlalchemy import UniqueConstraint, inspect
+import click
 import os
 
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
-login_manager.login_view = 'login'
+login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
 
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
-    
-    UPLOAD_FOLDER = os.path.join(app.root_path, 'static', 'company_logos')
+    app.config.from_object(config_class)
 
-
-    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
+    # The folder itself is created on first logo upload, not at boot
+    app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'company_logos')
 
     db.init_app(app)
     bcrypt.init_app(app)
     login_manager.init_app(app)
 
-    with app.app_context():
-        from app import routes
-        db.create_all()
+    from app.tenancy import init_tenancy
+    from app.cache import init_cache
+    from app.compress import init_compression
+    from app.search import init_search
+    from app.archive import init_archive
+    from app.replica import init_replica
+    from app.events import init_events
+    from app.hierarchy import init_hierarchy
+    from app.portfolio import init_portfolio
+    from app.audit import init_audit
+    init_tenancy(app)
+    init_cache(app)
+    init_compression(app)
+    init_search(app)
+    init_archive(app)
+    init_replica(app)
+    init_events(app)
+    init_hierarchy(app)
+    init_portfolio(app)
+    init_audit(app)
+
+    from app.views import register_blueprints
+    register_blueprints(app)
+
+    app.cli.add_command(init_db_command)
 
     return app
+
+
+@click.command('init-db')
+def init_db_command():
+    """Create any missing database tables and indexes."""
+    from app import models  # noqa: F401 - registers the tables on db.metadata
+    db.create_all()
+    # create_all() skips new nullable columns and indexes on tables that
+    # already exist
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                with db.engine.begin() as conn:
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} '
+                                         f'{column.type.compile(db.engine.dialect)}')
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+        _migrate_unique_constraints(inspector, table)
+
+    from app.tenancy import ensure_default_company
+    from app.search import ensure_search_index
+    from app.archive import refresh_attendance_view
+    from app.hierarchy import rebuild_hierarchy
+    from app.models import ReportingLine
+    # Before the search index, whose documents carry company_id
+    ensure_default_company()
+    ensure_search_index(db.engine)
+    if not db.session.query(ReportingLine.depth).first():
+        try:
+            rebuild_hierarchy(db.engine)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    with db.engine.begin() as conn:
+        refresh_attendance_view(conn)
+    click.echo('Database tables created.')
+
+
+def _migrate_unique_constraints(inspector, table):
+    # Named unique constraints missing from an existing table are added as
+    # unique indexes. Global ones they replace (e.g. employee email, now
+    # unique per company) are dropped where the database can do that in
+    # place; SQLite keeps them until the table is rebuilt.
+    reflected = inspector.get_unique_constraints(table.name)
+    present = ({c['name'] for c in reflected}
+               | {index['name'] for index in inspector.get_indexes(table.name)})
+    declared = [c for c in table.constraints if isinstance(c, UniqueConstraint)]
+    declared_columns = {tuple(c.columns.keys()) for c in declared}
+    with db.engine.begin() as conn:
+        for constraint in declared:
+            if constraint.name and constraint.name not in present:
+                conn.exec_driver_sql(f'CREATE UNIQUE INDEX {constraint.name} ON {table.name} '
+                                     f'({", ".join(constraint.columns.keys())})')
+        if db.engine.dialect.name == 'sqlite':
+            return
+        for constraint in reflected:
+            if tuple(constraint['column_names']) not in declared_columns:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} DROP CONSTRAINT {constraint["name"]}')
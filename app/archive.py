@@ -0,0 +1,368 @@
+"""Attendance archival: keep the hot ``attendance`` table small.
+
+Closed sessions older than ``ATTENDANCE_ARCHIVE_DAYS`` are moved out of
+``attendance`` into one of two per-month stores:
+
+* ``table``   - ``attendance_archive_YYYY_MM`` tables in the same database,
+                each indexed on (company_id, employee_id, check_in). The
+                ``attendance_all`` view unions them with the hot table, so
+                reports and the attendance history page see every punch.
+* ``parquet`` - zstd-compressed Parquet files under ``ATTENDANCE_ARCHIVE_DIR``
+                (needs the optional ``pyarrow`` package), for cold storage and
+                offline analytics. ``read_parquet_archive()`` scans them with
+                month pruning. These months are export-only: they leave
+                ``attendance_all``, so history pages and reports no longer
+                show them.
+
+Archived rows keep their ``company_id``, and ``attendance_history()`` only
+reads the current company's rows from the view.
+
+Every batch moved is recorded in ``AttendanceArchive`` with its row count and
+id checksum so ``flask archive-verify`` can prove nothing was lost.
+
+    flask archive-attendance --days 90 --format table
+    flask archive-verify
+"""
+from datetime import datetime, timedelta
+import os
+
+import click
+from flask import current_app
+from sqlalchemy import (Column, DateTime, Index, Integer, MetaData, Table, and_,
+                        delete, func, insert, inspect, select)
+
+from app import db
+from app.models import Attendance, AttendanceArchive
+from app.tenancy import current_tenant_id
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pyarrow = None
+
+VIEW_NAME = 'attendance_all'
+TABLE_PREFIX = 'attendance_archive_'
+# Copied from the hot table, in this order, and exposed by the view
+COLUMNS = ('id', 'check_in', 'check_out', 'employee_id', 'company_id')
+
+# Archive tables and the union view live outside db.metadata so create_all()
+# and drop_all() never touch them.
+archive_metadata = MetaData()
+
+attendance_all = Table(
+    VIEW_NAME, archive_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('check_in', DateTime),
+    Column('check_out', DateTime),
+    Column('employee_id', Integer),
+    Column('company_id', Integer),
+)
+
+_view_ready = {}
+
+
+def archive_table(month):
+    """The Table for a 'YYYY-MM' month, defined on first use."""
+    name = TABLE_PREFIX + month.replace('-', '_')
+    if name in archive_metadata.tables:
+        return archive_metadata.tables[name]
+    return Table(
+        name, archive_metadata,
+        Column('id', Integer, primary_key=True),
+        Column('check_in', DateTime, nullable=False),
+        Column('check_out', DateTime),
+        Column('employee_id', Integer, nullable=False),
+        Column('company_id', Integer),
+        Index(f'ix_{name}_company_employee_check_in', 'company_id', 'employee_id', 'check_in'),
+    )
+
+
+def _add_company_column(connection, name):
+    # Archive tables written before tenancy: add the column and fill it in
+    # from each row's employee
+    if 'company_id' in {c['name'] for c in inspect(connection).get_columns(name)}:
+        return
+    connection.exec_driver_sql(f'ALTER TABLE {name} ADD COLUMN company_id INTEGER')
+    connection.exec_driver_sql(
+        f'UPDATE {name} SET company_id = '
+        f'(SELECT company_id FROM employee WHERE employee.id = {name}.employee_id)')
+
+
+def month_bounds(month):
+    start = datetime.strptime(month, '%Y-%m')
+    end = datetime(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    return start, end
+
+
+def _archived_months(storage=None):
+    query = db.session.query(AttendanceArchive.month).distinct()
+    if storage:
+        query = query.filter(AttendanceArchive.storage == storage)
+    return sorted(m for (m,) in query)
+
+
+# --- 1. THE UNION VIEW ---
+
+
+def refresh_attendance_view(connection):
+    """(Re)create attendance_all over the hot table and every archive table."""
+    existing = set(inspect(connection).get_table_names())
+    columns = ', '.join(COLUMNS)
+    parts = [f'SELECT {columns} FROM attendance']
+    for name in sorted(existing):
+        if name.startswith(TABLE_PREFIX):
+            _add_company_column(connection, name)
+            parts.append(f'SELECT {columns} FROM {name}')
+    connection.exec_driver_sql(f'DROP VIEW IF EXISTS {VIEW_NAME}')
+    connection.exec_driver_sql(f'CREATE VIEW {VIEW_NAME} AS ' + ' UNION ALL '.join(parts))
+    _view_ready.pop(connection.engine.url, None)
+
+
+def view_ready(connection):
+    url = connection.engine.url
+    if url not in _view_ready:
+        _view_ready[url] = VIEW_NAME in inspect(connection).get_view_names()
+    return _view_ready[url]
+
+
+def attendance_history(employee_id=None):
+    """Query over every punch, hot and archived, for reports and history pages.
+
+    Months archived to Parquet are not included; read_parquet_archive()
+    reads those. Falls back to the hot table on databases that have not run
+    init-db. The view is not a model, so the company filter is added here.
+    """
+    if view_ready(db.session.connection()):
+        query = db.session.query(attendance_all)
+        tenant_id = current_tenant_id()
+        if tenant_id is not None:
+            query = query.filter(attendance_all.c.company_id == tenant_id)
+        if employee_id is not None:
+            query = query.filter(attendance_all.c.employee_id == employee_id)
+        return query, attendance_all.c
+    query = Attendance.query
+    if employee_id is not None:
+        query = query.filter(Attendance.employee_id == employee_id)
+    return query, Attendance
+
+
+def drop_archives(engine):
+    """Remove the view and every archive table (used when rebuilding a database)."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f'DROP VIEW IF EXISTS {VIEW_NAME}')
+        for name in inspect(conn).get_table_names():
+            if name.startswith(TABLE_PREFIX):
+                conn.exec_driver_sql(f'DROP TABLE {name}')
+    _view_ready.pop(engine.url, None)
+
+
+# --- 2. MOVING ROWS OUT OF THE HOT TABLE ---
+
+
+def _eligible(cutoff):
+    return and_(Attendance.check_out.isnot(None), Attendance.check_in < cutoff)
+
+
+def plan_archive(cutoff):
+    """[(month, rows)] of closed sessions that would be archived."""
+    month = func.strftime('%Y-%m', Attendance.check_in) \
+        if db.engine.dialect.name == 'sqlite' else func.to_char(Attendance.check_in, 'YYYY-MM')
+    rows = db.session.query(month, func.count(Attendance.id))\
+        .filter(_eligible(cutoff)).group_by(month).order_by(month).all()
+    return [(m, n) for m, n in rows]
+
+
+def _month_filter(month, cutoff):
+    start, end = month_bounds(month)
+    return and_(_eligible(cutoff), Attendance.check_in >= start, Attendance.check_in < min(end, cutoff))
+
+
+def _archive_month_to_table(conn, month, cutoff):
+    table = archive_table(month)
+    table.create(conn, checkfirst=True)
+    _add_company_column(conn, table.name)
+    source = select(*(Attendance.__table__.c[name] for name in COLUMNS))\
+        .where(_month_filter(month, cutoff))
+    count, id_sum = conn.execute(
+        select(func.count(Attendance.id), func.coalesce(func.sum(Attendance.id), 0))
+        .where(_month_filter(month, cutoff))).one()
+    conn.execute(insert(table).from_select(list(COLUMNS), source))
+    return count, id_sum, table.name
+
+
+def _archive_month_to_parquet(conn, month, cutoff, directory):
+    rows = conn.execute(select(*(Attendance.__table__.c[name] for name in COLUMNS))
+                        .where(_month_filter(month, cutoff))
+                        .order_by(Attendance.employee_id, Attendance.check_in)).all()
+    if not rows:
+        return 0, 0, None
+    batch = pyarrow.table({
+        'id': pyarrow.array([r[0] for r in rows], pyarrow.int64()),
+        'check_in': pyarrow.array([r[1] for r in rows], pyarrow.timestamp('us')),
+        'check_out': pyarrow.array([r[2] for r in rows], pyarrow.timestamp('us')),
+        'employee_id': pyarrow.array([r[3] for r in rows], pyarrow.int64()),
+        'company_id': pyarrow.array([r[4] for r in rows], pyarrow.int64()),
+    })
+    month_dir = os.path.join(directory, f'month={month}')
+    os.makedirs(month_dir, exist_ok=True)
+    path = os.path.join(month_dir, f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.parquet")
+    # Write to a temp name first so a crash never leaves a half file behind
+    pq.write_table(batch, path + '.tmp', compression='zstd')
+    os.replace(path + '.tmp', path)
+    return len(rows), sum(r[0] for r in rows), path
+
+
+def archive_attendance(days, storage='table', directory=None):
+    """Move closed sessions older than ``days`` out of the hot table.
+
+    Each month is copied and deleted in its own transaction, so an
+    interrupted run leaves every punch in exactly one place.
+    Returns [(month, rows)].
+    """
+    if storage == 'parquet' and pyarrow is None:
+        raise click.ClickException('Parquet archival needs the pyarrow package.')
+    cutoff = datetime.now() - timedelta(days=days)
+    directory = directory or current_app.config['ATTENDANCE_ARCHIVE_DIR']
+    done = []
+
+    for month, _ in plan_archive(cutoff):
+        location = None
+        try:
+            with db.engine.begin() as conn:
+                if storage == 'parquet':
+                    count, id_sum, location = _archive_month_to_parquet(conn, month, cutoff,
+                                                                        directory)
+                else:
+                    count, id_sum, location = _archive_month_to_table(conn, month, cutoff)
+                if not count:
+                    continue
+                conn.execute(delete(Attendance.__table__).where(_month_filter(month, cutoff)))
+                conn.execute(insert(AttendanceArchive.__table__).values(
+                    month=month, storage=storage, location=location,
+                    row_count=count, id_checksum=id_sum, archived_at=datetime.utcnow()))
+        except Exception:
+            # The rows are still in attendance, so the file is not their copy
+            if storage == 'parquet' and location and os.path.exists(location):
+                os.remove(location)
+            raise
+        done.append((month, count))
+
+    with db.engine.begin() as conn:
+        refresh_attendance_view(conn)
+    return done
+
+
+# --- 3. VERIFICATION & COLD READS ---
+
+
+def verify_archives():
+    """Compare every archive with its recorded row count and id checksum.
+
+    Returns a list of problems; an empty list means everything checks out.
+    """
+    problems = []
+    entries = AttendanceArchive.query.order_by(AttendanceArchive.month, AttendanceArchive.id).all()
+    conn = db.session.connection()
+
+    expected = {}
+    for entry in entries:
+        key = (entry.storage, entry.location)
+        count, id_sum = expected.get(key, (0, 0))
+        expected[key] = (count + entry.row_count, id_sum + entry.id_checksum)
+
+    for (storage, location), (count, id_sum) in sorted(expected.items()):
+        if storage == 'table':
+            table = Table(location, MetaData(), autoload_with=conn)
+            actual = conn.execute(select(func.count(), func.coalesce(func.sum(table.c.id), 0))
+                                  .select_from(table)).one()
+            overlap = conn.execute(select(func.count()).select_from(table)
+                                   .where(table.c.id.in_(select(Attendance.id)))).scalar()
+            if overlap:
+                problems.append(f'{location}: {overlap} rows also present in attendance')
+        elif pyarrow is None:
+            problems.append(f'{location}: cannot verify without pyarrow')
+            continue
+        elif not os.path.exists(location):
+            problems.append(f'{location}: file missing')
+            continue
+        else:
+            ids = pq.read_table(location, columns=['id']).column('id').to_pylist()
+            actual = (len(ids), sum(ids))
+        if tuple(actual) != (count, id_sum):
+            problems.append(f'{location}: expected {count} rows / checksum {id_sum}, '
+                            f'found {actual[0]} / {actual[1]}')
+
+    if _archived_months('table') and not view_ready(conn):
+        problems.append(f'{VIEW_NAME} view is missing; run flask archive-attendance or init-db')
+    return problems
+
+
+def read_parquet_archive(start=None, end=None, employee_id=None, directory=None):
+    """Load archived punches from Parquet as a pyarrow Table.
+
+    Only files recorded in AttendanceArchive for months overlapping
+    [start, end) are opened; a file left by a run that failed to commit
+    is never read. Inside a company's scope only its rows are read.
+    """
+    if pyarrow is None:
+        raise RuntimeError('Reading the Parquet archive needs the pyarrow package.')
+    directory = directory or current_app.config['ATTENDANCE_ARCHIVE_DIR']
+    filters = [('employee_id', '=', employee_id)] if employee_id is not None else []
+    if current_tenant_id() is not None:
+        filters.append(('company_id', '=', current_tenant_id()))
+    tables = []
+    entries = AttendanceArchive.query.filter_by(storage='parquet')\
+        .order_by(AttendanceArchive.month, AttendanceArchive.id)
+    for entry in entries:
+        month_start, month_end = month_bounds(entry.month)
+        if (start and month_end <= start) or (end and month_start >= end):
+            continue
+        path = os.path.join(directory, f'month={entry.month}', os.path.basename(entry.location))
+        tables.append(pq.read_table(path, filters=filters or None))
+    if not tables:
+        return pyarrow.table({name: [] for name in COLUMNS})
+    return pyarrow.concat_tables(tables)
+
+
+# --- 4. CLI ---
+
+
+@click.command('archive-attendance')
+@click.option('--days', type=int, default=None,
+              help='Archive closed sessions older than this (default ATTENDANCE_ARCHIVE_DAYS).')
+@click.option('--format', 'storage', type=click.Choice(['table', 'parquet']), default=None,
+              help='Where archived rows go (default ATTENDANCE_ARCHIVE_FORMAT).')
+@click.option('--dry-run', is_flag=True, help='Only show what would be archived.')
+def archive_attendance_command(days, storage, dry_run):
+    """Move old closed attendance sessions into per-month archives."""
+    days = days if days is not None else current_app.config['ATTENDANCE_ARCHIVE_DAYS']
+    storage = storage or current_app.config['ATTENDANCE_ARCHIVE_FORMAT']
+    if dry_run:
+        plan = plan_archive(datetime.now() - timedelta(days=days))
+        for month, rows in plan:
+            click.echo(f'{month}: {rows} rows')
+        click.echo(f'{sum(n for _, n in plan)} rows would be archived ({storage}).')
+        return
+    done = archive_attendance(days, storage)
+    for month, rows in done:
+        click.echo(f'{month}: archived {rows} rows')
+    click.echo(f'{sum(n for _, n in done)} rows archived ({storage}).')
+
+
+@click.command('archive-verify')
+def archive_verify_command():
+    """Check every attendance archive against its recorded counts."""
+    problems = verify_archives()
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo('All attendance archives verified.')
+
+
+def init_archive(app):
+    if not app.config.get('ATTENDANCE_ARCHIVE_DIR'):
+        app.config['ATTENDANCE_ARCHIVE_DIR'] = os.path.join(app.instance_path, 'attendance_archive')
+    app.cli.add_command(archive_attendance_command)
+    app.cli.add_command(archive_verify_command)
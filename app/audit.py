@@ -0,0 +1,344 @@
+"""Write-behind audit log of state-changing HR actions.
+
+Routes call ``record()`` after their commit: status changes, registrations
+approved or rejected, leave decisions, reporting-line and client moves,
+settings and payroll runs. Recording does not touch the database. The
+event is appended as one JSON line to this process's spool file under
+``AUDIT_SPOOL_DIR`` and queued in memory. Queued events reach the
+``audit_event`` table in batched INSERTs:
+
+* from a background thread, every ``AUDIT_FLUSH_SECONDS`` or as soon as
+  ``AUDIT_BATCH_SIZE`` events are waiting (the default);
+* or, with ``AUDIT_FLUSH_IN_BACKGROUND = False``, when the request that
+  recorded them tears down.
+
+A spool file is deleted only once its events are committed, so events
+survive a crash of the process. Each process holds an exclusive ``flock``
+on its own spool files. The first flush in any later process claims the
+files nobody holds and inserts their events. Events whose ``event_id`` is
+already stored are skipped, so replaying a file twice is harmless.
+``flask audit-flush`` does the same by hand.
+
+``/admin/audit`` and ``/api/audit`` page through the log newest first with
+an id cursor, over indexes that lead with ``company_id`` and end with
+``id``. Events show up there once they are flushed.
+"""
+from datetime import datetime
+import atexit
+import glob
+import itertools
+import json
+import os
+import threading
+import uuid
+
+import click
+from flask import current_app, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import AuditEvent
+from app.tenancy import current_tenant_id
+
+try:
+    import fcntl
+except ImportError:  # Windows: only `flask audit-flush --force` replays spool files
+    fcntl = None
+
+# Rows per executemany when writing a flush or a recovered spool file
+INSERT_BATCH_SIZE = 500
+
+
+def insert_events(engine, events):
+    """Insert events in one transaction, skipping event_ids already stored."""
+    table = AuditEvent.__table__
+    inserted = 0
+    with engine.begin() as conn:
+        for start in range(0, len(events), INSERT_BATCH_SIZE):
+            batch = events[start:start + INSERT_BATCH_SIZE]
+            stored = set(conn.execute(select(table.c.event_id).where(
+                table.c.event_id.in_([e['event_id'] for e in batch]))).scalars())
+            fresh = [e for e in batch if e['event_id'] not in stored]
+            if fresh:
+                conn.execute(insert(table), fresh)
+                inserted += len(fresh)
+    return inserted
+
+
+def _read_spool(spool):
+    events = []
+    for line in spool:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # The last line of a process that died mid-write can be cut short
+            continue
+        event['occurred_at'] = datetime.fromisoformat(event['occurred_at'])
+        events.append(event)
+    return events
+
+
+def _discard(spool):
+    # Removed while still locked, so no other process can claim it meanwhile.
+    # Windows cannot remove an open file, and has no lock to keep anyway.
+    if fcntl is None:
+        spool.close()
+    try:
+        os.remove(spool.name)
+    except FileNotFoundError:
+        pass
+    spool.close()
+
+
+# --- 1. BUFFER AND WRITER ---
+
+
+class AuditWriter:
+    """Spools and buffers audit events, and writes them to the database in batches."""
+
+    def __init__(self):
+        self.app = None
+        # Guards the buffer and the spool files
+        self._lock = threading.Lock()
+        # One flush at a time, whichever thread asks
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        # Open spool file holding the buffered events
+        self._spool = None
+        # Closed spool files whose events are not committed yet
+        self._written = []
+        self._sequence = itertools.count(1)
+        # Tells this process's files apart from a dead process with the same pid
+        self._token = uuid.uuid4().hex[:8]
+        self._recovered = False
+        self._wake = threading.Event()
+        self._thread = None
+
+    def configure(self, app):
+        self.app = app
+
+    def pending(self):
+        return len(self._buffer)
+
+    def _open_spool(self):
+        directory = self.app.config['AUDIT_SPOOL_DIR']
+        # Created on the first audited action rather than at boot
+        os.makedirs(directory, exist_ok=True)
+        name = f'{os.getpid()}-{self._token}-{next(self._sequence)}.jsonl'
+        spool = open(os.path.join(directory, name), 'x', encoding='utf-8')
+        if fcntl:
+            fcntl.flock(spool, fcntl.LOCK_EX)
+        return spool
+
+    def append(self, event):
+        config = self.app.config
+        line = json.dumps(event, default=str) + '\n'
+        with self._lock:
+            if self._spool is None:
+                self._spool = self._open_spool()
+            self._spool.write(line)
+            self._spool.flush()
+            if config['AUDIT_SPOOL_FSYNC']:
+                os.fsync(self._spool.fileno())
+            self._buffer.append(event)
+            full = len(self._buffer) >= config['AUDIT_BATCH_SIZE']
+        if config['AUDIT_FLUSH_IN_BACKGROUND']:
+            self._start()
+            if full:
+                self._wake.set()
+
+    def flush(self):
+        """Write the buffered events; returns how many rows were inserted."""
+        with self._flush_lock:
+            if not self._recovered:
+                self._recovered = True
+                self.recover()
+            with self._lock:
+                events, self._buffer = self._buffer, []
+                if self._spool is not None:
+                    self._written.append(self._spool)
+                    self._spool = None
+                written = list(self._written)
+            if not events and not written:
+                return 0
+            try:
+                with self.app.app_context():
+                    inserted = insert_events(db.engine, events) if events else 0
+            except SQLAlchemyError:
+                self.app.logger.exception('Audit flush failed; %d event(s) stay spooled',
+                                          len(events))
+                with self._lock:
+                    self._buffer[:0] = events
+                return 0
+            with self._lock:
+                for spool in written:
+                    self._written.remove(spool)
+            for spool in written:
+                _discard(spool)
+            return inserted
+
+    def recover(self, force=False):
+        """Insert the events of spool files that no running process holds.
+
+        Without ``flock`` (Windows) files cannot be told apart from those of
+        a running process, so this only happens with ``force``.
+        """
+        if fcntl is None and not force:
+            return 0
+        with self._lock:
+            ours = {spool.name for spool in self._written}
+            if self._spool is not None:
+                ours.add(self._spool.name)
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self.app.config['AUDIT_SPOOL_DIR'], '*.jsonl'))):
+            if path in ours:
+                continue
+            try:
+                spool = open(path, encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            try:
+                if fcntl:
+                    try:
+                        fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        # Its process is still running and will flush it
+                        spool.close()
+                        continue
+                events = _read_spool(spool)
+                with self.app.app_context():
+                    recovered += insert_events(db.engine, events)
+            except SQLAlchemyError:
+                self.app.logger.exception('Could not replay audit spool %s', path)
+                spool.close()
+                continue
+            _discard(spool)
+        return recovered
+
+    def _start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            first = self._thread is None
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+        if first:
+            # Whatever is still buffered on a clean shutdown
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.app.config['AUDIT_FLUSH_SECONDS'])
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the thread alive; the events are still in the spool
+                self.app.logger.exception('Audit writer failed')
+
+
+writer = AuditWriter()
+
+
+def record(action, target_type=None, target_id=None, **details):
+    """Queue an audit event by the current user; call after the commit.
+
+    ``action`` is a dotted name such as ``leave.approved``. Keyword
+    arguments are stored as the event's JSON details.
+    """
+    in_request = has_request_context()
+    actor_id, actor_email = g.get('audit_actor', (None, None)) if in_request else (None, None)
+    writer.append({
+        'event_id': uuid.uuid4().hex,
+        'occurred_at': datetime.utcnow(),
+        'company_id': current_tenant_id(),
+        'actor_id': actor_id,
+        'actor_email': actor_email,
+        'action': action,
+        'target_type': target_type,
+        'target_id': target_id,
+        'details': json.dumps(details, default=str) if details else None,
+        'ip': request.remote_addr if in_request else None,
+    })
+
+
+# --- 2. QUERYING ---
+
+
+def audit_page(before=None, per_page=50, action=None, actor_id=None, target_type=None,
+               target_id=None, since=None, until=None):
+    """Newest events first; returns (events, cursor for the next page or None).
+
+    Pass the returned cursor as ``before`` to get the next page. Each filter
+    combination walks one of the (company_id, ..., id) indexes backwards.
+    """
+    if per_page < 1:
+        raise ValueError(f'per_page must be at least 1, got {per_page}')
+    query = AuditEvent.query
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    if actor_id:
+        query = query.filter(AuditEvent.actor_id == actor_id)
+    if target_type:
+        query = query.filter(AuditEvent.target_type == target_type)
+    if target_id:
+        query = query.filter(AuditEvent.target_id == target_id)
+    if since:
+        query = query.filter(AuditEvent.occurred_at >= since)
+    if until:
+        query = query.filter(AuditEvent.occurred_at < until)
+    if before:
+        query = query.filter(AuditEvent.id < before)
+    events = query.order_by(AuditEvent.id.desc()).limit(per_page + 1).all()
+    cursor = events[per_page - 1].id if len(events) > per_page else None
+    return events[:per_page], cursor
+
+
+def event_dict(event):
+    return {
+        'id': event.id, 'occurred_at': event.occurred_at.isoformat(timespec='seconds'),
+        'actor_id': event.actor_id, 'actor_email': event.actor_email, 'action': event.action,
+        'target_type': event.target_type, 'target_id': event.target_id,
+        'details': json.loads(event.details) if event.details else {}, 'ip': event.ip,
+    }
+
+
+# --- 3. REQUEST HOOKS AND CLI ---
+
+
+def _remember_actor():
+    # Read while the user row is still loaded. record() runs after a
+    # commit, which expires it, and reading it then costs another SELECT.
+    if request.endpoint != 'static' and current_user.is_authenticated:
+        g.audit_actor = (current_user.id, current_user.email)
+
+
+def _flush_at_teardown(exc):
+    if current_app.config['AUDIT_FLUSH_IN_BACKGROUND'] or not writer.pending():
+        return
+    # Hand back the request's connection first: on SQLite its open read
+    # transaction would hold up the insert
+    db.session.remove()
+    writer.flush()
+
+
+@click.command('audit-flush')
+@click.option('--force', is_flag=True,
+              help='Replay every spool file. Without flock (Windows), stop the app first.')
+def audit_flush_command(force):
+    """Insert audit events left in spool files by processes that stopped."""
+    recovered = writer.recover(force=force)
+    click.echo(f'{recovered} audit event(s) recovered.')
+
+
+def init_audit(app):
+    if not app.config.get('AUDIT_SPOOL_DIR'):
+        app.config['AUDIT_SPOOL_DIR'] = os.path.join(app.instance_path, 'audit_spool')
+    writer.configure(app)
+    app.before_request(_remember_actor)
+    app.teardown_request(_flush_at_teardown)
+    app.cli.add_command(audit_flush_command)
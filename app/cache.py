@@ -0,0 +1,237 @@
+"""Rendered-fragment cache and static asset fingerprinting.
+
+Fragments are keyed on *data version stamps*: one counter per table, stored
+in the ``data_version`` table and bumped in the same transaction as any
+write to that table. Every worker reads the stamps once per request, so a
+write in one worker invalidates the fragments cached by all of them.
+
+In templates:
+    {% cache 'org_chart', data_version('employee', 'position') %}
+        ... expensive markup ...
+    {% endcache %}
+
+With several companies (app/tenancy.py) keys and stamps are per company:
+one company never sees another's cached markup, and its writes only
+invalidate its own fragments.
+"""
+from collections import OrderedDict
+from itertools import chain
+import hashlib
+import os
+import re
+import threading
+
+from flask import current_app, g, request, url_for
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app import db
+
+
+class LRUCache:
+    """A small thread-safe LRU map, used for rendered markup and query results."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+fragment_cache = LRUCache()
+# Computed query results (e.g. the payroll register), keyed the same way
+data_cache = LRUCache(max_entries=128)
+
+
+def _namespace():
+    # Imported late: app.tenancy imports the models, which import app
+    from app.tenancy import current_tenant_id
+    tenant_id = current_tenant_id()
+    return () if tenant_id is None else (f'tenant{tenant_id}',)
+
+
+def cache_key(*parts):
+    return ':'.join(str(p) for p in _namespace() + parts)
+
+
+def cached(key, loader):
+    """Return data_cache[key], calling loader() to fill it on a miss.
+
+    Values are shared between requests, so loaders must return plain data
+    (dicts, tuples, Decimals), never ORM instances bound to a session.
+    """
+    value = data_cache.get(key)
+    if value is None:
+        value = loader()
+        data_cache.set(key, value)
+    return value
+
+
+# --- 1. DATA VERSION STAMPS ---
+
+
+def version_name(table, company_id):
+    """The data_version row for one company's copy of a table."""
+    return table if company_id is None else f'{table}@{company_id}'
+
+
+def bump_versions(connection, tables, company_id=None):
+    from app.models import DataVersion
+    table = DataVersion.__table__
+    for name in sorted(version_name(t, company_id) for t in tables):
+        result = connection.execute(
+            update(table).where(table.c.table_name == name)
+            .values(version=table.c.version + 1))
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(table_name=name, version=1))
+
+
+def _tracked(tables):
+    # Only tables that feed cached fragments get a stamp; hot write paths
+    # such as attendance punches stay free of the extra UPDATE.
+    watched = current_app.config.get('CACHE_VERSIONED_TABLES', ()) if current_app else ()
+    return {name for name in tables if name in watched}
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_after_flush(session, flush_context):
+    # {company_id: {table, ...}}; rows without a company_id are global
+    changed = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if hasattr(obj, '__table__'):
+            changed.setdefault(getattr(obj, 'company_id', None), set()).add(obj.__table__.name)
+    for company_id, tables in changed.items():
+        tables = _tracked(tables)
+        if tables:
+            bump_versions(session.connection(), tables, company_id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_before_bulk(state):
+    # UPDATE/DELETE statements (session.execute(update(...)) and the legacy
+    # Query.update()/delete()) skip the flush, so bump in the same transaction
+    if not (state.is_update or state.is_delete):
+        return
+    from app.tenancy import current_tenant_id
+    tables = _tracked({state.statement.table.name})
+    if tables:
+        connection = state.session.connection(
+            bind_arguments={'mapper': state.bind_mapper, 'clause': state.statement})
+        bump_versions(connection, tables, current_tenant_id())
+
+
+def data_version(*tables):
+    """Return a stamp like '4.17' for the given tables, read once per request."""
+    from app.models import DataVersion
+    from app.tenancy import current_tenant_id
+    company_id = current_tenant_id()
+    versions = g.get('_data_versions')
+    if versions is None:
+        names = [version_name(t, company_id)
+                 for t in current_app.config.get('CACHE_VERSIONED_TABLES', ())]
+        versions = dict(db.session.query(DataVersion.table_name, DataVersion.version)
+                        .filter(DataVersion.table_name.in_(names)).all())
+        g._data_versions = versions
+    return '.'.join(str(versions.get(version_name(t, company_id), 0)) for t in tables)
+
+
+# --- 2. JINJA {% cache %} BLOCK ---
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, parts, caller):
+        if not current_app.config.get('FRAGMENT_CACHE_ENABLED', True):
+            return caller()
+        key = cache_key('fragment', *parts)
+        value = fragment_cache.get(key)
+        if value is None:
+            value = caller()
+            fragment_cache.set(key, value)
+        return Markup(value)
+
+
+# --- 3. FINGERPRINTED STATIC FILES ---
+
+_fingerprints = {}
+_FINGERPRINTED_NAME = re.compile(r'-[0-9a-f]{12}\.\w+$')
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def fingerprinted_filename(filename, data):
+    """'logo.png' + content -> 'logo-3fa2b9c01d4e.png'."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}-{file_digest(data)}{ext}"
+
+
+def static_url(filename):
+    """url_for('static') with a content hash, so the URL changes when the file does."""
+    path = os.path.join(current_app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return url_for('static', filename=filename)
+    cached = _fingerprints.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as fh:
+            cached = (mtime, file_digest(fh.read()))
+        _fingerprints[path] = cached
+    return url_for('static', filename=filename, v=cached[1])
+
+
+def _static_cache_headers(response):
+    if request.endpoint != 'static' or response.status_code != 200:
+        return response
+    filename = (request.view_args or {}).get('filename', '')
+    # Content-addressed URLs never change meaning, so browsers can keep them
+    if request.args.get('v') or _FINGERPRINTED_NAME.search(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['STATIC_MAX_AGE']
+        response.cache_control.immutable = True
+    return response
+
+
+def init_cache(app):
+    fragment_cache.max_entries = app.config.get('FRAGMENT_CACHE_SIZE', 512)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals.update(data_version=data_version, static_url=static_url)
+    app.after_request(_static_cache_headers)
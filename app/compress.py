@@ -0,0 +1,52 @@
+"""gzip / brotli compression of text responses.
+
+brotli is optional: when the ``brotli`` package is installed and the client
+accepts ``br`` it is preferred, otherwise responses fall back to gzip.
+"""
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+
+def compress_response(response):
+    config = current_app.config
+    if (not config.get('COMPRESS_ENABLED', True)
+            or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < config.get('COMPRESS_MIN_SIZE', 500):
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        body = brotli.compress(data, quality=config.get('COMPRESS_BR_LEVEL', 5))
+        encoding = 'br'
+    elif accepted['gzip']:
+        body = gzip.compress(data, compresslevel=config.get('COMPRESS_LEVEL', 6))
+        encoding = 'gzip'
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
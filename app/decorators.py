@@ -0,0 +1,47 @@
+from flask import flash, redirect, url_for
+from flask_login import current_user
+from functools import wraps
+
+# --- ACCESS CONTROL DECORATORS ---
+
+
+def finance_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if current_user.role not in ['Finance', 'Company Owner']:
+            flash('Access restricted to Finance department.', 'danger')
+            return redirect(url_for('main.dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def owner_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'Company Owner':
+            flash('Access denied. Company Owner privileges required.', 'danger')
+            return redirect(url_for('main.dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def hr_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Add 'Company Owner' to the allowed list
+        if current_user.role not in ['HR Team', 'Company Owner']:
+            flash('Access denied. HR Team privileges required.', 'danger')
+            return redirect(url_for('main.dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def manager_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        # Add 'Company Owner' to the allowed list
+        if current_user.role not in ['Manager', 'Company Owner']:
+            flash('Access denied. Manager privileges required.', 'danger')
+            return redirect(url_for('main.dashboard'))
+        return f(*args, **kwargs)
+    return decorated_function
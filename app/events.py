@@ -0,0 +1,177 @@
+"""In-process event bus and the Server-Sent Events stream built on it.
+
+Routes publish small domain events *after* their commit (a new leave
+request, a registration, a punch, an approval). Each open ``/events/stream``
+connection subscribes with the viewer's company, role and id and only
+receives the events addressed to them, so dashboards update in place instead
+of being reloaded.
+
+The bus lives in the worker process: run one worker with threads (or a
+gevent/eventlet worker) so every browser shares the same bus. Recent events
+are kept in a short history; a browser that reconnects with
+``Last-Event-ID`` is sent what it missed.
+"""
+from collections import deque, namedtuple
+import json
+import queue
+import threading
+import time
+
+Event = namedtuple('Event', 'id type data roles user_ids company_id')
+
+# Roles that see events about everyone; Managers get their own reports' events
+HR_ROLES = ('HR Team', 'Company Owner')
+
+
+class Subscription:
+    def __init__(self, role, user_id, queue_size, company_id=None):
+        self.role = role
+        self.user_id = user_id
+        self.company_id = company_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Set when the browser falls too far behind; its stream then ends
+        # and the reconnect replays from history
+        self.overflowed = False
+
+    def wants(self, event):
+        if event.company_id != self.company_id:
+            return False
+        return self.role in event.roles or self.user_id in event.user_ids
+
+    def offer(self, event):
+        if self.overflowed or not self.wants(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+
+class EventBus:
+    """Fan events out to every subscriber whose role or user id they address."""
+
+    def __init__(self, history=200, queue_size=100):
+        self.queue_size = queue_size
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        # Ids continue from the boot time in milliseconds rather than 1. A
+        # browser reconnecting after a restart sends an id from the previous
+        # boot, which is then below every new id and replays the history
+        # instead of hiding events until the count catches up.
+        self._next_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+
+    def publish(self, kind, data, roles=(), user_ids=(), company_id=None):
+        with self._lock:
+            event = Event(self._next_id, kind, data, frozenset(roles), frozenset(user_ids),
+                          company_id)
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(event)
+        return event
+
+    def subscribe(self, role, user_id, last_event_id=None, company_id=None):
+        subscription = Subscription(role, user_id, self.queue_size, company_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+            missed = [e for e in self._history if last_event_id is not None and e.id > last_event_id]
+        for event in missed:
+            subscription.offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def configure(self, history, queue_size):
+        with self._lock:
+            self._history = deque(self._history, maxlen=history)
+            self.queue_size = queue_size
+
+
+bus = EventBus()
+
+
+# --- 1. DOMAIN EVENTS ---
+# Call these after db.session.commit(). Events only reach the current
+# company; those about one employee go to that employee and everyone in
+# their chain of command.
+
+
+def _employee_and_managers(employee_id):
+    from app.hierarchy import manager_ids_above
+    return [employee_id] + manager_ids_above(employee_id)
+
+
+def _publish(kind, data, roles=(), user_ids=()):
+    from app.tenancy import current_tenant_id
+    bus.publish(kind, data, roles, user_ids, current_tenant_id())
+
+
+def leave_requested(leave_id, employee_id, employee_name, leave_type, start_date, end_date,
+                    employee_role=None):
+    from app.hierarchy import manager_ids_above
+    user_ids = manager_ids_above(employee_id)
+    # A Manager's dashboard lists the requests they decide, and their own is
+    # not one of them; everyone else gets theirs for their own leave list
+    if employee_role != 'Manager':
+        user_ids.append(employee_id)
+    _publish('leave.requested', {
+        'id': leave_id, 'employee': employee_name, 'leave_type': leave_type,
+        'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(),
+    }, roles=HR_ROLES, user_ids=user_ids)
+
+
+def leave_decided(leave_id, employee_id, employee_name, status):
+    _publish('leave.decided', {'id': leave_id, 'employee': employee_name, 'status': status},
+             roles=HR_ROLES, user_ids=_employee_and_managers(employee_id))
+
+
+def user_registered(user_id, full_name, email, role):
+    _publish('user.registered', {'id': user_id, 'full_name': full_name,
+                                 'email': email, 'role': role}, roles=HR_ROLES)
+
+
+def user_decided(user_id, full_name, status):
+    _publish('user.decided', {'id': user_id, 'full_name': full_name, 'status': status},
+             roles=HR_ROLES)
+
+
+def punched(kind, employee_id, employee_name, at):
+    """kind is 'clock_in' or 'clock_out'."""
+    _publish(f'attendance.{kind}', {'employee_id': employee_id, 'employee': employee_name,
+                                    'at': at.isoformat(timespec='seconds')},
+             roles=HR_ROLES, user_ids=_employee_and_managers(employee_id))
+
+
+# --- 2. SSE STREAM ---
+
+
+def format_event(event):
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+
+def stream(subscription, heartbeat, lifetime):
+    """Yield SSE frames until ``lifetime`` seconds pass or the client falls behind.
+
+    Ending the stream now and then frees the worker thread; EventSource
+    reconnects on its own and resumes from Last-Event-ID. The caller
+    unsubscribes when the response closes, which also covers a body that
+    is never iterated.
+    """
+    deadline = time.monotonic() + lifetime
+    yield 'retry: 3000\n\n'
+    while time.monotonic() < deadline and not subscription.overflowed:
+        try:
+            event = subscription.queue.get(timeout=heartbeat)
+        except queue.Empty:
+            # Keeps proxies from closing an idle connection
+            yield ': keep-alive\n\n'
+            continue
+        yield format_event(event)
+
+
+def init_events(app):
+    bus.configure(app.config.get('EVENTS_HISTORY', 200), app.config.get('EVENTS_QUEUE_SIZE', 100))
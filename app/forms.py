@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, SelectField, FloatField
+from wtforms import StringField, PasswordField, SubmitField, SelectField, FloatField, DecimalField
 from wtforms.validators import DataRequired, Length, Email, EqualTo, ValidationError
 from app.models import Employee, Position
 from wtforms.fields import DateField
@@ -93,7 +93,7 @@ class PositionForm(FlaskForm):
     department = SelectField('Department', choices=[
         ('IT', 'IT'), ('HR', 'HR'), ('Sales', 'Sales'), ('Executive', 'Executive')
     ], validators=[DataRequired()])
-    base_salary = FloatField('Annual Base Salary', validators=[DataRequired()])
+    base_salary = DecimalField('Annual Base Salary', places=2, validators=[DataRequired()])
     submit = SubmitField('Save Position')
 
 
@@ -102,6 +102,8 @@ class ClientForm(FlaskForm):
     contact_person = StringField('Contact Person')
     email = StringField('Email', validators=[DataRequired(), Email()])
     phone = StringField('Phone Number')
+    # Choices are the active Managers, filled in by the view; 0 = least loaded
+    assigned_manager = SelectField('Account Manager', coerce=int, choices=[])
     submit = SubmitField('Add Client')
 
 
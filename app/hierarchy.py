@@ -0,0 +1,220 @@
+"""Reporting lines: ``Employee.manager_id`` plus a closure table.
+
+``reporting_line`` holds one row per (manager at any level, report) pair,
+plus every employee with themselves at depth 0, so
+
+* everyone under X:   WHERE ancestor_id = X AND depth > 0
+* chain of command:   WHERE descendant_id = X AND depth > 0 ORDER BY depth
+
+are index range scans that cost as much as the rows they return, however
+deep or wide the org is.
+
+Rows are kept in step with ``manager_id`` in the same flush that changes it
+(an ``after_flush`` listener, like the search index): moving someone moves
+their whole team. ``flask rebuild-hierarchy`` recomputes the table from
+``manager_id`` after bulk loads.
+"""
+import click
+from sqlalchemy import delete, event, exists, func, insert, inspect, or_, select, text, true
+from sqlalchemy.orm import Session, joinedload
+
+from app import db
+from app.models import Employee, LeaveRequest, ReportingLine
+
+line = ReportingLine.__table__
+
+# Roles that see every pending request; Managers only see their own reports
+ALL_APPROVALS_ROLES = ('HR Team', 'Company Owner')
+# Stops a manager_id loop in the data from recursing forever
+MAX_DEPTH = 64
+
+_ready = {}
+
+
+def hierarchy_ready(connection):
+    url = connection.engine.url
+    if url not in _ready:
+        _ready[url] = inspect(connection).has_table(line.name)
+    return _ready[url]
+
+
+# --- 1. KEEPING THE CLOSURE TABLE IN SYNC ---
+
+
+def _would_cycle(connection, employee_id, manager_id):
+    if manager_id == employee_id:
+        return True
+    return connection.execute(select(line.c.depth).where(
+        line.c.ancestor_id == employee_id, line.c.descendant_id == manager_id)).first() is not None
+
+
+def _move(connection, employee_id, manager_id):
+    """Re-hang employee_id and everyone under them below manager_id."""
+    if manager_id is not None and _would_cycle(connection, employee_id, manager_id):
+        raise ValueError(f'Employee {employee_id} cannot report to someone in their own team.')
+    team = select(line.c.descendant_id).where(line.c.ancestor_id == employee_id)
+    old_managers = select(line.c.ancestor_id).where(line.c.descendant_id == employee_id,
+                                                    line.c.ancestor_id != employee_id)
+    connection.execute(delete(line).where(line.c.descendant_id.in_(team),
+                                          line.c.ancestor_id.in_(old_managers)))
+    if manager_id is None:
+        return
+    above, below = line.alias('above'), line.alias('below')
+    connection.execute(insert(line).from_select(
+        ['ancestor_id', 'descendant_id', 'depth'],
+        # Every manager above the new one x everyone in the moved team
+        select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+        .select_from(above.join(below, true()))
+        .where(above.c.descendant_id == manager_id, below.c.ancestor_id == employee_id)))
+
+
+@event.listens_for(Session, 'before_flush')
+def _reassign_reports(session, flush_context, instances):
+    # The reports of someone being deleted move up to that person's manager
+    for obj in session.deleted:
+        if isinstance(obj, Employee) and obj.id is not None:
+            with session.no_autoflush:
+                # Through the relationship, so the delete does not null it again
+                for report in list(obj.direct_reports):
+                    report.manager = obj.manager
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_after_flush(session, flush_context):
+    added = [obj for obj in session.new if isinstance(obj, Employee)]
+    moved = [obj for obj in session.dirty if isinstance(obj, Employee)
+             and inspect(obj).attrs.manager_id.history.has_changes()]
+    removed = [obj.id for obj in session.deleted if isinstance(obj, Employee)]
+    if not added and not moved and not removed:
+        return
+
+    conn = session.connection()
+    if not hierarchy_ready(conn):
+        return
+    if added:
+        conn.execute(insert(line), [{'ancestor_id': obj.id, 'descendant_id': obj.id, 'depth': 0}
+                                    for obj in added])
+    for obj in added:
+        if obj.manager_id is not None:
+            _move(conn, obj.id, obj.manager_id)
+    for obj in moved:
+        _move(conn, obj.id, obj.manager_id)
+    if removed:
+        conn.execute(delete(line).where(or_(line.c.ancestor_id.in_(removed),
+                                            line.c.descendant_id.in_(removed))))
+
+
+def manager_loops(connection):
+    """Sorted ids of employees whose manager_id chain leads back to themselves."""
+    employee = Employee.__table__
+    managers = dict(connection.execute(select(employee.c.id, employee.c.manager_id)).all())
+    looped, done = set(), set()
+    for start in managers:
+        path, current = [], start
+        while current is not None and current not in done and current not in path:
+            path.append(current)
+            current = managers.get(current)
+        if current in path:
+            looped.update(path[path.index(current):])
+        done.update(path)
+    return sorted(looped)
+
+
+def rebuild_hierarchy(engine):
+    """Recompute the whole closure table from manager_id with one recursive query.
+
+    Raises ValueError, leaving the table as it was, if manager_id loops.
+    """
+    with engine.begin() as conn:
+        looped = manager_loops(conn)
+        if looped:
+            raise ValueError(f'manager_id loops through employee(s) '
+                             f'{", ".join(map(str, looped))}; fix those before rebuilding.')
+        conn.execute(delete(line))
+        conn.execute(text(f"""
+            INSERT INTO {line.name} (ancestor_id, descendant_id, depth)
+            WITH RECURSIVE chain(ancestor_id, descendant_id, depth) AS (
+                SELECT id, id, 0 FROM employee
+                UNION ALL
+                SELECT chain.ancestor_id, employee.id, chain.depth + 1
+                FROM chain JOIN employee ON employee.manager_id = chain.descendant_id
+                WHERE chain.depth < :max_depth)
+            SELECT ancestor_id, descendant_id, depth FROM chain"""), {'max_depth': MAX_DEPTH})
+        return conn.execute(select(func.count()).select_from(line)).scalar()
+
+
+# --- 2. QUERIES ---
+
+
+def would_create_cycle(employee_id, manager_id):
+    return _would_cycle(db.session.connection(), employee_id, manager_id)
+
+
+def reports_under(manager_id, max_depth=None):
+    """(Employee, depth) for everyone below manager_id, nearest levels first."""
+    query = db.session.query(Employee, ReportingLine.depth)\
+        .join(ReportingLine, ReportingLine.descendant_id == Employee.id)\
+        .filter(ReportingLine.ancestor_id == manager_id, ReportingLine.depth > 0)
+    if max_depth:
+        query = query.filter(ReportingLine.depth <= max_depth)
+    return query.order_by(ReportingLine.depth, Employee.full_name, Employee.id)
+
+
+def chain_of_command(employee_id):
+    """[Employee] from the direct manager up to the top of the org."""
+    return Employee.query\
+        .join(ReportingLine, ReportingLine.ancestor_id == Employee.id)\
+        .filter(ReportingLine.descendant_id == employee_id, ReportingLine.depth > 0)\
+        .order_by(ReportingLine.depth).all()
+
+
+def manager_ids_above(employee_id):
+    return [row[0] for row in db.session.query(ReportingLine.ancestor_id).filter(
+        ReportingLine.descendant_id == employee_id, ReportingLine.depth > 0)]
+
+
+def is_under(manager_id, employee_id):
+    return db.session.query(exists().where(
+        ReportingLine.ancestor_id == manager_id,
+        ReportingLine.descendant_id == employee_id,
+        ReportingLine.depth > 0)).scalar()
+
+
+def direct_report_counts(manager_ids):
+    """{manager_id: number of direct reports}."""
+    if not manager_ids:
+        return {}
+    return dict(db.session.query(Employee.manager_id, func.count(Employee.id))
+                .filter(Employee.manager_id.in_(manager_ids))
+                .group_by(Employee.manager_id).all())
+
+
+def can_manage(user, employee_id):
+    """HR and the Owner manage everyone; a Manager only their own reports."""
+    if user.role in ALL_APPROVALS_ROLES:
+        return True
+    return user.role == 'Manager' and is_under(user.id, employee_id)
+
+
+def pending_approvals(approver):
+    """Pending leave requests the approver may decide, oldest first."""
+    query = LeaveRequest.query.options(joinedload(LeaveRequest.employee))\
+        .filter(LeaveRequest.status == 'Pending')
+    if approver.role not in ALL_APPROVALS_ROLES:
+        query = query.join(ReportingLine, ReportingLine.descendant_id == LeaveRequest.employee_id)\
+            .filter(ReportingLine.ancestor_id == approver.id, ReportingLine.depth > 0)
+    return query.order_by(LeaveRequest.date_posted, LeaveRequest.id)
+
+
+@click.command('rebuild-hierarchy')
+def rebuild_hierarchy_command():
+    """Recompute the reporting-line closure table from manager_id."""
+    try:
+        rows = rebuild_hierarchy(db.engine)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Reporting lines rebuilt ({rows} rows).')
+
+
+def init_hierarchy(app):
+    app.cli.add_command(rebuild_hierarchy_command)
@@ -1,5 +1,6 @@
 from app import db, login_manager
 from flask_login import UserMixin
+from sqlalchemy.orm import declared_attr
 from datetime import datetime
 
 
@@ -7,13 +8,45 @@ from datetime import datetime
 def load_user(user_id):
     return Employee.query.get(int(user_id))
 
+# --- 0. COMPANIES (TENANTS) ---
+
+
+class Company(db.Model):
+    # One row per company hosted by this deployment (see app/tenancy.py)
+    id = db.Column(db.Integer, primary_key=True)
+    # Subdomain / X-Company header value, e.g. "acme" for acme.hrms.example.com
+    slug = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class TenantScoped:
+    """Rows owned by one company.
+
+    Queries on these models only see the current company's rows, and new rows
+    are stamped with it (app/tenancy.py). Indexes lead with company_id.
+    """
+
+    @declared_attr
+    def company_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('company.id'))
+
+
 # --- 1. EMPLOYEE MODEL ---
 
 
-class Employee(db.Model, UserMixin):
+class Employee(TenantScoped, db.Model, UserMixin):
+    __table_args__ = (
+        # Account-manager lookups (active Managers) for client portfolios
+        db.Index('ix_employee_company_role_status', 'company_id', 'role', 'status'),
+        db.Index('ix_employee_company_department', 'company_id', 'department'),
+        # Also serves the login lookup by email
+        db.UniqueConstraint('company_id', 'email', name='uq_employee_company_email'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
     password = db.Column(db.String(60), nullable=False)
     # HR Team, Company Owner, Manager, etc.
     role = db.Column(db.String(20), default='Employee')
@@ -23,6 +56,11 @@ class Employee(db.Model, UserMixin):
     # Foreign Key for Position
     position_id = db.Column(db.Integer, db.ForeignKey('position.id'))
 
+    # Reporting line; the full tree is kept in ReportingLine (app/hierarchy.py)
+    manager_id = db.Column(db.Integer, db.ForeignKey('employee.id'), index=True)
+    manager = db.relationship('Employee', remote_side=[id],
+                              backref=db.backref('direct_reports', lazy=True))
+
     # Relationships (backrefs defined in other models appear here automatically)
     # Accessible via: self.job_position, self.attendance_records, self.leaves, self.managed_clients
 
@@ -36,7 +74,14 @@ class Employee(db.Model, UserMixin):
 
 
 # --- 2. ATTENDANCE MODEL ---
-class Attendance(db.Model):
+class Attendance(TenantScoped, db.Model):
+    # Hot table: open-session lookups (clock in/out) and "latest punches"
+    __table_args__ = (
+        db.Index('ix_attendance_employee_check_out', 'employee_id', 'check_out'),
+        db.Index('ix_attendance_check_in', 'check_in'),
+        db.Index('ix_attendance_company_check_in', 'company_id', 'check_in'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     check_in = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     check_out = db.Column(db.DateTime)
@@ -44,8 +89,41 @@ class Attendance(db.Model):
         'employee.id'), nullable=False)
 
 
+# One row per batch of sessions moved out of Attendance (see app/archive.py)
+class AttendanceArchive(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False, index=True)  # e.g. "2025-03"
+    storage = db.Column(db.String(10), nullable=False)  # table or parquet
+    # Archive table name, or Parquet file path
+    location = db.Column(db.String(500), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    id_checksum = db.Column(db.BigInteger, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# --- 2b. REPORTING LINES ---
+class ReportingLine(db.Model):
+    # Closure table: one row per (manager at any level, report) pair, plus
+    # each employee with themselves at depth 0 (see app/hierarchy.py)
+    __table_args__ = (
+        db.Index('ix_reporting_line_ancestor_depth', 'ancestor_id', 'depth'),
+        db.Index('ix_reporting_line_descendant_depth', 'descendant_id', 'depth'),
+    )
+
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey('employee.id'), primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
+
+
 # --- 3. LEAVE REQUEST MODEL ---
-class LeaveRequest(db.Model):
+class LeaveRequest(TenantScoped, db.Model):
+    # Approval queues: everyone's pending requests, or one team's
+    __table_args__ = (
+        db.Index('ix_leave_request_status_posted', 'status', 'date_posted'),
+        db.Index('ix_leave_request_company_status_posted', 'company_id', 'status', 'date_posted'),
+        db.Index('ix_leave_request_employee_status', 'employee_id', 'status'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     leave_type = db.Column(db.String(20), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
@@ -62,10 +140,17 @@ class LeaveRequest(db.Model):
 
 
 # --- 4. POSITION MODEL ---
-class Position(db.Model):
+class Position(TenantScoped, db.Model):
+    # Titles are unique within a company
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'title', name='uq_position_company_title'),
+        db.Index('ix_position_company_department', 'company_id', 'department'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(100), nullable=False, unique=True)
-    base_salary = db.Column(db.Float, default=0.0)
+    title = db.Column(db.String(100), nullable=False)
+    # Money is stored as exact decimals, never floats
+    base_salary = db.Column(db.Numeric(12, 2), default=0)
     department = db.Column(db.String(100), nullable=False)
 
     # This creates the link:
@@ -77,28 +162,44 @@ class Position(db.Model):
 
 
 # --- 5. CLIENT MODEL ---
-class Client(db.Model):
+class Client(TenantScoped, db.Model):
+    __table_args__ = (
+        # Per-manager workload counts are read from this index alone (app/portfolio.py)
+        db.Index('ix_client_company_manager_status', 'company_id', 'assigned_manager_id', 'status'),
+        db.UniqueConstraint('company_id', 'email', name='uq_client_company_email'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     company_name = db.Column(db.String(150), nullable=False)
     contact_person = db.Column(db.String(100))
-    email = db.Column(db.String(120), unique=True)
+    email = db.Column(db.String(120))
     phone = db.Column(db.String(20))
     status = db.Column(db.String(20), default='Active')
     assigned_manager_id = db.Column(db.Integer, db.ForeignKey('employee.id'))
 
 
 # --- 6. DEPARTMENT MODEL ---
-class Department(db.Model):
+class Department(TenantScoped, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'name', name='uq_department_company_name'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
     positions = db.relationship('Position', backref='dept', lazy=True)
 
 
-class PayrollRecord(db.Model):
+class PayrollRecord(TenantScoped, db.Model):
+    # Payslip history is always read per employee, newest first
+    __table_args__ = (
+        db.Index('ix_payroll_record_employee_date', 'employee_id', 'date_processed'),
+        db.Index('ix_payroll_record_company_date', 'company_id', 'date_processed'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey(
         'employee.id'), nullable=False)
-    amount_paid = db.Column(db.Float, nullable=False)
+    amount_paid = db.Column(db.Numeric(12, 2), nullable=False)
     date_processed = db.Column(
         db.DateTime, nullable=False, default=datetime.utcnow)
     # e.g., "December 2025"
@@ -108,7 +209,11 @@ class PayrollRecord(db.Model):
         'Employee', backref=db.backref('payroll_history', lazy=True))
 
 
-class Expense(db.Model):
+class Expense(TenantScoped, db.Model):
+    __table_args__ = (
+        db.Index('ix_expense_company_date', 'company_id', 'date_incurred'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(200), nullable=False)
     # e.g., Utilities, Rent, Hardware
@@ -118,7 +223,11 @@ class Expense(db.Model):
     date_posted = db.Column(db.DateTime, default=datetime.utcnow)
 
 
-class CompanySettings(db.Model):
+class CompanySettings(TenantScoped, db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('company_id', name='uq_company_settings_company'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     company_name = db.Column(db.String(100), default="My Company")
     company_logo_url = db.Column(
@@ -127,10 +236,48 @@ class CompanySettings(db.Model):
 
     @staticmethod
     def get_settings():
-        # This helper ensures we always get the first row (the only one)
+        # One row per company; the query is scoped to the current one
         settings = CompanySettings.query.first()
         if not settings:
             settings = CompanySettings(company_name="My Company")
             db.session.add(settings)
             db.session.commit()
         return settings
+
+
+# --- CACHE VERSION STAMPS ---
+class DataVersion(db.Model):
+    # One counter per table, bumped on every write (see app/cache.py)
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+# --- REPLICATION HEARTBEAT ---
+class ReplicaHeartbeat(db.Model):
+    # Written on the primary, read on the replica to measure lag (see app/replica.py)
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, nullable=False)
+
+
+# --- AUDIT LOG ---
+class AuditEvent(TenantScoped, db.Model):
+    # Written in batches by app/audit.py, never through the session. Actor
+    # and target are plain ids: the log outlives deleted employees.
+    __table_args__ = (
+        db.Index('ix_audit_event_company_id', 'company_id', 'id'),
+        db.Index('ix_audit_event_company_action', 'company_id', 'action', 'id'),
+        db.Index('ix_audit_event_company_actor', 'company_id', 'actor_id', 'id'),
+        db.Index('ix_audit_event_company_target', 'company_id', 'target_type', 'target_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Set when the action happens; replaying a spool file skips ids already stored
+    event_id = db.Column(db.String(32), unique=True, nullable=False)
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    actor_id = db.Column(db.Integer, nullable=True)
+    actor_email = db.Column(db.String(120), nullable=True)
+    action = db.Column(db.String(50), nullable=False)  # e.g. "leave.approved"
+    target_type = db.Column(db.String(30), nullable=True)
+    target_id = db.Column(db.Integer, nullable=True)
+    details = db.Column(db.Text, nullable=True)  # JSON
+    ip = db.Column(db.String(45), nullable=True)
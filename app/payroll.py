@@ -0,0 +1,137 @@
+"""Payroll register and payslip history.
+
+Register amounts are worked out in integer cents inside the database, using
+the same half-up rounding as ``monthly_pay()``, so the register total always
+equals the sum of the PayrollRecord rows a payroll run writes.
+"""
+from datetime import MAXYEAR, MINYEAR, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import Integer, cast, extract, func, insert
+
+from app import db
+from app.cache import cache_key, cached, data_version
+from app.models import Employee, Position, PayrollRecord
+from app.tenancy import current_tenant_id
+
+CENTS = Decimal('0.01')
+
+
+def monthly_pay(base_salary):
+    """Annual salary -> one month's pay, rounded half-up to the cent."""
+    return (Decimal(str(base_salary or 0)) / 12).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def cents_to_money(cents):
+    return (Decimal(int(cents or 0)) / 100).quantize(CENTS)
+
+
+def monthly_cents_column():
+    # round(salary / 12) in whole cents: floor((2 * cents + 12) / 24)
+    salary_cents = cast(func.round(Position.base_salary * 100), Integer)
+    return (salary_cents * 2 + 12) // 24
+
+
+def register_summary():
+    """Headcount and monthly payout of active, positioned staff per department.
+
+    One grouped query, cached until a position or employee row changes.
+    """
+    def load():
+        monthly = func.coalesce(func.sum(monthly_cents_column()), 0)
+        rows = db.session.query(Employee.department, func.count(Employee.id), monthly)\
+            .join(Position, Employee.position_id == Position.id)\
+            .filter(Employee.status == 'Active')\
+            .group_by(Employee.department)\
+            .order_by(Employee.department).all()
+
+        departments = [{'department': dept,
+                        'headcount': headcount,
+                        'monthly_payout': cents_to_money(cents)}
+                       for dept, headcount, cents in rows]
+        return {
+            'departments': departments,
+            'headcount': sum(d['headcount'] for d in departments),
+            'monthly_payout': cents_to_money(sum(cents for _, _, cents in rows)),
+        }
+
+    return cached(cache_key('payroll_register', data_version('position', 'employee')), load)
+
+
+def register_page(page, per_page=50):
+    """One page of the payroll ledger, position and last paid cycle included."""
+    last_cycle = db.session.query(PayrollRecord.month_year)\
+        .filter(PayrollRecord.employee_id == Employee.id)\
+        .order_by(PayrollRecord.date_processed.desc())\
+        .limit(1).correlate(Employee).scalar_subquery()
+
+    query = db.session.query(
+        Employee.id, Employee.full_name, Employee.email, Employee.status,
+        Employee.department, Position.title, Position.base_salary,
+        monthly_cents_column().label('monthly_cents'),
+        last_cycle.label('last_cycle'))\
+        .outerjoin(Position, Employee.position_id == Position.id)\
+        .order_by(Employee.full_name, Employee.id)
+    return query.paginate(page=page, per_page=per_page, error_out=False)
+
+
+def run_payroll(month_year):
+    """Write one PayrollRecord per active, positioned employee in a bulk insert.
+
+    Returns the number of records and the total paid.
+    """
+    rows = db.session.query(Employee.id, Position.base_salary)\
+        .join(Position, Employee.position_id == Position.id)\
+        .filter(Employee.status == 'Active').all()
+    # A bulk insert skips the flush that stamps company_id on new rows
+    company_id = current_tenant_id()
+    records = [{'employee_id': emp_id,
+                'amount_paid': monthly_pay(salary),
+                'month_year': month_year,
+                'company_id': company_id}
+               for emp_id, salary in rows]
+    if records:
+        db.session.execute(insert(PayrollRecord), records)
+    return len(records), sum((r['amount_paid'] for r in records), Decimal('0.00'))
+
+
+# --- PAYSLIP HISTORY ---
+
+# Years a payslip filter can name: the range below ends on 1 January of the next one
+PAYSLIP_YEARS = range(MINYEAR, MAXYEAR)
+
+
+def _year_range(year):
+    # A date range keeps the (employee_id, date_processed) index usable
+    if year not in PAYSLIP_YEARS:
+        raise ValueError(f'Year {year} is out of range.')
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+
+def payslip_history(employee_id, year=None, page=1, per_page=12):
+    """Paged payslips for one employee, newest first, optionally for one year."""
+    query = PayrollRecord.query.filter(PayrollRecord.employee_id == employee_id)
+    if year is not None:
+        start, end = _year_range(year)
+        query = query.filter(PayrollRecord.date_processed >= start,
+                             PayrollRecord.date_processed < end)
+    return query.order_by(PayrollRecord.date_processed.desc(), PayrollRecord.id.desc())\
+        .paginate(page=page, per_page=per_page, error_out=False)
+
+
+def payslip_year_totals(employee_id):
+    """[{'year', 'payslips', 'total'}] per calendar year, newest first, from one grouped query."""
+    year = extract('year', PayrollRecord.date_processed)
+    rows = db.session.query(year, func.count(PayrollRecord.id), func.sum(PayrollRecord.amount_paid))\
+        .filter(PayrollRecord.employee_id == employee_id)\
+        .group_by(year).order_by(year.desc()).all()
+    return [{'year': int(y), 'payslips': count, 'total': Decimal(str(total or 0)).quantize(CENTS)}
+            for y, count, total in rows]
+
+
+def payslips_for_year(employee_id, year):
+    start, end = _year_range(year)
+    return PayrollRecord.query.filter(PayrollRecord.employee_id == employee_id,
+                                      PayrollRecord.date_processed >= start,
+                                      PayrollRecord.date_processed < end)\
+        .order_by(PayrollRecord.date_processed).all()
@@ -0,0 +1,190 @@
+"""Client portfolios: which Manager looks after which client.
+
+Every client belongs to one account manager (``Client.assigned_manager_id``),
+an active employee with the Manager role. Clients whose manager left or
+changed role are *unassigned* until ``rebalance()`` or the owner hands them
+to someone.
+
+Workload numbers come from one grouped query over the
+``(company_id, assigned_manager_id, status)`` index, so the workload page
+costs the same with a hundred clients or a hundred thousand. Client lists
+are paged and load their manager in the same query.
+"""
+import click
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Client, Company, Employee
+from app.tenancy import tenant_scope
+
+ACCOUNT_MANAGER_ROLE = 'Manager'
+# Client ids per UPDATE ... WHERE id IN (...) when moving clients
+MOVE_BATCH_SIZE = 500
+
+
+def account_managers(department=None):
+    query = Employee.query.filter(Employee.role == ACCOUNT_MANAGER_ROLE,
+                                  Employee.status == 'Active')
+    if department:
+        query = query.filter(Employee.department == department)
+    return query.order_by(Employee.department, Employee.full_name)
+
+
+def _client_counts():
+    # Answered from the (company_id, assigned_manager_id, status) index alone
+    return select(
+        Client.assigned_manager_id.label('manager_id'),
+        func.count(Client.id).label('total'),
+        func.sum(case((Client.status == 'Active', 1), else_=0)).label('active'),
+    ).group_by(Client.assigned_manager_id).subquery()
+
+
+# --- 1. WORKLOAD ---
+
+
+def workload(department=None):
+    """Client counts per account manager, grouped by department.
+
+    Returns ``{'managers': [(Employee, active, total)], 'departments':
+    [{'department', 'managers', 'active', 'total'}], 'unassigned': n}``.
+    """
+    counts = _client_counts()
+    active = func.coalesce(counts.c.active, 0)
+    rows = db.session.query(Employee, active, func.coalesce(counts.c.total, 0))\
+        .outerjoin(counts, counts.c.manager_id == Employee.id)\
+        .filter(Employee.role == ACCOUNT_MANAGER_ROLE, Employee.status == 'Active')
+    if department:
+        rows = rows.filter(Employee.department == department)
+    managers = rows.order_by(Employee.department, active.desc(), Employee.full_name).all()
+
+    departments = {}
+    for employee, active_count, total in managers:
+        dept = departments.setdefault(employee.department, {
+            'department': employee.department, 'managers': 0, 'active': 0, 'total': 0})
+        dept['managers'] += 1
+        dept['active'] += active_count
+        dept['total'] += total
+    return {'managers': managers, 'departments': list(departments.values()),
+            'unassigned': unassigned_clients().count()}
+
+
+def unassigned_clients():
+    """Clients with no manager, or one who is no longer an active Manager."""
+    return Client.query.outerjoin(Employee, Employee.id == Client.assigned_manager_id)\
+        .filter(or_(Employee.id.is_(None), Employee.role != ACCOUNT_MANAGER_ROLE,
+                    Employee.status != 'Active'))
+
+
+def least_loaded_manager(department=None):
+    """The account manager with the fewest active clients, or None."""
+    counts = _client_counts()
+    query = db.session.query(Employee)\
+        .outerjoin(counts, counts.c.manager_id == Employee.id)\
+        .filter(Employee.role == ACCOUNT_MANAGER_ROLE, Employee.status == 'Active')
+    if department:
+        query = query.filter(Employee.department == department)
+    return query.order_by(func.coalesce(counts.c.active, 0), Employee.id).first()
+
+
+def client_page(page, per_page, manager_id=None, status=None):
+    """A page of clients with their manager loaded in the same query."""
+    query = Client.query.options(joinedload(Client.employee))
+    if manager_id:
+        query = query.filter(Client.assigned_manager_id == manager_id)
+    if status:
+        query = query.filter(Client.status == status)
+    return query.order_by(Client.company_name, Client.id)\
+        .paginate(page=page, per_page=per_page, error_out=False)
+
+
+# --- 2. ASSIGNMENT ---
+
+
+def assign_client(client, manager):
+    """Hand client to manager; the caller commits."""
+    if manager.role != ACCOUNT_MANAGER_ROLE or manager.status != 'Active':
+        raise ValueError(f'{manager.full_name} is not an active Manager.')
+    client.assigned_manager_id = manager.id
+
+
+def _plan_moves(loads, clients):
+    """[(client_id, manager_id)] that evens out active clients per manager.
+
+    ``loads`` is {manager_id: [client_id, ...]}; ``clients`` are unassigned
+    client ids. Each manager ends with the average, rounded up for the most
+    loaded ones, so as few clients as possible change hands.
+    """
+    total = sum(len(ids) for ids in loads.values()) + len(clients)
+    base, extra = divmod(total, len(loads))
+    by_load = sorted(loads, key=lambda m: (-len(loads[m]), m))
+    target = {m: base + (1 if i < extra else 0) for i, m in enumerate(by_load)}
+
+    # Over-target managers give up their newest clients
+    spare = list(clients)
+    for manager_id in by_load:
+        ids = sorted(loads[manager_id])
+        spare.extend(ids[target[manager_id]:])
+    moves = []
+    for manager_id in reversed(by_load):
+        need = target[manager_id] - min(len(loads[manager_id]), target[manager_id])
+        moves.extend((client_id, manager_id) for client_id in spare[:need])
+        spare = spare[need:]
+    return moves
+
+
+def rebalance(department=None, dry_run=False):
+    """Even out active clients across account managers; returns the moves.
+
+    Without a department, unassigned active clients are shared out too.
+    Inactive clients stay where they are.
+    """
+    managers = [m.id for m in account_managers(department).with_entities(Employee.id)]
+    if not managers:
+        return []
+    in_scope = Client.assigned_manager_id.in_(managers)
+    if not department:
+        orphaned = select(Employee.id).where(Employee.id == Client.assigned_manager_id,
+                                             Employee.role == ACCOUNT_MANAGER_ROLE,
+                                             Employee.status == 'Active').exists()
+        in_scope = or_(in_scope, ~orphaned)
+    rows = db.session.query(Client.id, Client.assigned_manager_id)\
+        .filter(and_(Client.status == 'Active', in_scope)).all()
+
+    loads = {manager_id: [] for manager_id in managers}
+    unassigned = []
+    for client_id, manager_id in rows:
+        (loads[manager_id] if manager_id in loads else unassigned).append(client_id)
+    moves = _plan_moves(loads, unassigned)
+    if dry_run or not moves:
+        return moves
+
+    by_manager = {}
+    for client_id, manager_id in moves:
+        by_manager.setdefault(manager_id, []).append(client_id)
+    # Bulk UPDATEs skip the flush; app.cache still bumps the client version
+    # for them, so cached client pages and workloads refresh
+    for manager_id, client_ids in by_manager.items():
+        for start in range(0, len(client_ids), MOVE_BATCH_SIZE):
+            db.session.execute(update(Client)
+                               .where(Client.id.in_(client_ids[start:start + MOVE_BATCH_SIZE]))
+                               .values(assigned_manager_id=manager_id))
+    db.session.commit()
+    return moves
+
+
+@click.command('rebalance-clients')
+@click.option('--department', help='Only move clients between managers in this department.')
+@click.option('--dry-run', is_flag=True, help='Show how many clients would move.')
+def rebalance_clients_command(department, dry_run):
+    """Spread active clients evenly over the active Managers of each company."""
+    verb = 'would move' if dry_run else 'moved'
+    for company in Company.query.order_by(Company.id).all():
+        # Clients only ever move between managers of the same company
+        with tenant_scope(company.id):
+            moves = rebalance(department, dry_run=dry_run)
+        click.echo(f'{company.slug}: {len(moves)} client(s) {verb}.')
+
+
+def init_portfolio(app):
+    app.cli.add_command(rebalance_clients_command)
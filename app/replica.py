@@ -0,0 +1,159 @@
+"""Read-replica routing for heavy read-only pages.
+
+Routes decorated with ``@use_replica`` serve their GET requests from the
+``replica`` bind (``REPLICA_DATABASE_URL``). Everything else, and any write
+made while serving such a request, goes to the primary, so the clock-in and
+clock-out path never waits on reporting queries.
+
+Staleness safeguards:
+
+* read-after-write: a user who wrote something in the last
+  ``REPLICA_STICKY_SECONDS`` reads from the primary, so they always see
+  their own changes;
+* lag: the replica is only used while it answers and is less than
+  ``REPLICA_MAX_LAG_SECONDS`` behind. Lag comes from the WAL replay position
+  on a PostgreSQL standby, or from the ``replica_heartbeat`` row otherwise.
+  It is re-checked at most every ``REPLICA_CHECK_INTERVAL`` seconds.
+
+Locally, with a second SQLite file:
+
+    export REPLICA_DATABASE_URL=sqlite:///hrms-replica.db
+    flask replica-sync    # copy the primary; run it from cron to keep it fresh
+"""
+from datetime import datetime
+from functools import wraps
+import threading
+import time
+
+import click
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import UpdateBase, func, insert, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+
+REPLICA_BIND = 'replica'
+# Flask session key: reads go to the primary until this timestamp
+_STICKY_KEY = '_primary_until'
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """db.session that sends a request's reads to the replica when allowed."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                _note_write(self._db.engines)
+            elif g.get('db_bind') == REPLICA_BIND:
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _note_write(engines):
+    # The rest of this request, and this user's next few, read from the primary
+    g.db_bind = None
+    if REPLICA_BIND in engines and not g.get('_db_wrote'):
+        g._db_wrote = True
+        session[_STICKY_KEY] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+
+
+# --- 1. REPLICA HEALTH ---
+
+
+def write_heartbeat(engine):
+    from app.models import ReplicaHeartbeat
+    table = ReplicaHeartbeat.__table__
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        if conn.execute(update(table).where(table.c.id == 1).values(beat_at=now)).rowcount == 0:
+            conn.execute(insert(table).values(id=1, beat_at=now))
+
+
+def replica_lag(engine):
+    """Seconds the replica is behind the primary, or None if unknown."""
+    from app.models import ReplicaHeartbeat
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            lag = conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END")).scalar()
+            if lag is not None:
+                return float(lag)
+        beat_at = conn.execute(select(func.max(ReplicaHeartbeat.beat_at))).scalar()
+    if beat_at is None:
+        return None
+    return max((datetime.utcnow() - beat_at).total_seconds(), 0.0)
+
+
+def replica_healthy(engine):
+    """True when the replica answers and is within REPLICA_MAX_LAG_SECONDS."""
+    config = current_app.config
+    now = time.monotonic()
+    with _health_lock:
+        checked_at, healthy = _health.get(engine.url, (None, False))
+    if checked_at is not None and now - checked_at < config['REPLICA_CHECK_INTERVAL']:
+        return healthy
+
+    try:
+        lag = replica_lag(engine)
+        healthy = lag is not None and lag <= config['REPLICA_MAX_LAG_SECONDS']
+    except SQLAlchemyError as exc:
+        current_app.logger.warning('Replica unavailable, reading from primary: %s', exc)
+        healthy = False
+    with _health_lock:
+        _health[engine.url] = (now, healthy)
+    return healthy
+
+
+def replica_allowed():
+    engines = current_app.extensions['sqlalchemy'].engines
+    if REPLICA_BIND not in engines:
+        return False
+    if session.get(_STICKY_KEY, 0) > time.time():
+        return False
+    return replica_healthy(engines[REPLICA_BIND])
+
+
+# --- 2. PER-ROUTE DECLARATION ---
+
+
+def use_replica(f):
+    """Serve this route's GET requests from the replica when it is fresh enough."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.method in ('GET', 'HEAD') and replica_allowed():
+            g.db_bind = REPLICA_BIND
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# --- 3. LOCAL TESTING ---
+
+
+@click.command('replica-sync')
+def replica_sync_command():
+    """Copy the primary SQLite database to the replica file."""
+    engines = current_app.extensions['sqlalchemy'].engines
+    if REPLICA_BIND not in engines:
+        raise click.ClickException('Set REPLICA_DATABASE_URL first.')
+    primary, replica = engines[None], engines[REPLICA_BIND]
+    if primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise click.ClickException('replica-sync only copies SQLite files; '
+                                   'use streaming replication for PostgreSQL.')
+
+    write_heartbeat(primary)
+    source, target = primary.raw_connection(), replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        source.close()
+        target.close()
+    with _health_lock:
+        _health.pop(replica.url, None)
+    click.echo(f'Replica {replica.url.database} is up to date.')
+
+
+def init_replica(app):
+    app.cli.add_command(replica_sync_command)
@@ -0,0 +1,242 @@
+"""Full-text search over employees, clients and positions.
+
+Every searchable row has one document in ``search_index`` (kind, ref_id,
+company_id, title, subtitle, detail), and queries only match the current
+company's documents:
+
+* SQLite: an FTS5 virtual table with prefix indexes, ranked by bm25().
+* PostgreSQL: a plain table with a weighted tsvector column and a GIN index,
+  ranked by ts_rank().
+
+Documents are written in the same transaction as the row they describe (an
+``after_flush`` listener), so search never lags behind the data. Build or
+rebuild the index with ``flask init-db`` / ``flask search-reindex``.
+"""
+from itertools import chain
+import re
+
+import click
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from app import db
+
+INDEX_TABLE = 'search_index'
+
+# kind -> (source table, title, subtitle, detail) columns
+SOURCES = {
+    'employee': ('employee', 'full_name', 'email', 'department'),
+    'client': ('client', 'company_name', 'contact_person', 'email'),
+    'position': ('position', 'title', 'department', None),
+}
+
+_ready = {}
+
+
+# --- 1. INDEX DDL ---
+
+
+def create_search_index(engine, drop=False):
+    with engine.begin() as conn:
+        if drop:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS {INDEX_TABLE}')
+        if engine.dialect.name == 'postgresql':
+            conn.exec_driver_sql(f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+                    kind VARCHAR(20) NOT NULL,
+                    ref_id INTEGER NOT NULL,
+                    company_id INTEGER,
+                    title TEXT,
+                    subtitle TEXT,
+                    detail TEXT,
+                    tsv tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                        setweight(to_tsvector('simple', coalesce(subtitle, '')), 'B') ||
+                        setweight(to_tsvector('simple', coalesce(detail, '')), 'C')) STORED,
+                    PRIMARY KEY (kind, ref_id))""")
+            conn.exec_driver_sql(
+                f'CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_tsv ON {INDEX_TABLE} USING GIN (tsv)')
+        else:
+            # company_id holds tokens like "c3"; search() checks it per row
+            # on the capped candidates
+            conn.exec_driver_sql(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5(
+                    kind UNINDEXED, ref_id UNINDEXED, company_id, title, subtitle, detail,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3 4')""")
+    _ready.pop(engine.url, None)
+
+
+def index_ready(connection):
+    # Writes must keep working on a database that has not run init-db yet
+    url = connection.engine.url
+    if url not in _ready:
+        _ready[url] = inspect(connection).has_table(INDEX_TABLE)
+    return _ready[url]
+
+
+def ensure_search_index(engine):
+    """Create the index, or rebuild it if it predates the company_id column."""
+    create_search_index(engine)
+    with engine.connect() as conn:
+        columns = {c['name'] for c in inspect(conn).get_columns(INDEX_TABLE)}
+    if 'company_id' not in columns:
+        rebuild_search_index(engine)
+
+
+def _company_token(engine):
+    # The value stored in (and matched against) the company_id column
+    if engine.dialect.name == 'postgresql':
+        return 'company_id'
+    return "'c' || coalesce(company_id, '')"
+
+
+def rebuild_search_index(engine):
+    """Drop and refill the whole index with one INSERT ... SELECT per source."""
+    create_search_index(engine, drop=True)
+    company = _company_token(engine)
+    with engine.begin() as conn:
+        for kind, (table, title, subtitle, detail) in SOURCES.items():
+            conn.exec_driver_sql(
+                f"INSERT INTO {INDEX_TABLE} (kind, ref_id, company_id, title, subtitle, detail) "
+                f"SELECT '{kind}', id, {company}, {title}, {subtitle or 'NULL'}, "
+                f"{detail or 'NULL'} FROM {table}")
+        if engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql(f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}) VALUES ('optimize')")
+    _ready.pop(engine.url, None)
+
+
+# --- 2. KEEPING THE INDEX IN SYNC ---
+
+
+def _company_value(dialect, company_id):
+    if dialect.name == 'postgresql':
+        return company_id
+    return f"c{'' if company_id is None else company_id}"
+
+
+def _document(dialect, kind, obj):
+    _, title, subtitle, detail = SOURCES[kind]
+    return {
+        'kind': kind,
+        'ref_id': obj.id,
+        'company_id': _company_value(dialect, obj.company_id),
+        'title': getattr(obj, title),
+        'subtitle': getattr(obj, subtitle) if subtitle else None,
+        'detail': getattr(obj, detail) if detail else None,
+    }
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_after_flush(session, flush_context):
+    changed, removed = [], []
+    for obj in chain(session.new, session.dirty):
+        kind = getattr(obj, '__tablename__', None)
+        if kind in SOURCES and obj.id is not None:
+            changed.append((kind, obj))
+    for obj in session.deleted:
+        kind = getattr(obj, '__tablename__', None)
+        if kind in SOURCES:
+            removed.append((kind, obj.id))
+    if not changed and not removed:
+        return
+
+    conn = session.connection()
+    if not index_ready(conn):
+        return
+    delete = text(f'DELETE FROM {INDEX_TABLE} WHERE kind = :kind AND ref_id = :ref_id')
+    keys = [{'kind': k, 'ref_id': ref_id} for k, ref_id in removed]
+    keys += [{'kind': k, 'ref_id': obj.id} for k, obj in changed]
+    conn.execute(delete, keys)
+    if changed:
+        conn.execute(text(f'INSERT INTO {INDEX_TABLE} '
+                          '(kind, ref_id, company_id, title, subtitle, detail) '
+                          'VALUES (:kind, :ref_id, :company_id, :title, :subtitle, :detail)'),
+                     [_document(conn.dialect, kind, obj) for kind, obj in changed])
+
+
+# --- 3. QUERYING ---
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def search(query, kinds, limit=10, candidates=300):
+    """Prefix-match every word of query; best matches first.
+
+    Two capped candidate sets are ranked: up to ``candidates`` rows whose
+    title matches every word, then up to ``candidates`` rows matching in
+    any column. Title hits come first, each set in bm25/ts_rank order. A
+    two-letter prefix matching tens of thousands of rows then costs about
+    as much as a precise query, and a title hit is not lost behind weaker
+    matches. Single characters are ignored: they are not in the prefix
+    index. Inside a request only the current company's rows match.
+    """
+    from app.tenancy import current_tenant_id
+    tokens = [t for t in _TOKEN.findall(query.lower()) if len(t) >= 2][:6]
+    if not tokens or not kinds or limit < 1:
+        return []
+    conn = db.session.connection()
+    if not index_ready(conn):
+        return []
+
+    params = {'limit': limit, 'candidates': candidates}
+    kind_params = []
+    for i, kind in enumerate(kinds):
+        params[f'kind{i}'] = kind
+        kind_params.append(f':kind{i}')
+    kind_filter = f"kind IN ({', '.join(kind_params)})"
+    company_id = current_tenant_id()
+
+    if conn.dialect.name == 'postgresql':
+        if company_id is not None:
+            params['company_id'] = company_id
+            kind_filter += ' AND company_id = :company_id'
+        # Weight A is the title
+        params['title_q'] = ' & '.join(f'{t}:*A' for t in tokens)
+        params['q'] = ' & '.join(f'{t}:*' for t in tokens)
+        tier = (f"SELECT kind, ref_id, title, subtitle, detail, {{tier}} AS tier, "
+                f"ts_rank(tsv, query) AS score "
+                f"FROM {INDEX_TABLE}, to_tsquery('simple', {{q}}) AS query "
+                f"WHERE tsv @@ query AND {kind_filter} LIMIT :candidates")
+        # A title hit found by both tiers keeps its first tier
+        sql = (f"SELECT DISTINCT ON (kind, ref_id) * FROM ("
+               f"({tier.format(tier=0, q=':title_q')}) UNION ALL "
+               f"({tier.format(tier=1, q=':q')})) AS candidates ORDER BY kind, ref_id, tier")
+        sql = (f"SELECT kind, ref_id, title, subtitle, detail FROM ({sql}) AS ranked "
+               f"ORDER BY tier, score DESC LIMIT :limit")
+    else:
+        if company_id is not None:
+            # A row check on the capped scan: ANDing the company token into
+            # the MATCH walks that company's whole doclist on every query
+            params['company_id'] = _company_value(conn.dialect, company_id)
+            kind_filter += ' AND company_id = :company_id'
+        # Words only match the text columns, never the company token
+        words = ' '.join(f'"{t}"*' for t in tokens)
+        params['title_q'] = f'title : ({words})'
+        params['q'] = f'{{title subtitle detail}} : ({words})'
+        # Column weights: a title hit outranks an email or department hit
+        tier = (f"SELECT * FROM (SELECT kind, ref_id, title, subtitle, detail, "
+                f"{{tier}} AS tier, bm25({INDEX_TABLE}, 0, 0, 0, 10.0, 4.0, 1.0) AS score "
+                f"FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH {{q}} AND {kind_filter} "
+                f"LIMIT :candidates)")
+        # A title hit found by both tiers keeps its first (min) tier
+        sql = (f"SELECT kind, ref_id, title, subtitle, detail FROM ("
+               f"{tier.format(tier=0, q=':title_q')} UNION ALL "
+               f"{tier.format(tier=1, q=':q')}) "
+               f"GROUP BY kind, ref_id ORDER BY min(tier), min(score) LIMIT :limit")
+
+    rows = conn.execute(text(sql), params).all()
+    return [{'kind': kind, 'id': int(ref_id), 'title': title,
+             'subtitle': subtitle, 'detail': detail}
+            for kind, ref_id, title, subtitle, detail in rows]
+
+
+@click.command('search-reindex')
+def search_reindex_command():
+    """Rebuild the full-text search index from scratch."""
+    rebuild_search_index(db.engine)
+    click.echo('Search index rebuilt.')
+
+
+def init_search(app):
+    app.cli.add_command(search_reindex_command)
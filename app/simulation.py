@@ -0,0 +1,234 @@
+"""Payroll what-if simulation (needs the optional ``numpy`` package).
+
+Active headcount is loaded once into a matrix of (department, position)
+rows, holding annual salary in cents and headcount. It is cached until an
+employee or position changes. Each scenario applies its adjustments to its
+own row of an (scenarios x rows) array using boolean masks. Payouts for
+every scenario are then summed per department in one matrix product.
+Nothing is written to the database.
+
+A scenario:
+
+    {"name": "IT +8%, 20 more engineers",
+     "adjustments": [
+         {"department": "IT", "raise_pct": 8},
+         {"department": "IT", "position": "Software Engineer", "add_headcount": 20}]}
+
+An adjustment selects rows by ``department``, ``position`` (title) and/or
+``position_id``, and all the given selectors must match. It then applies
+any of ``raise_pct``, ``raise_amount`` (annual, per head) and
+``add_headcount`` (added to each matched row). Adjustments apply in order.
+Each effect has a bound (``LIMITS``), and so do a scenario's salaries and
+headcount, which keeps every sum inside int64. Amounts use the same cent rounding as ``monthly_pay()``, so an empty
+scenario matches the payroll register exactly.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+import math
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.cache import cache_key, cached, data_version
+from app.models import Employee, Position
+from app.payroll import cents_to_money
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+SELECTORS = ('department', 'position', 'position_id')
+EFFECTS = ('raise_pct', 'raise_amount', 'add_headcount')
+# Largest size of each effect, either way: percent, annual amount, heads
+LIMITS = {'raise_pct': 1000, 'raise_amount': 10_000_000, 'add_headcount': 1_000_000}
+# A scenario's largest annual salary (in cents) and total headcount
+MAX_SALARY_CENTS = 10 ** 11
+MAX_HEADCOUNT = 10_000_000
+
+
+class ScenarioError(ValueError):
+    """A scenario in the request is malformed; the message says why."""
+
+
+def _to_cents(amount):
+    return int((Decimal(str(amount or 0)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def load_matrix():
+    """The cached (department, position) matrix as read-only NumPy arrays."""
+    def load():
+        counts = db.session.query(Employee.department, Employee.position_id, func.count(Employee.id))\
+            .filter(Employee.status == 'Active', Employee.position_id.isnot(None))\
+            .group_by(Employee.department, Employee.position_id).all()
+        positions = {p.id: p for p in db.session.query(
+            Position.id, Position.title, Position.department, Position.base_salary)}
+
+        headcount = {(dept, pos_id): n for dept, pos_id, n in counts if pos_id in positions}
+        # Every position can be hired into, even if nobody holds it today
+        for pos in positions.values():
+            headcount.setdefault((pos.department, pos.id), 0)
+        keys = sorted(headcount, key=lambda k: (k[0], positions[k[1]].title))
+        departments = sorted({dept for dept, _ in keys})
+        dept_index = {dept: i for i, dept in enumerate(departments)}
+
+        matrix = {
+            'department': np.array([dept for dept, _ in keys], dtype=str),
+            'dept_index': np.array([dept_index[dept] for dept, _ in keys], dtype=np.int64),
+            'position_id': np.array([pos_id for _, pos_id in keys], dtype=np.int64),
+            'title': np.array([positions[pos_id].title for _, pos_id in keys], dtype=str),
+            'salary_cents': np.array([_to_cents(positions[pos_id].base_salary) for _, pos_id in keys],
+                                     dtype=np.int64),
+            'headcount': np.array([headcount[k] for k in keys], dtype=np.int64),
+        }
+        # Shared between requests: make accidental in-place edits fail loudly
+        for array in matrix.values():
+            array.setflags(write=False)
+        matrix['departments'] = departments
+        return matrix
+
+    return cached(cache_key('payroll_matrix', data_version('position', 'employee')), load)
+
+
+# --- 1. VALIDATION ---
+
+
+def _number(adjustment, name, integer=False):
+    value = adjustment[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ScenarioError(f'{name} must be a number.')
+    # NaN and infinity arrive as floats; they compare false with any bound
+    if not math.isfinite(value) or abs(value) > LIMITS[name]:
+        raise ScenarioError(f'{name} must be between -{LIMITS[name]} and {LIMITS[name]}.')
+    if integer and int(value) != value:
+        raise ScenarioError(f'{name} must be a whole number.')
+    return int(value) if integer else value
+
+
+def _check_selectors(adjustment, scenario_no):
+    for name in ('department', 'position'):
+        if not isinstance(adjustment.get(name, ''), str):
+            raise ScenarioError(f'Scenario {scenario_no}: {name} must be a string.')
+    position_id = adjustment.get('position_id', 0)
+    if isinstance(position_id, bool) or not isinstance(position_id, int):
+        raise ScenarioError(f'Scenario {scenario_no}: position_id must be a whole number.')
+
+
+def _check(scenarios):
+    if not isinstance(scenarios, list) or not scenarios:
+        raise ScenarioError('Send {"scenarios": [...]} with at least one scenario.')
+    limit = current_app.config['SIMULATION_MAX_SCENARIOS']
+    if len(scenarios) > limit:
+        raise ScenarioError(f'At most {limit} scenarios per request.')
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict) or not isinstance(scenario.get('adjustments', []), list):
+            raise ScenarioError(f'Scenario {i + 1}: expected {{"name": ..., "adjustments": [...]}}.')
+        for adjustment in scenario.get('adjustments', []):
+            if not isinstance(adjustment, dict):
+                raise ScenarioError(f'Scenario {i + 1}: each adjustment must be an object.')
+            unknown = set(adjustment) - set(SELECTORS) - set(EFFECTS)
+            if unknown:
+                raise ScenarioError(f'Scenario {i + 1}: unknown field(s) {", ".join(sorted(unknown))}.')
+            if not set(adjustment) & set(EFFECTS):
+                raise ScenarioError(f'Scenario {i + 1}: an adjustment needs one of {", ".join(EFFECTS)}.')
+            _check_selectors(adjustment, i + 1)
+            for name in EFFECTS:
+                if name in adjustment:
+                    _number(adjustment, name, integer=name == 'add_headcount')
+
+
+# --- 2. SIMULATION ---
+
+
+def _mask(matrix, adjustment, masks):
+    key = tuple(adjustment.get(name) for name in SELECTORS)
+    if key not in masks:
+        department, title, position_id = key
+        mask = np.ones(len(matrix['headcount']), dtype=bool)
+        if department is not None:
+            mask &= matrix['department'] == department
+        if title is not None:
+            mask &= matrix['title'] == title
+        if position_id is not None:
+            mask &= matrix['position_id'] == position_id
+        if not mask.any():
+            selected = ', '.join(f'{n}={v!r}' for n, v in zip(SELECTORS, key) if v is not None)
+            raise ScenarioError(f'Nothing matches {selected}.')
+        masks[key] = mask
+    return masks[key]
+
+
+def _totals(matrix, monthly_cents, headcount, dept_monthly, dept_headcount):
+    return {
+        'headcount': int(headcount),
+        'monthly_payout': str(cents_to_money(monthly_cents)),
+        'annual_payout': str(cents_to_money(monthly_cents * 12)),
+        'departments': [{
+            'department': dept,
+            'headcount': dept_headcount[j],
+            'monthly_payout': str(cents_to_money(dept_monthly[j])),
+            'annual_payout': str(cents_to_money(dept_monthly[j] * 12)),
+        } for j, dept in enumerate(matrix['departments'])],
+    }
+
+
+def simulate(scenarios):
+    """Projected monthly and annual payouts per department for each scenario.
+
+    Row 0 of the working arrays is the unchanged baseline.
+    """
+    _check(scenarios)
+    matrix = load_matrix()
+    rows = len(matrix['headcount'])
+    salary = np.tile(matrix['salary_cents'], (len(scenarios) + 1, 1))
+    headcount = np.tile(matrix['headcount'], (len(scenarios) + 1, 1))
+
+    masks = {}
+    for i, scenario in enumerate(scenarios, start=1):
+        for adjustment in scenario.get('adjustments', []):
+            mask = _mask(matrix, adjustment, masks)
+            if 'raise_pct' in adjustment:
+                # Whole basis points keep the rounding exact: half-up to the cent
+                bp = round(_number(adjustment, 'raise_pct') * 100)
+                salary[i, mask] = (salary[i, mask] * (10000 + bp) * 2 + 10000) // 20000
+            if 'raise_amount' in adjustment:
+                salary[i, mask] += _to_cents(_number(adjustment, 'raise_amount'))
+            if 'add_headcount' in adjustment:
+                headcount[i, mask] += _number(adjustment, 'add_headcount', integer=True)
+            # After every adjustment, so the next one cannot overflow either
+            if (np.abs(salary[i]).max() > MAX_SALARY_CENTS
+                    or np.abs(headcount[i]).sum() > MAX_HEADCOUNT):
+                raise ScenarioError(f'Scenario {i}: salaries above '
+                                    f'{cents_to_money(MAX_SALARY_CENTS)} a year or more than '
+                                    f'{MAX_HEADCOUNT} people are out of range.')
+        if (salary[i] < 0).any() or (headcount[i] < 0).any():
+            raise ScenarioError(f'Scenario {i}: salaries and headcount cannot go below zero.')
+
+    # Same rounding as monthly_pay(): round(annual / 12) in whole cents
+    monthly = (salary * 2 + 12) // 24 * headcount
+    to_department = np.zeros((rows, len(matrix['departments'])), dtype=np.int64)
+    to_department[np.arange(rows), matrix['dept_index']] = 1
+    dept_monthly = (monthly @ to_department).tolist()
+    dept_headcount = (headcount @ to_department).tolist()
+    totals = monthly.sum(axis=1).tolist()
+    heads = headcount.sum(axis=1).tolist()
+
+    baseline = _totals(matrix, totals[0], heads[0], dept_monthly[0], dept_headcount[0])
+    results = []
+    for i, scenario in enumerate(scenarios, start=1):
+        result = _totals(matrix, totals[i], heads[i], dept_monthly[i], dept_headcount[i])
+        result['name'] = scenario.get('name') or f'Scenario {i}'
+        result['monthly_change'] = str(cents_to_money(totals[i] - totals[0]))
+        results.append(result)
+    return {'baseline': baseline, 'scenarios': results}
+
+
+def describe_matrix():
+    """Departments and positions a scenario can select, with today's headcount."""
+    matrix = load_matrix()
+    return [{'department': dept, 'position': title, 'position_id': pos_id, 'headcount': n,
+             'base_salary': str(cents_to_money(salary))}
+            for dept, title, pos_id, n, salary in zip(
+                matrix['department'].tolist(), matrix['title'].tolist(),
+                matrix['position_id'].tolist(), matrix['headcount'].tolist(),
+                matrix['salary_cents'].tolist())]
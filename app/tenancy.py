@@ -0,0 +1,168 @@
+"""Multi-company tenancy: one deployment hosting several companies.
+
+Every tenant-owned model mixes in ``TenantScoped`` and so carries a
+``company_id``. Each request resolves its company, in this order:
+
+1. the ``TENANT_HEADER`` header (``X-Company: acme``), which a reverse
+   proxy in front of the app should set or strip;
+2. the subdomain under ``TENANT_BASE_DOMAIN`` (``acme.hrms.example.com``);
+3. the ``TENANT_DEFAULT`` company.
+
+Its id is kept in ``g.tenant_id`` for the rest of the request, and:
+
+* every ORM SELECT, UPDATE and DELETE gets ``company_id = <tenant>`` added
+  for each tenant model it touches, including joins, subqueries and
+  relationship loads (a ``do_orm_execute`` listener with
+  ``with_loader_criteria``);
+* new rows are stamped with the tenant before they are flushed;
+* cache keys and data version stamps are per tenant (app/cache.py), as are
+  search results and live events.
+
+The composite indexes all lead with ``company_id``, so a tenant's queries
+only read that tenant's rows. Their cost depends on the tenant's size, not
+on how many tenants share the database (``benchmarks.bench_tenancy``).
+
+Outside a request (CLI commands, scripts) nothing is scoped unless the code
+runs inside ``tenant_scope(company_id)``. Pass the execution option
+``all_tenants=True`` to read across companies on purpose.
+"""
+from contextlib import contextmanager
+
+import click
+from flask import abort, current_app, g, has_app_context, request
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app import db
+from app.models import Company, CompanySettings, TenantScoped
+
+# (database, slug) -> company id; companies are not renamed or removed
+# while the app runs
+_companies = {}
+
+
+def current_tenant_id():
+    return g.get('tenant_id') if has_app_context() else None
+
+
+@contextmanager
+def tenant_scope(company_id):
+    """Scope queries and new rows to company_id outside a request."""
+    previous = g.get('tenant_id')
+    g.tenant_id = company_id
+    try:
+        yield
+    finally:
+        g.tenant_id = previous
+
+
+def tenant_models():
+    return [mapper.class_ for mapper in db.Model.registry.mappers
+            if issubclass(mapper.class_, TenantScoped)]
+
+
+# --- 1. AUTOMATIC SCOPING ---
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _scope_to_tenant(state):
+    tenant_id = current_tenant_id()
+    if tenant_id is None or state.execution_options.get('all_tenants', False):
+        return
+    # Relationship and deferred-column loads inherit the criteria from the
+    # query that loaded the parent
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(with_loader_criteria(
+            TenantScoped, lambda cls: cls.company_id == tenant_id, include_aliases=True))
+
+
+@event.listens_for(Session, 'before_flush')
+def _stamp_new_rows(session, flush_context, instances):
+    tenant_id = current_tenant_id()
+    if tenant_id is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, TenantScoped) and obj.company_id is None:
+            obj.company_id = tenant_id
+
+
+# --- 2. RESOLVING THE TENANT ---
+
+
+def company_id_for(slug):
+    key = (db.engine.url, slug)
+    if key not in _companies:
+        company_id = db.session.query(Company.id).filter(Company.slug == slug).scalar()
+        if company_id is None:
+            return None
+        _companies[key] = company_id
+    return _companies[key]
+
+
+def _requested_slug():
+    config = current_app.config
+    slug = request.headers.get(config['TENANT_HEADER'])
+    if slug:
+        return slug.strip().lower()
+    base = config.get('TENANT_BASE_DOMAIN')
+    host = request.host.split(':', 1)[0].lower()
+    if base and host.endswith('.' + base):
+        subdomain = host[:-len(base) - 1]
+        if subdomain and '.' not in subdomain and subdomain != 'www':
+            return subdomain
+    return config.get('TENANT_DEFAULT')
+
+
+def resolve_tenant():
+    slug = _requested_slug()
+    company_id = company_id_for(slug) if slug else None
+    if company_id is None:
+        abort(404)
+    g.tenant_id = company_id
+
+
+# --- 3. SETUP AND MIGRATION ---
+
+
+def ensure_default_company():
+    """Create the TENANT_DEFAULT company and give it every row without one.
+
+    Run by ``flask init-db``, so a single-company database upgrades in place.
+    """
+    slug = current_app.config.get('TENANT_DEFAULT') or 'main'
+    company = Company.query.filter_by(slug=slug).first()
+    if company is None:
+        settings = CompanySettings.query.execution_options(all_tenants=True)\
+            .filter(CompanySettings.company_id.is_(None)).first()
+        company = Company(slug=slug, name=settings.company_name if settings else 'My Company')
+        db.session.add(company)
+        db.session.commit()
+    for model in tenant_models():
+        db.session.execute(update(model.__table__).where(model.__table__.c.company_id.is_(None))
+                           .values(company_id=company.id))
+    db.session.commit()
+    return company
+
+
+@click.command('create-company')
+@click.argument('slug')
+@click.option('--name', help='Display name (defaults to the slug).')
+def create_company_command(slug, name):
+    """Add a company, reachable at <slug>.TENANT_BASE_DOMAIN or X-Company: <slug>."""
+    slug = slug.strip().lower()
+    if Company.query.filter_by(slug=slug).first():
+        raise click.ClickException(f'Company {slug} already exists.')
+    company = Company(slug=slug, name=name or slug)
+    db.session.add(company)
+    db.session.flush()
+    with tenant_scope(company.id):
+        db.session.add(CompanySettings(company_name=company.name))
+        db.session.commit()
+    click.echo(f'Company {slug} created (id {company.id}).')
+
+
+def init_tenancy(app):
+    app.before_request(resolve_tenant)
+    app.cli.add_command(create_company_command)
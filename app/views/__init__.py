@@ -0,0 +1,10 @@
+# Each blueprint module only imports the forms and helpers it needs, so
+# registering them stays cheap at boot.
+BLUEPRINT_MODULES = ['main', 'auth', 'leave', 'attendance', 'finance', 'admin', 'search', 'events']
+
+
+def register_blueprints(app):
+    from importlib import import_module
+    for name in BLUEPRINT_MODULES:
+        module = import_module(f'app.views.{name}')
+        app.register_blueprint(module.bp)
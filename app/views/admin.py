@@ -0,0 +1,369 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request, abort, jsonify
+from flask import current_app
+from app import audit, db, events
+from app.cache import fingerprinted_filename
+from app.decorators import owner_required, hr_required, manager_required
+from app.forms import PositionForm, ClientForm
+from app.hierarchy import (can_manage, chain_of_command, direct_report_counts, reports_under,
+                           would_create_cycle)
+from app.models import Employee, Attendance, Client, Position, LeaveRequest, CompanySettings
+from app.portfolio import (account_managers, assign_client, client_page, least_loaded_manager,
+                           rebalance, workload)
+from app.replica import use_replica
+from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
+from datetime import date
+import os
+
+bp = Blueprint('admin', __name__)
+
+# --- COMPANY RECORDS & APPROVALS (HR) ---
+
+
+@bp.route("/admin/records")
+@login_required
+@hr_required
+@use_replica
+def admin_records():
+    pending_users = Employee.query.filter_by(status='Pending').all()
+    
+    all_attendance = Attendance.query.order_by(
+        Attendance.check_in.desc()).limit(50).all()
+    all_leaves = LeaveRequest.query.order_by(
+        LeaveRequest.date_posted.desc()).all()
+    return render_template('records.html', pending_users=pending_users, attendance=all_attendance, leaves=all_leaves)
+
+
+@bp.route("/admin/approve-user/<int:user_id>")
+@login_required
+@hr_required
+def approve_user(user_id):
+    user = Employee.query.get_or_404(user_id)
+    user.status = 'Active'
+    db.session.commit()
+    events.user_decided(user.id, user.full_name, 'Approved')
+    audit.record('user.approved', 'employee', user.id, email=user.email, role=user.role)
+    flash(f'Account for {user.full_name} has been approved!', 'success')
+    return redirect(url_for('admin.admin_records'))
+
+
+@bp.route("/admin/reject-user/<int:user_id>")
+@login_required
+@hr_required
+def reject_user(user_id):
+    user = Employee.query.get_or_404(user_id)
+    if user.status == 'Pending':
+        db.session.delete(user)
+        db.session.commit()
+        events.user_decided(user_id, user.full_name, 'Rejected')
+        audit.record('user.rejected', 'employee', user_id, full_name=user.full_name,
+                     email=user.email, role=user.role)
+        flash(
+            f'Registration for {user.full_name} has been rejected and removed.', 'info')
+    return redirect(url_for('admin.admin_records'))
+
+# --- TEAM MANAGEMENT (Managers) ---
+
+
+@bp.route("/org-chart")
+@login_required
+@manager_required
+@use_replica
+def org_chart():
+    # The template only calls this when its cached fragment is stale
+    def load_org_data():
+        departments = db.session.query(Employee.department).distinct().all()
+        return {dept[0]: Employee.query.filter_by(
+            department=dept[0]).all() for dept in departments}
+    return render_template('org_chart.html', load_org_data=load_org_data)
+
+
+def _can_view_team(emp_id):
+    return current_user.id == emp_id or can_manage(current_user, emp_id)
+
+
+@bp.route("/org-chart/<int:emp_id>")
+@login_required
+@use_replica
+def org_person(emp_id):
+    # One person with their chain of command and direct reports
+    if not _can_view_team(emp_id):
+        abort(403)
+    employee = Employee.query.get_or_404(emp_id)
+    reports = Employee.query.filter_by(manager_id=emp_id).order_by(Employee.full_name).all()
+    return render_template('org_person.html', title=employee.full_name, employee=employee,
+                           chain=chain_of_command(emp_id), reports=reports,
+                           report_counts=direct_report_counts([r.id for r in reports]),
+                           team_size=reports_under(emp_id).count())
+
+
+@bp.route("/api/org/<int:emp_id>/reports")
+@login_required
+@use_replica
+def org_reports_api(emp_id):
+    # Everyone under emp_id, a level at a time; ?depth=1 for direct reports
+    if not _can_view_team(emp_id):
+        abort(403)
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 200)
+    result = reports_under(emp_id, max_depth=request.args.get('depth', type=int))\
+        .paginate(page=page, per_page=per_page, error_out=False)
+    return jsonify({
+        'employee_id': emp_id, 'page': result.page, 'pages': result.pages, 'total': result.total,
+        'reports': [{'id': emp.id, 'full_name': emp.full_name, 'email': emp.email,
+                     'role': emp.role, 'department': emp.department,
+                     'manager_id': emp.manager_id, 'depth': depth}
+                    for emp, depth in result.items],
+    })
+
+
+@bp.route("/api/org/<int:emp_id>/chain")
+@login_required
+@use_replica
+def org_chain_api(emp_id):
+    if not _can_view_team(emp_id):
+        abort(403)
+    return jsonify({'employee_id': emp_id,
+                    'chain': [{'id': m.id, 'full_name': m.full_name, 'role': m.role,
+                               'department': m.department}
+                              for m in chain_of_command(emp_id)]})
+
+
+@bp.route("/employee/<int:emp_id>/manager", methods=['POST'])
+@login_required
+@hr_required
+def set_manager(emp_id):
+    employee = Employee.query.get_or_404(emp_id)
+    email = request.form.get('manager_email', '').strip()
+    manager = None
+    if email:
+        manager = Employee.query.filter_by(email=email).first()
+        if manager is None:
+            flash(f'No employee found with email {email}.', 'danger')
+            return redirect(url_for('admin.org_person', emp_id=emp_id))
+        if would_create_cycle(employee.id, manager.id):
+            flash(f'{manager.full_name} is in {employee.full_name}\'s own team.', 'danger')
+            return redirect(url_for('admin.org_person', emp_id=emp_id))
+
+    # The reporting-line table follows in the same transaction
+    previous = employee.manager_id
+    employee.manager_id = manager.id if manager else None
+    try:
+        db.session.commit()
+    except ValueError as e:
+        # Another change made this a loop after the check above
+        db.session.rollback()
+        flash(str(e), 'danger')
+        return redirect(url_for('admin.org_person', emp_id=emp_id))
+    audit.record('employee.manager_changed', 'employee', employee.id,
+                 previous=previous, manager_id=employee.manager_id)
+    flash(f'Reporting line updated for {employee.full_name}.', 'success')
+    return redirect(url_for('admin.org_person', emp_id=emp_id))
+
+
+@bp.route("/employee/update_status/<int:emp_id>", methods=['POST'])
+@login_required
+def update_status(emp_id):
+    # HR and the Owner can update anyone; a Manager only their own reports
+    if not can_manage(current_user, emp_id):
+        flash('Unauthorized', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    employee = Employee.query.get_or_404(emp_id)
+    previous = employee.status
+    employee.status = 'Inactive' if previous == 'Active' else 'Active'
+    db.session.commit()
+    audit.record('employee.status_changed', 'employee', employee.id,
+                 previous=previous, status=employee.status)
+    flash(f'Status updated for {employee.full_name}', 'success')
+    return redirect(url_for('admin.org_chart'))
+
+# --- EXECUTIVE SUITE (Owner) ---
+
+
+@bp.route("/positions")
+@login_required
+@owner_required
+@use_replica
+def view_positions():
+    return render_template('positions.html', load_positions=Position.query.all)
+
+
+@bp.route("/positions/add", methods=['GET', 'POST'])
+@login_required
+@owner_required
+def add_position():
+    form = PositionForm()
+    if form.validate_on_submit():
+        new_pos = Position(
+            title=form.title.data,
+            department=form.department.data,
+            base_salary=form.base_salary.data
+        )
+        db.session.add(new_pos)
+        db.session.commit()
+        flash('New position added successfully!', 'success')
+        return redirect(url_for('admin.view_positions'))
+    return render_template('add_position.html', form=form)
+
+
+@bp.route("/clients")
+@login_required
+@owner_required
+@use_replica
+def view_clients():
+    # Paged, with each client's manager joined in; ?manager=<id>&status=Active
+    page = request.args.get('page', 1, type=int)
+    manager_id = request.args.get('manager', type=int)
+    status = request.args.get('status') or None
+    return render_template('clients.html', page=page, manager_id=manager_id, status=status,
+                           load_clients=lambda: client_page(page, 50, manager_id, status))
+
+
+@bp.route("/clients/add", methods=['GET', 'POST'])
+@login_required
+@owner_required
+def add_client():
+    form = ClientForm()
+    form.assigned_manager.choices = [(0, 'Least loaded manager')] + [
+        (m.id, f'{m.full_name} ({m.department})') for m in account_managers()]
+    if form.validate_on_submit():
+        new_client = Client(
+            company_name=form.company_name.data,
+            contact_person=form.contact_person.data,
+            email=form.email.data,
+            phone=form.phone.data
+        )
+        manager = (db.session.get(Employee, form.assigned_manager.data)
+                   if form.assigned_manager.data else least_loaded_manager())
+        if manager:
+            assign_client(new_client, manager)
+        db.session.add(new_client)
+        db.session.commit()
+        flash('Client added successfully!', 'success')
+        return redirect(url_for('admin.view_clients'))
+    return render_template('add_client.html', form=form)
+
+
+@bp.route("/clients/workload")
+@login_required
+@owner_required
+@use_replica
+def client_workload():
+    department = request.args.get('department') or None
+    return render_template('client_workload.html', title='Client Workload',
+                           department=department, **workload(department))
+
+
+@bp.route("/clients/<int:client_id>/assign", methods=['POST'])
+@login_required
+@owner_required
+def reassign_client(client_id):
+    client = Client.query.get_or_404(client_id)
+    email = request.form.get('manager_email', '').strip()
+    manager = Employee.query.filter_by(email=email).first()
+    if manager is None:
+        flash(f'No employee found with email {email}.', 'danger')
+        return redirect(request.referrer or url_for('admin.view_clients'))
+    previous = client.assigned_manager_id
+    try:
+        assign_client(client, manager)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(request.referrer or url_for('admin.view_clients'))
+    db.session.commit()
+    audit.record('client.reassigned', 'client', client.id, previous=previous,
+                 manager_id=manager.id)
+    flash(f'{client.company_name} is now managed by {manager.full_name}.', 'success')
+    return redirect(request.referrer or url_for('admin.view_clients'))
+
+
+@bp.route("/clients/rebalance", methods=['POST'])
+@login_required
+@owner_required
+def rebalance_clients():
+    department = request.form.get('department') or None
+    moves = rebalance(department)
+    if moves:
+        audit.record('client.rebalanced', department=department, moved=len(moves))
+    flash(f'{len(moves)} client(s) reassigned to even out workloads.', 'success')
+    return redirect(url_for('admin.client_workload', department=department))
+
+
+@bp.route("/settings", methods=['GET', 'POST'])
+@login_required
+def settings():
+    if current_user.role != 'Company Owner':
+        abort(403)
+
+    settings = CompanySettings.get_settings()
+
+    if request.method == 'POST':
+        changes = {}
+        if request.form.get('company_name') != settings.company_name:
+            changes['company_name'] = [settings.company_name, request.form.get('company_name')]
+        settings.company_name = request.form.get('company_name')
+        if 'logo_file' in request.files:
+            file = request.files['logo_file']
+            if file and file.filename != '':
+                # Secure the name and add a content hash, so the URL changes
+                # whenever the logo does and can be cached indefinitely
+                data = file.read()
+                filename = fingerprinted_filename(secure_filename(file.filename), data)
+                upload_folder = current_app.config['UPLOAD_FOLDER']
+                # Created on first upload rather than on every boot
+                os.makedirs(upload_folder, exist_ok=True)
+                with open(os.path.join(upload_folder, filename), 'wb') as fh:
+                    fh.write(data)
+
+                # Save the relative path to the database
+                settings.company_logo_url = url_for(
+                    'static', filename='company_logos/' + filename)
+                changes['company_logo_url'] = settings.company_logo_url
+
+        # Read before the commit expires the row, so recording does not reload it
+        settings_id = settings.id
+        db.session.commit()
+        if changes:
+            audit.record('settings.updated', 'company_settings', settings_id, **changes)
+        flash('Settings updated successfully!', 'success')
+        return redirect(url_for('admin.settings'))
+
+    return render_template('settings.html', settings=settings)
+
+
+# --- AUDIT LOG (Owner) ---
+
+
+def _audit_filters():
+    # ?action=leave.approved&actor=<id>&target_type=employee&target_id=<id>
+    # &since=2026-01-01&until=2026-02-01 (until is exclusive)
+    return {'action': request.args.get('action') or None,
+            'actor_id': request.args.get('actor', type=int),
+            'target_type': request.args.get('target_type') or None,
+            'target_id': request.args.get('target_id', type=int),
+            'since': request.args.get('since', type=date.fromisoformat),
+            'until': request.args.get('until', type=date.fromisoformat)}
+
+
+@bp.route("/admin/audit")
+@login_required
+@owner_required
+def audit_log():
+    filters = _audit_filters()
+    before = request.args.get('before', type=int)
+    entries, cursor = audit.audit_page(before, 50, **filters)
+    query = {k: v for k, v in request.args.items() if k != 'before'}
+    return render_template('audit_log.html', entries=[audit.event_dict(e) for e in entries],
+                           cursor=cursor, before=before, query=query)
+
+
+@bp.route("/api/audit")
+@login_required
+@owner_required
+def audit_log_api():
+    # Newest first; pass next_before back as ?before= for the next page
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+    entries, cursor = audit.audit_page(request.args.get('before', type=int), per_page,
+                                       **_audit_filters())
+    return jsonify({'events': [audit.event_dict(e) for e in entries], 'next_before': cursor})
@@ -0,0 +1,61 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request
+from app import db, events
+from app.models import Attendance
+from app.archive import attendance_history
+from flask_login import current_user, login_required
+from datetime import datetime
+
+bp = Blueprint('attendance', __name__)
+
+# --- TIME & ATTENDANCE ---
+
+
+@bp.route("/attendance/clock-in")
+@login_required
+def clock_in():
+    # Check if there is already an open session
+    unfinished = Attendance.query.filter_by(
+        employee_id=current_user.id, check_out=None).first()
+    if unfinished:
+        flash('You are already clocked in!', 'warning')
+    else:
+        now = datetime.now()
+        new_entry = Attendance(employee_id=current_user.id, check_in=now)
+        # Read before commit() expires the user
+        employee_id, employee_name = current_user.id, current_user.full_name
+        db.session.add(new_entry)
+        db.session.commit()
+        events.punched('clock_in', employee_id, employee_name, now)
+        flash('Clocked in successfully!', 'success')
+    return redirect(url_for('main.dashboard'))
+
+
+@bp.route("/attendance/clock-out")
+@login_required
+def clock_out():
+    # Find the session that hasn't been closed yet
+    record = Attendance.query.filter_by(
+        employee_id=current_user.id, check_out=None).first()
+    if record:
+        now = datetime.now()
+        record.check_out = now
+        employee_id, employee_name = current_user.id, current_user.full_name
+        db.session.commit()
+        events.punched('clock_out', employee_id, employee_name, now)
+        flash('Clocked out successfully!', 'success')
+    else:
+        flash('No active clock-in session found.', 'danger')
+    return redirect(url_for('main.dashboard'))
+
+
+@bp.route("/attendance")
+@login_required
+def attendance():
+    # Fetch all attendance records for the current user, newest first,
+    # including sessions already moved to the archive
+    page = request.args.get('page', 1, type=int)
+    query, columns = attendance_history(current_user.id)
+    records = query.order_by(columns.check_in.desc())\
+        .paginate(page=page, per_page=10)
+
+    return render_template('attendance.html', title='My Attendance', records=records)
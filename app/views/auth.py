@@ -0,0 +1,95 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request
+from app import db, bcrypt, events
+from app.forms import RegistrationForm, LoginForm
+from app.models import Employee, Position
+from flask_login import login_user, current_user, logout_user
+
+bp = Blueprint('auth', __name__)
+
+# --- AUTHENTICATION ---
+
+
+@bp.route("/register", methods=['GET', 'POST'])
+def register():
+    # 1. Access Control: Only HR or Owners can onboard new people
+    #if not current_user.is_authenticated or current_user.role not in ['HR Team', 'Company Owner']:
+        #flash('You do not have permission to access this page.', 'danger')
+        #return redirect(url_for('main.dashboard'))
+
+    form = RegistrationForm()
+
+    # 2. Populate Department Choices (Unique names from the Position table)
+    # This fetches all unique department names to fill the first dropdown
+    depts = db.session.query(Position.department).distinct().all()
+    form.department.choices = [(d[0], d[0]) for d in depts]
+
+    # 3. Dynamic Position Logic
+    if request.method == 'POST':
+        # During POST, we populate choices with ALL positions.
+        # This prevents the "Not a valid choice" validation error because
+        # the submitted ID will be found in this full list.
+        form.position.choices = [(p.id, p.title) for p in Position.query.all()]
+    else:
+        # During GET (initial load), we only show positions for the first department
+        if depts:
+            first_dept = depts[0][0]
+            positions = Position.query.filter_by(department=first_dept).all()
+            form.position.choices = [(p.id, p.title) for p in positions]
+        else:
+            form.position.choices = []
+
+    # 4. Form Submission Handling
+    if form.validate_on_submit():
+        hashed_pw = bcrypt.generate_password_hash(
+            form.password.data).decode('utf-8')
+
+        # Create the new Employee object
+        user = Employee(
+            full_name=form.full_name.data,
+            email=form.email.data,
+            password=hashed_pw,
+            department=form.department.data,
+            position_id=form.position.data,  # This stores the integer ID
+            role=form.role.data,
+            status='Pending'
+        )
+
+        try:
+            db.session.add(user)
+            db.session.commit()
+            events.user_registered(user.id, user.full_name, user.email, user.role)
+            flash(
+                f'Account created for {form.full_name.data} successfully!', 'success')
+            return redirect(url_for('main.dashboard'))
+        except Exception as e:
+            db.session.rollback()
+            flash(
+                'An error occurred while creating the account. Please try again.', 'danger')
+            print(f"Error: {e}")
+
+    return render_template('register.html', title='Register', form=form)
+
+
+@bp.route("/login", methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = Employee.query.filter_by(email=form.email.data).first()
+        if user and bcrypt.check_password_hash(user.password, form.password.data):
+            # NEW: Check if the user is Active
+            if user.status != 'Active':
+                flash('Your account is pending approval. Please contact HR.', 'warning')
+                return redirect(url_for('auth.login'))
+
+            login_user(user)
+            return redirect(url_for('main.dashboard'))
+        flash('Login Unsuccessful. Check email and password.', 'danger')
+    return render_template('login.html', title='Login', form=form)
+
+
+@bp.route("/logout")
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
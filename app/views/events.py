@@ -0,0 +1,27 @@
+from flask import Blueprint, Response, current_app, request
+from flask_login import current_user, login_required
+from app import events
+from app.tenancy import current_tenant_id
+
+bp = Blueprint('events', __name__)
+
+# --- LIVE UPDATES (Server-Sent Events) ---
+
+
+@bp.route("/events/stream")
+@login_required
+def stream():
+    # Read everything needed up front: the stream outlives the request's
+    # app context and database session
+    subscription = events.bus.subscribe(current_user.role, current_user.id,
+                                        request.headers.get('Last-Event-ID', type=int),
+                                        current_tenant_id())
+    body = events.stream(subscription,
+                         current_app.config['EVENTS_HEARTBEAT_SECONDS'],
+                         current_app.config['EVENTS_STREAM_SECONDS'])
+    response = Response(body, mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs however the response ends, even if the body is never read
+    # (a HEAD request, or a client gone before the first frame)
+    response.call_on_close(lambda: events.bus.unsubscribe(subscription))
+    return response
@@ -0,0 +1,269 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request, abort, send_file, jsonify
+from app import audit, db
+from app.decorators import finance_required
+from app.forms import ExpenseForm
+from app.models import PayrollRecord, Expense, CompanySettings
+from app.payroll import (register_summary, register_page, run_payroll, cents_to_money,
+                         payslip_history, payslip_year_totals, payslips_for_year,
+                         PAYSLIP_YEARS)
+from app.replica import use_replica
+from flask_login import current_user, login_required
+from datetime import datetime
+from decimal import Decimal
+import io
+
+bp = Blueprint('finance', __name__)
+
+# --- PAYROLL & EXPENSES ---
+
+
+@bp.route("/payroll")
+@login_required
+@finance_required
+@use_replica
+def payroll():
+    # Totals come from the cached register; the ledger is paged
+    page = request.args.get('page', 1, type=int)
+    summary = register_summary()
+    ledger = register_page(page)
+
+    return render_template('payroll.html',
+                           summary=summary,
+                           ledger=ledger,
+                           cents_to_money=cents_to_money,
+                           datetime=datetime)
+
+
+@bp.route("/finance/process-payroll", methods=['POST'])
+@login_required
+@finance_required
+def process_all_salaries():
+    current_month = datetime.now().strftime('%B %Y')
+
+    # Simple check to prevent double-processing same month
+    existing_record = PayrollRecord.query.filter_by(
+        month_year=current_month).first()
+    if existing_record:
+        flash(
+            f'Payroll for {current_month} has already been processed!', 'warning')
+        return redirect(url_for('finance.payroll'))
+
+    count, total = run_payroll(current_month)
+    db.session.commit()
+    audit.record('payroll.processed', month=current_month, employees=count, total=total)
+    flash(
+        f'Successfully processed payroll for {count} employees for {current_month} '
+        f'(${total:,.2f}).', 'success')
+    return redirect(url_for('finance.payroll'))
+
+
+@bp.route("/finance/simulate", methods=['GET', 'POST'])
+@login_required
+@finance_required
+def simulate_payroll():
+    # GET lists what scenarios can select; POST {"scenarios": [...]} runs them.
+    # Imported here so numpy only loads when a simulation is asked for.
+    from app.simulation import ScenarioError, describe_matrix, np, simulate
+    if np is None:
+        return jsonify({'error': 'Payroll simulation needs the numpy package.'}), 501
+    if request.method == 'GET':
+        return jsonify({'rows': describe_matrix()})
+    payload = request.get_json(silent=True) or {}
+    try:
+        return jsonify(simulate(payload.get('scenarios')))
+    except ScenarioError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@bp.route("/finance/expenses", methods=['GET', 'POST'])
+@login_required
+@finance_required
+@use_replica
+def manage_expenses():
+    form = ExpenseForm()
+    if form.validate_on_submit():
+        new_expense = Expense(
+            description=form.description.data,
+            category=form.category.data,
+            amount=form.amount.data,
+            date_incurred=form.date_incurred.data
+        )
+        db.session.add(new_expense)
+        db.session.commit()
+        flash('Expense logged successfully!', 'success')
+        return redirect(url_for('finance.manage_expenses'))
+
+    all_expenses = Expense.query.order_by(Expense.date_incurred.desc()).all()
+    total_expenses = sum(exp.amount for exp in all_expenses)
+    return render_template('expenses.html', form=form, expenses=all_expenses, total=total_expenses)
+
+# --- PAYSLIPS ---
+
+
+@bp.route("/my-payslips")
+@login_required
+def my_payslips():
+    page = request.args.get('page', 1, type=int)
+    year = request.args.get('year', type=int)
+    if year is not None and year not in PAYSLIP_YEARS:
+        abort(400)
+    payslips = payslip_history(current_user.id, year=year, page=page)
+    year_totals = payslip_year_totals(current_user.id)
+    return render_template('my_payslips.html', title='My Payslips',
+                           payslips=payslips, year_totals=year_totals, year=year)
+
+
+@bp.route("/api/my-payslips")
+@login_required
+def my_payslips_api():
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 12, type=int), 100)
+    year = request.args.get('year', type=int)
+    if year is not None and year not in PAYSLIP_YEARS:
+        abort(400)
+    payslips = payslip_history(current_user.id, year=year, page=page, per_page=per_page)
+
+    return jsonify({
+        'page': payslips.page,
+        'pages': payslips.pages,
+        'total': payslips.total,
+        'payslips': [{
+            'id': r.id,
+            'month_year': r.month_year,
+            'date_processed': r.date_processed.isoformat(),
+            'amount_paid': str(r.amount_paid),
+            'download_url': url_for('finance.download_payslip', record_id=r.id),
+        } for r in payslips.items],
+        'years': [{'year': y['year'], 'payslips': y['payslips'], 'total': str(y['total'])}
+                  for y in payslip_year_totals(current_user.id)],
+    })
+
+
+@bp.route("/my-payslips/tax-summary/<int:year>")
+@login_required
+def tax_summary(year):
+    from fpdf import FPDF
+
+    if year not in PAYSLIP_YEARS:
+        abort(404)
+    records = payslips_for_year(current_user.id, year)
+    if not records:
+        abort(404)
+    settings = CompanySettings.get_settings()
+    total = sum((r.amount_paid for r in records), Decimal('0.00'))
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    pdf.set_font("helvetica", 'B', 20)
+    pdf.cell(190, 10, f"{settings.company_name.upper()}", ln=True, align='C')
+    pdf.set_font("helvetica", 'B', 12)
+    pdf.cell(190, 10, f"YEAR-END EARNINGS SUMMARY {year}", ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font("helvetica", '', 11)
+    pdf.cell(95, 8, f"Employee: {current_user.full_name}")
+    pdf.cell(95, 8, f"Tax Year: {year}", ln=True, align='R')
+    pdf.cell(95, 8, f"ID: #EMP-00{current_user.id}", ln=True)
+    pdf.ln(10)
+
+    pdf.set_fill_color(240, 240, 240)
+    pdf.set_font("helvetica", 'B', 11)
+    pdf.cell(140, 10, "Period", border=1, fill=True)
+    pdf.cell(50, 10, "Amount", border=1, fill=True, ln=True, align='C')
+
+    pdf.set_font("helvetica", '', 11)
+    for record in records:
+        pdf.cell(140, 8, record.month_year, border=1)
+        pdf.cell(50, 8, f"${'{:,.2f}'.format(record.amount_paid)}",
+                 border=1, ln=True, align='C')
+
+    pdf.ln(5)
+    pdf.set_font("helvetica", 'B', 12)
+    pdf.cell(140, 10, "TOTAL GROSS EARNINGS", border=0, align='R')
+    pdf.cell(50, 10, f"${'{:,.2f}'.format(total)}", border=1, ln=True, align='C')
+
+    pdf.ln(20)
+    pdf.set_font("helvetica", 'I', 8)
+    pdf.cell(
+        190, 5, f"This is a computer-generated document from {settings.company_name} HRMS.", align='C', ln=True)
+
+    buffer = io.BytesIO(pdf.output())
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=f"Earnings_Summary_{year}.pdf",
+        mimetype='application/pdf'
+    )
+
+
+@bp.route("/download-payslip/<int:record_id>")
+@login_required
+def download_payslip(record_id):
+    # FPDF is only needed here, so keep it off the boot path
+    from fpdf import FPDF
+
+    record = PayrollRecord.query.get_or_404(record_id)
+
+    # Get the dynamic settings
+    settings = CompanySettings.get_settings()
+
+    # Security check
+    if record.employee_id != current_user.id and current_user.role != 'Company Owner':
+        abort(403)
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # --- DYNAMIC HEADER ---
+    pdf.set_font("helvetica", 'B', 20)
+    # Uses the name you set in the Settings page!
+    pdf.cell(190, 10, f"{settings.company_name.upper()}", ln=True, align='C')
+
+    pdf.set_font("helvetica", 'B', 12)
+    pdf.cell(190, 10, "OFFICIAL PAYROLL STATEMENT", ln=True, align='C')
+    pdf.ln(10)
+
+    # Employee Details
+    pdf.set_font("helvetica", '', 11)
+    pdf.cell(95, 8, f"Employee: {record.employee.full_name}")
+    pdf.cell(
+        95, 8, f"Date: {record.date_processed.strftime('%Y-%m-%d')}", ln=True, align='R')
+    pdf.cell(95, 8, f"ID: #EMP-00{record.employee.id}")
+    pdf.cell(95, 8, f"Period: {record.month_year}", ln=True, align='R')
+    pdf.ln(10)
+
+    # Earnings Table
+    pdf.set_fill_color(240, 240, 240)
+    pdf.set_font("helvetica", 'B', 11)
+    pdf.cell(140, 10, "Description", border=1, fill=True)
+    pdf.cell(50, 10, "Amount", border=1, fill=True, ln=True, align='C')
+
+    pdf.set_font("helvetica", '', 11)
+    pdf.cell(140, 10, f"Monthly Salary - {record.month_year}", border=1)
+    pdf.cell(50, 10, f"${'{:,.2f}'.format(record.amount_paid)}",
+             border=1, ln=True, align='C')
+
+    # Total
+    pdf.ln(5)
+    pdf.set_font("helvetica", 'B', 12)
+    pdf.cell(140, 10, "NET DISBURSED", border=0, align='R')
+    pdf.cell(50, 10, f"${'{:,.2f}'.format(record.amount_paid)}",
+             border=1, ln=True, align='C')
+
+    # Footer
+    pdf.ln(20)
+    pdf.set_font("helvetica", 'I', 8)
+    pdf.cell(
+        190, 5, f"This is a computer-generated document from {settings.company_name} HRMS.", align='C', ln=True)
+
+    pdf_output = pdf.output()
+    buffer = io.BytesIO(pdf_output)
+    buffer.seek(0)
+
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=f"Payslip_{record.month_year.replace(' ', '_')}.pdf",
+        mimetype='application/pdf'
+    )
@@ -0,0 +1,77 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, abort, request
+from app import audit, db, events
+from app.forms import LeaveForm
+from app.hierarchy import can_manage, pending_approvals
+from app.models import LeaveRequest
+from flask_login import current_user, login_required
+
+bp = Blueprint('leave', __name__)
+
+# --- LEAVE MANAGEMENT ---
+
+
+@bp.route("/apply-leave", methods=['GET', 'POST'])
+@login_required
+def apply_leave():
+    form = LeaveForm()
+    if form.validate_on_submit():
+        leave = LeaveRequest(
+            leave_type=form.leave_type.data,
+            start_date=form.start_date.data,
+            end_date=form.end_date.data,
+            employee_id=current_user.id,
+            status='Pending'
+        )
+        db.session.add(leave)
+        db.session.commit()
+        events.leave_requested(leave.id, leave.employee_id, leave.employee.full_name,
+                               leave.leave_type, leave.start_date, leave.end_date,
+                               current_user.role)
+        flash('Leave request submitted!', 'success')
+        return redirect(url_for('main.dashboard'))
+    return render_template('apply_leave.html', title='Apply Leave', form=form)
+
+
+@bp.route("/leave/approve/<int:leave_id>")
+@login_required
+def approve_leave(leave_id):
+    # HR and the Owner approve anyone; a Manager only their own reports
+    leave = LeaveRequest.query.get_or_404(leave_id)
+    if not can_manage(current_user, leave.employee_id):
+        abort(403)
+
+    leave.status = 'Approved'
+    db.session.commit()
+    events.leave_decided(leave.id, leave.employee_id, leave.employee.full_name, leave.status)
+    audit.record('leave.approved', 'leave_request', leave.id, employee_id=leave.employee_id,
+                 leave_type=leave.leave_type)
+    flash(
+        f'Leave for {leave.employee.full_name} has been Approved.', 'success')
+    return redirect(url_for('main.dashboard'))
+
+
+@bp.route("/leave/reject/<int:leave_id>")
+@login_required
+def reject_leave(leave_id):
+    leave = LeaveRequest.query.get_or_404(leave_id)
+    if not can_manage(current_user, leave.employee_id):
+        abort(403)
+
+    leave.status = 'Rejected'
+    db.session.commit()
+    events.leave_decided(leave.id, leave.employee_id, leave.employee.full_name, leave.status)
+    audit.record('leave.rejected', 'leave_request', leave.id, employee_id=leave.employee_id,
+                 leave_type=leave.leave_type)
+    flash(f'Leave for {leave.employee.full_name} has been Rejected.', 'info')
+    return redirect(url_for('main.dashboard'))
+
+
+@bp.route("/leave/approvals")
+@login_required
+def approval_queue():
+    # Managers see their whole reporting tree, HR and the Owner everyone
+    if current_user.role not in ['HR Team', 'Manager', 'Company Owner']:
+        abort(403)
+    page = request.args.get('page', 1, type=int)
+    leaves = pending_approvals(current_user).paginate(page=page, per_page=25, error_out=False)
+    return render_template('approval_queue.html', title='Approval Queue', leaves=leaves)
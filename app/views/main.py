@@ -0,0 +1,100 @@
+from flask import Blueprint, render_template, url_for, flash, redirect, request, jsonify
+from app import db, bcrypt
+from app.forms import UpdateProfileForm, ChangePasswordForm
+from app.hierarchy import pending_approvals
+from app.models import Employee, Client, Position, LeaveRequest, CompanySettings
+from app.replica import use_replica
+from flask_login import current_user, login_required
+from sqlalchemy.exc import IntegrityError
+
+bp = Blueprint('main', __name__)
+
+
+@bp.app_context_processor
+def inject_settings():
+    return dict(company_settings=CompanySettings.get_settings())
+
+
+@bp.route("/get-positions/<string:dept_name>")
+def get_positions(dept_name):
+    # Search the Position table for the department string name
+    positions = Position.query.filter_by(department=dept_name).all()
+
+    return jsonify({
+        'positions': [{'id': p.id, 'title': p.title} for p in positions]
+    })
+
+# --- DASHBOARD ---
+
+
+@bp.route("/")
+@bp.route("/dashboard")
+@login_required
+@use_replica
+def dashboard():
+    # Gather counts for the Owner dashboard
+    stats = {
+        'employees': Employee.query.count(),
+        'clients': Client.query.count(),
+        'positions': Position.query.count()
+    }
+
+    # Gather Leave Requests based on role; Managers only see their reports
+    if current_user.role in ['HR Team', 'Manager', 'Company Owner']:
+        leaves = pending_approvals(current_user).all()
+    else:
+        leaves = LeaveRequest.query.filter_by(
+            employee_id=current_user.id).all()
+
+    # Department data for Managers
+    departments = db.session.query(Employee.department).distinct().all()
+    org_data = {dept[0]: Employee.query.filter_by(
+        department=dept[0]).all() for dept in departments}
+
+    return render_template('dashboard.html',
+                           stats=stats,
+                           leaves=leaves,
+                           org_data=org_data,
+                           title="Dashboard")
+
+
+@bp.route("/profile", methods=['GET', 'POST'])
+@login_required
+def profile():
+    update_form = UpdateProfileForm()
+    password_form = ChangePasswordForm()
+
+    # Handle Profile Info Update
+    if update_form.validate_on_submit() and 'full_name' in request.form:
+        current_user.full_name = update_form.full_name.data
+        current_user.email = update_form.email.data
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Taken in another company, on a database that still has the
+            # old global unique constraint (see init-db)
+            db.session.rollback()
+            flash('That email is already taken.', 'danger')
+            return redirect(url_for('main.profile'))
+        flash('Your profile has been updated!', 'success')
+        return redirect(url_for('main.profile'))
+
+    # Handle Password Change
+    if password_form.validate_on_submit() and 'new_password' in request.form:
+        if bcrypt.check_password_hash(current_user.password, password_form.old_password.data):
+            hashed_pw = bcrypt.generate_password_hash(
+                password_form.new_password.data).decode('utf-8')
+            current_user.password = hashed_pw
+            db.session.commit()
+            flash('Password changed successfully!', 'success')
+            return redirect(url_for('main.profile'))
+        else:
+            flash('Current password incorrect.', 'danger')
+
+    # Pre-fill form with current data
+    elif request.method == 'GET':
+        update_form.full_name.data = current_user.full_name
+        update_form.email.data = current_user.email
+
+    return render_template('profile.html', title='My Profile',
+                           update_form=update_form, password_form=password_form)
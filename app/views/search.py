@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify, url_for
+from flask_login import current_user, login_required
+from app.search import search
+
+bp = Blueprint('search', __name__)
+
+# --- SEARCH (typeahead) ---
+
+
+def _searchable_kinds():
+    # Everyone can look up colleagues; clients and positions are Owner data
+    if current_user.role == 'Company Owner':
+        return ['employee', 'client', 'position']
+    return ['employee']
+
+
+def _result_url(kind):
+    if kind == 'client':
+        return url_for('admin.view_clients')
+    if kind == 'position':
+        return url_for('admin.view_positions')
+    if current_user.role in ['Manager', 'Company Owner']:
+        return url_for('admin.org_chart')
+    return None
+
+
+@bp.route("/search/suggest")
+@login_required
+def suggest():
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), 25))
+    results = search(query, _searchable_kinds(), limit=limit) if len(query) >= 2 else []
+    for result in results:
+        result['url'] = _result_url(result['kind'])
+    return jsonify({'query': query, 'results': results})
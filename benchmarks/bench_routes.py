@@ -0,0 +1,170 @@
+"""Drive the key HRMS routes through the Flask test client and time them.
+
+Run it against a database built by ``benchmarks.generate_data``:
+    DATABASE_URL=sqlite:////tmp/hrms_bench.db python -m benchmarks.bench_routes \
+        --iterations 50 --output results/routes-$(git rev-parse --short HEAD).json
+
+Results are p50/p95/p99 latencies and throughput per scenario, written as
+JSON so two runs can be diffed with ``benchmarks.compare``.
+"""
+import argparse
+import time
+from datetime import datetime
+
+from app import create_app, db
+from app.models import Employee, Attendance, PayrollRecord
+from app.tenancy import company_id_for, tenant_scope
+from benchmarks.common import summarize, run_metadata, write_results
+from benchmarks.generate_data import BENCH_ACCOUNTS, BENCH_PASSWORD, DEPARTMENTS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='Run only these scenario names.')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout.')
+    return parser.parse_args(argv)
+
+
+def login(client, role):
+    email = BENCH_ACCOUNTS[role][0]
+    return client.post('/login', data={'email': email, 'password': BENCH_PASSWORD})
+
+
+class Scenario:
+    """One benchmarked request: who sends it and how to build it."""
+
+    def __init__(self, name, role, method, path, setup=None, expect=(200, 302), json=None):
+        self.name = name
+        self.role = role
+        self.method = method
+        self.path = path
+        self.setup = setup
+        self.expect = expect
+        self.json = json
+
+
+def reset_current_payroll():
+    # process_all_salaries refuses to run twice a month, so undo the last run
+    current_month = datetime.now().strftime('%B %Y')
+    PayrollRecord.query.filter_by(month_year=current_month).delete()
+    db.session.commit()
+
+
+def build_scenarios():
+    employee = Employee.query.filter_by(email=BENCH_ACCOUNTS['employee'][0]).first()
+    payslip = PayrollRecord.query.filter_by(employee_id=employee.id)\
+        .order_by(PayrollRecord.date_processed.desc()).first() if employee else None
+    payslip_path = f"/download-payslip/{payslip.id}" if payslip else None
+
+    # Clock-in/out are timed on their real write path, not the "already
+    # clocked in" early exit, so each iteration starts from the right state.
+    def close_open_session():
+        Attendance.query.filter_by(employee_id=employee.id, check_out=None)\
+            .update({'check_out': datetime.now()})
+        db.session.commit()
+
+    def ensure_open_session():
+        if not Attendance.query.filter_by(employee_id=employee.id, check_out=None).first():
+            db.session.add(Attendance(employee_id=employee.id, check_in=datetime.now()))
+            db.session.commit()
+
+    scenarios = [
+        Scenario('dashboard_owner', 'owner', 'GET', '/dashboard'),
+        Scenario('dashboard_manager', 'manager', 'GET', '/dashboard'),
+        Scenario('dashboard_employee', 'employee', 'GET', '/dashboard'),
+        Scenario('org_chart', 'manager', 'GET', '/org-chart'),
+        Scenario('approval_queue', 'manager', 'GET', '/leave/approvals'),
+        # The owner (id 1) heads the whole generated org
+        Scenario('org_reports', 'owner', 'GET', '/api/org/1/reports?depth=2'),
+        Scenario('org_chain', 'employee', 'GET', '/api/org/5/chain'),
+        Scenario('payroll', 'finance', 'GET', '/payroll'),
+        Scenario('clients', 'owner', 'GET', '/clients?page=2'),
+        Scenario('client_workload', 'owner', 'GET', '/clients/workload'),
+        Scenario('audit_log', 'owner', 'GET', '/admin/audit'),
+        Scenario('process_all_salaries', 'finance', 'POST', '/finance/process-payroll',
+                 setup=reset_current_payroll),
+        Scenario('attendance', 'employee', 'GET', '/attendance'),
+        Scenario('my_payslips', 'employee', 'GET', '/my-payslips'),
+        Scenario('clock_in', 'employee', 'GET', '/attendance/clock-in',
+                 setup=close_open_session),
+        Scenario('clock_out', 'employee', 'GET', '/attendance/clock-out',
+                 setup=ensure_open_session),
+        Scenario('search_suggest', 'owner', 'GET', '/search/suggest?q=mar'),
+        Scenario('login', None, 'POST', '/login'),
+    ]
+    if payslip_path:
+        scenarios.append(Scenario('download_payslip', 'employee', 'GET', payslip_path))
+    scenarios.append(Scenario('payroll_simulation', 'finance', 'POST', '/finance/simulate',
+                              json={'scenarios': simulation_scenarios(200)}))
+    return scenarios
+
+
+def simulation_scenarios(count):
+    # Raises by department plus hires into each department's first role
+    departments = list(DEPARTMENTS.items())
+    scenarios = []
+    for i in range(count):
+        dept, titles = departments[i % len(departments)]
+        scenarios.append({'name': f'{dept} +{i % 10 + 1}%, {i % 25} hires', 'adjustments': [
+            {'department': dept, 'raise_pct': i % 10 + 1},
+            {'department': dept, 'position': titles[0][0], 'add_headcount': i % 25},
+        ]})
+    return scenarios
+
+
+def run_scenario(app, scenario, iterations, warmup):
+    client = app.test_client()
+    if scenario.role:
+        login(client, scenario.role)
+
+    latencies = []
+    errors = 0
+    elapsed = 0.0
+    for i in range(warmup + iterations):
+        if scenario.setup:
+            # Setup reads and writes the company the requests are made as
+            with app.app_context(), tenant_scope(company_id_for(app.config['TENANT_DEFAULT'])):
+                scenario.setup()
+        if scenario.name == 'login':
+            client.get('/logout')
+        started = time.perf_counter()
+        if scenario.name == 'login':
+            response = login(client, 'employee')
+        else:
+            response = client.open(scenario.path, method=scenario.method, json=scenario.json)
+        took = time.perf_counter() - started
+        response.close()
+        if i < warmup:
+            continue
+        elapsed += took
+        latencies.append(took)
+        if response.status_code not in scenario.expect:
+            errors += 1
+    return summarize(latencies, elapsed, errors)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+    with app.app_context():
+        scenarios = build_scenarios()
+        employees = Employee.query.count()
+
+    results = {}
+    for scenario in scenarios:
+        if args.only and scenario.name not in args.only:
+            continue
+        results[scenario.name] = run_scenario(app, scenario, args.iterations, args.warmup)
+
+    meta = run_metadata(harness='flask_test_client', iterations=args.iterations,
+                        warmup=args.warmup, database=app.config['SQLALCHEMY_DATABASE_URI'],
+                        employees=employees)
+    write_results('routes', results, meta, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure cold-start time of the application factory.
+
+Each sample runs in a fresh interpreter so nothing is cached between runs:
+    python -m benchmarks.bench_startup --runs 20 --output startup.json
+    python -m benchmarks.bench_startup --budget-ms 400   # fail CI if slower
+
+Reported scenarios are ``import_app`` (importing the package), ``create_app``
+(running the factory) and ``total`` (both). No request is made.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks.common import summarize, run_metadata, write_results
+
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+heavy = sorted(m for m in ('fpdf', 'numpy', 'pyarrow') if m in __import__('sys').modules)
+print(json.dumps({'import_app': t1 - t0, 'create_app': t2 - t1, 'total': t2 - t0, 'heavy': heavy}))
+"""
+
+
+def sample():
+    out = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float,
+                        help='Exit non-zero if the p50 total startup exceeds this.')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout.')
+    args = parser.parse_args(argv)
+
+    samples = [sample() for _ in range(args.runs)]
+    results = {}
+    for key in ('import_app', 'create_app', 'total'):
+        values = [s[key] for s in samples]
+        results[key] = summarize(values, sum(values))
+
+    # Optional heavy libraries must stay out of the boot path
+    heavy = sorted({name for s in samples for name in s['heavy']})
+    meta = run_metadata(harness='startup', runs=args.runs, heavy_modules_loaded=heavy)
+    write_results('startup', results, meta, args.output)
+
+    failed = False
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms and results['total']['p50_ms'] > args.budget_ms:
+        print(f"Startup p50 {results['total']['p50_ms']:.1f}ms exceeds budget "
+              f"{args.budget_ms:.1f}ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Show that adding companies does not slow down any one company's queries.
+
+Builds a throwaway database (DATABASE_URL is dropped and recreated, as with
+``benchmarks.generate_data``) holding identical companies. Companies are
+added in steps, and the same queries for the first company are timed at
+each step:
+    DATABASE_URL=sqlite:////tmp/hrms_tenants.db python -m benchmarks.bench_tenancy \
+        --steps 1 10 40 --max-ratio 2 --output tenancy.json
+
+Results are keyed ``<query>@<companies>``. With ``--max-ratio`` the run
+fails if a query's p50 at the last step is more than that many times its
+p50 at the first step.
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.archive import drop_archives
+from app.models import (Attendance, Client, Company, CompanySettings, Employee, LeaveRequest,
+                        Position)
+from app.payroll import register_page
+from app.portfolio import workload
+from app.tenancy import tenant_scope
+from benchmarks.common import run_metadata, summarize, write_results
+from benchmarks.generate_data import DEPARTMENTS, FIRST_NAMES, LAST_NAMES
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, nargs='+', default=[1, 10, 40],
+                        help='Company counts to measure at, in increasing order.')
+    parser.add_argument('--employees', type=int, default=500, help='Employees per company.')
+    parser.add_argument('--punches', type=int, default=20000, help='Attendance rows per company.')
+    parser.add_argument('--leaves', type=int, default=2000, help='Leave requests per company.')
+    parser.add_argument('--clients', type=int, default=300, help='Clients per company.')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--max-ratio', type=float,
+                        help='Exit non-zero if a p50 grows more than this from the first step.')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout.')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def add_company(number, args):
+    """One company with the same shape of data as every other."""
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    company = Company(slug=f'company{number}', name=f'Company {number}')
+    db.session.add(company)
+    db.session.flush()
+    with tenant_scope(company.id):
+        db.session.add(CompanySettings(company_name=company.name))
+        positions = []
+        for dept, titles in DEPARTMENTS.items():
+            for title, salary in titles:
+                position = Position(title=title, department=dept, base_salary=salary)
+                db.session.add(position)
+                positions.append(position)
+        db.session.flush()
+
+        employees = []
+        for i in range(args.employees):
+            position = rng.choice(positions)
+            employees.append({
+                'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'email': f'user{i}@company{number}.example.com', 'password': 'x',
+                'role': 'Manager' if i % 20 == 0 else 'Employee',
+                'department': position.department, 'status': 'Active',
+                'position_id': position.id, 'company_id': company.id})
+        db.session.execute(Employee.__table__.insert(), employees)
+        staff = db.session.query(Employee.id, Employee.role).all()
+        employee_ids = [emp_id for emp_id, _ in staff]
+        manager_ids = [emp_id for emp_id, role in staff if role == 'Manager']
+
+        punches = []
+        for _ in range(args.punches):
+            check_in = now - timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+            punches.append({'employee_id': rng.choice(employee_ids), 'check_in': check_in,
+                            'check_out': check_in + timedelta(hours=8), 'company_id': company.id})
+        db.session.execute(Attendance.__table__.insert(), punches)
+
+        leaves = []
+        for _ in range(args.leaves):
+            start = (now - timedelta(days=rng.randint(0, 365))).date()
+            leaves.append({'employee_id': rng.choice(employee_ids), 'leave_type': 'Vacation',
+                           'start_date': start, 'end_date': start + timedelta(days=2),
+                           'status': 'Pending' if rng.random() < 0.1 else 'Approved',
+                           'date_posted': datetime.combine(start, datetime.min.time()),
+                           'company_id': company.id})
+        db.session.execute(LeaveRequest.__table__.insert(), leaves)
+
+        db.session.execute(Client.__table__.insert(), [
+            {'company_name': f'Client {i}', 'email': f'client{i}@example.com', 'status': 'Active',
+             'assigned_manager_id': rng.choice(manager_ids), 'company_id': company.id}
+            for i in range(args.clients)])
+    db.session.commit()
+
+
+def queries():
+    """name -> callable; each runs inside the first company's scope."""
+    return {
+        'login_lookup': lambda: Employee.query.filter_by(
+            email='user7@company1.example.com').first(),
+        'department_roster': lambda: Employee.query.filter_by(department='IT')
+        .order_by(Employee.full_name).all(),
+        'approval_queue': lambda: LeaveRequest.query.filter_by(status='Pending')
+        .order_by(LeaveRequest.date_posted).limit(25).all(),
+        'latest_punches': lambda: Attendance.query.order_by(Attendance.check_in.desc())
+        .limit(50).all(),
+        'client_workload': workload,
+        'payroll_register': lambda: register_page(1).items,
+    }
+
+
+def measure(company_id, iterations, warmup):
+    # Leftovers from building the data would otherwise be collected mid-run
+    db.session.expunge_all()
+    gc.collect()
+    results = {}
+    with tenant_scope(company_id):
+        for name, run in queries().items():
+            latencies = []
+            for i in range(warmup + iterations):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                # A fresh identity map each time, as in a new request
+                db.session.rollback()
+                if i >= warmup:
+                    latencies.append(elapsed)
+            results[name] = summarize(latencies, sum(latencies))
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = create_app()
+    results, by_step = {}, {}
+    with app.app_context():
+        drop_archives(db.engine)
+        db.drop_all()
+        db.create_all()
+        companies = 0
+        for step in args.steps:
+            started = time.perf_counter()
+            while companies < step:
+                companies += 1
+                add_company(companies, args)
+            if db.engine.dialect.name == 'sqlite':
+                with db.engine.begin() as conn:
+                    conn.exec_driver_sql('ANALYZE')
+            print(f"  {step:>4} companies built in {time.perf_counter() - started:6.1f}s",
+                  file=sys.stderr)
+            by_step[step] = measure(1, args.iterations, args.warmup)
+            for name, row in by_step[step].items():
+                results[f'{name}@{step}'] = row
+
+    first, last = by_step[args.steps[0]], by_step[args.steps[-1]]
+    ratios = {name: round(last[name]['p50_ms'] / first[name]['p50_ms'], 2)
+              for name in first if first[name]['p50_ms']}
+    meta = run_metadata(harness='tenancy', database=str(app.config['SQLALCHEMY_DATABASE_URI']),
+                        steps=args.steps, iterations=args.iterations,
+                        per_company={'employees': args.employees, 'punches': args.punches,
+                                     'leaves': args.leaves, 'clients': args.clients},
+                        p50_ratio_last_to_first=ratios)
+    write_results('tenancy', results, meta, args.output)
+
+    slower = {name: ratio for name, ratio in ratios.items()
+              if args.max_ratio and ratio > args.max_ratio}
+    for name, ratio in sorted(slower.items()):
+        print(f"{name}: p50 is {ratio}x slower with {args.steps[-1]} companies than with "
+              f"{args.steps[0]}", file=sys.stderr)
+    if slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
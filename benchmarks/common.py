@@ -0,0 +1,66 @@
+"""Shared helpers for the benchmark scripts: timing stats and result files."""
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile on an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Turn a list of per-request latencies (seconds) into a result row."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        'count': count,
+        'errors': errors,
+        'mean_ms': round(sum(values) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def run_metadata(**extra):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    meta = {
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'git_commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    meta.update(extra)
+    return meta
+
+
+def write_results(kind, results, meta, output=None):
+    """Write results as JSON (to a file or stdout) and a readable table to stderr."""
+    payload = {'kind': kind, 'meta': meta, 'results': results}
+    text = json.dumps(payload, indent=2, sort_keys=True)
+    if output:
+        with open(output, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+
+    header = f"{'scenario':<28}{'count':>8}{'err':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}"
+    print(header, file=sys.stderr)
+    for name, row in results.items():
+        print(f"{name:<28}{row['count']:>8}{row['errors']:>6}"
+              f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+              f"{row['throughput_rps']:>10.1f}", file=sys.stderr)
+    return payload
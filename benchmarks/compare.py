@@ -0,0 +1,64 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare results/before.json results/after.json --threshold 10
+
+Exits with status 1 when any scenario's p95 grew (or throughput fell) by more
+than the threshold percentage, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def pct_change(old, new):
+    if not old:
+        return 0.0
+    return (new - old) / old * 100.0
+
+
+def compare(before, after, threshold):
+    regressions = []
+    rows = []
+    for name in sorted(set(before['results']) | set(after['results'])):
+        old = before['results'].get(name)
+        new = after['results'].get(name)
+        if not old or not new:
+            rows.append((name, None, None, None, None, 'only in ' + ('after' if new else 'before')))
+            continue
+        p50 = pct_change(old['p50_ms'], new['p50_ms'])
+        p95 = pct_change(old['p95_ms'], new['p95_ms'])
+        p99 = pct_change(old['p99_ms'], new['p99_ms'])
+        rps = pct_change(old['throughput_rps'], new['throughput_rps'])
+        flag = ''
+        if p95 > threshold or rps < -threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        rows.append((name, p50, p95, p99, rps, flag))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed slowdown in percent before failing.')
+    args = parser.parse_args(argv)
+
+    rows, regressions = compare(load(args.before), load(args.after), args.threshold)
+    print(f"{'scenario':<28}{'p50 %':>9}{'p95 %':>9}{'p99 %':>9}{'rps %':>9}")
+    for name, p50, p95, p99, rps, flag in rows:
+        if p50 is None:
+            print(f"{name:<28}{'':>36}  {flag}")
+            continue
+        print(f"{name:<28}{p50:>+9.1f}{p95:>+9.1f}{p99:>+9.1f}{rps:>+9.1f}  {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""Populate the HRMS schema with a large, reproducible synthetic dataset.
+
+The default size mirrors a large customer: 50k employees, 10M attendance
+punches and three years of leaves, payroll and expenses. Rows are written
+with chunked bulk inserts through SQLAlchemy Core, so a full-size SQLite
+database builds in a few minutes.
+
+Usage (from the project root):
+    DATABASE_URL=sqlite:////tmp/hrms_bench.db python -m benchmarks.generate_data
+    DATABASE_URL=sqlite:////tmp/hrms_small.db python -m benchmarks.generate_data --scale 0.01
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from app import create_app, db, bcrypt
+from app.models import (Employee, Attendance, LeaveRequest, Position, Client,
+                        Department, PayrollRecord, Expense, CompanySettings)
+from app.tenancy import current_tenant_id, ensure_default_company, tenant_scope
+from app.payroll import monthly_pay
+from app.search import rebuild_search_index
+from app.archive import drop_archives, refresh_attendance_view
+from app.hierarchy import rebuild_hierarchy
+
+
+# Every generated account shares this password so the benchmark can log in.
+BENCH_PASSWORD = 'bench123'
+
+# Fixed accounts, one per role, used by the route benchmarks and load test.
+BENCH_ACCOUNTS = {
+    'owner': ('owner@company.com', 'Company Owner', 'Executive'),
+    'finance': ('finance@company.com', 'Finance', 'Finance'),
+    'hr': ('hr@company.com', 'HR Team', 'HR'),
+    'manager': ('manager@company.com', 'Manager', 'IT'),
+    'employee': ('employee@company.com', 'Employee', 'IT'),
+}
+
+DEPARTMENTS = {
+    'Finance': [('Finance Manager', 55000), ('Accountant', 45000), ('Financial Analyst', 48000)],
+    'IT': [('Software Engineer', 60000), ('IT Support Specialist', 35000),
+           ('Cybersecurity Analyst', 55000), ('Data Engineer', 62000)],
+    'HR': [('HR Manager', 50000), ('Recruiter', 30000), ('Payroll Officer', 32000)],
+    'Sales': [('Sales Manager', 58000), ('Account Executive', 42000), ('Sales Associate', 28000)],
+    'Executive': [('CEO', 150000), ('Operations Manager', 80000)],
+}
+LEVELS = [('Junior ', 0.8), ('', 1.0), ('Senior ', 1.3)]
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+               'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+               'Thomas', 'Sarah', 'Carlos', 'Maria', 'Wei', 'Aisha', 'Kenji', 'Priya', 'Olu', 'Ana']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+              'Thomas', 'Taylor', 'Moore', 'Santos', 'Reyes', 'Cruz', 'Tanaka', 'Okafor', 'Patel']
+
+EXPENSE_CATEGORIES = ['Utilities', 'Rent', 'Software', 'Marketing',
+                      'Office Supplies', 'Travel', 'Other']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply every default row count (e.g. 0.01 for a quick run).')
+    parser.add_argument('--employees', type=int, help='Employee count (default 50000 * scale).')
+    parser.add_argument('--punches', type=int, help='Attendance rows (default 10M * scale).')
+    parser.add_argument('--clients', type=int, help='Client count (default 5000 * scale).')
+    parser.add_argument('--years', type=int, default=3,
+                        help='Years of leave, payroll and expense history.')
+    parser.add_argument('--chunk-size', type=int, default=20000,
+                        help='Rows per bulk insert statement batch.')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def bulk_insert(table, rows_iter, chunk_size, label):
+    """Insert rows from a generator in fixed-size chunks; returns the row count.
+
+    Rows of tenant tables are stamped with the current company, which Core
+    inserts would otherwise leave empty.
+    """
+    if 'company_id' in table.c:
+        company_id = current_tenant_id()
+        rows_iter = (dict(row, company_id=company_id) for row in rows_iter)
+    started = time.perf_counter()
+    total = 0
+    chunk = []
+    with db.engine.begin() as conn:
+        for row in rows_iter:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                conn.execute(table.insert(), chunk)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            conn.execute(table.insert(), chunk)
+            total += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<12} {total:>10,} rows in {elapsed:6.1f}s", file=sys.stderr)
+    return total
+
+
+def sync_id_sequence(table):
+    """Move a PostgreSQL id sequence past rows inserted with explicit ids.
+
+    Otherwise the first ORM insert after the load gets an id that is taken.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"coalesce(max(id), 1), max(id) IS NOT NULL) FROM {table.name}")
+
+
+def tune_sqlite():
+    # Loading speed matters more than durability for a throwaway dataset
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+
+
+def month_starts(years, today):
+    first = date(today.year, today.month, 1)
+    months = []
+    for i in range(years * 12, 0, -1):
+        y, m = divmod(first.year * 12 + first.month - 1 - i, 12)
+        months.append(date(y, m + 1, 1))
+    return months
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    n_employees = args.employees or max(len(BENCH_ACCOUNTS), int(50000 * args.scale))
+    n_punches = args.punches if args.punches is not None else int(10000000 * args.scale)
+    n_clients = args.clients if args.clients is not None else int(5000 * args.scale)
+    today = date.today()
+    now = datetime.now()
+
+    tune_sqlite()
+
+    # --- 1. Reference data ---
+    db.session.add(CompanySettings(company_name="Benchmark Corp"))
+    positions = []  # (id, department, base_salary)
+    for dept_name, titles in DEPARTMENTS.items():
+        dept = Department(name=dept_name)
+        db.session.add(dept)
+        db.session.flush()
+        for title, salary in titles:
+            for prefix, factor in LEVELS:
+                pos = Position(title=prefix + title, department=dept_name,
+                               base_salary=round(salary * factor, 2), department_id=dept.id)
+                db.session.add(pos)
+                db.session.flush()
+                positions.append((pos.id, dept_name, pos.base_salary))
+    db.session.commit()
+
+    by_dept = {}
+    for pos in positions:
+        by_dept.setdefault(pos[1], []).append(pos)
+    dept_names = list(by_dept)
+
+    # --- 2. Employees ---
+    # One bcrypt hash shared by everyone; hashing 50k passwords would take hours
+    hashed_pw = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+    emp_salary = {}
+    active_ids = []
+    # Managers per department; each new manager reports to an earlier one,
+    # which gives a reporting tree several levels deep
+    dept_managers = {}
+
+    def employee_rows():
+        emp_id = 0
+        owner_id = None
+        for key, (email, role, dept_name) in BENCH_ACCOUNTS.items():
+            emp_id += 1
+            pos = by_dept[dept_name][0]
+            emp_salary[emp_id] = pos[2]
+            active_ids.append(emp_id)
+            if key == 'owner':
+                owner_id, manager_id = emp_id, None
+            elif key == 'employee':
+                manager_id = dept_managers[BENCH_ACCOUNTS['manager'][2]][0]
+            else:
+                manager_id = owner_id
+            if role == 'Manager':
+                dept_managers.setdefault(dept_name, []).append(emp_id)
+            yield {'id': emp_id, 'full_name': f"Bench {key.title()}", 'email': email,
+                   'password': hashed_pw, 'role': role, 'department': dept_name,
+                   'status': 'Active', 'position_id': pos[0], 'manager_id': manager_id}
+        while emp_id < n_employees:
+            emp_id += 1
+            dept_name = rng.choice(dept_names)
+            pos = rng.choice(by_dept[dept_name])
+            roll = rng.random()
+            role = ('Manager' if roll < 0.05 else 'HR Team' if roll < 0.07
+                    else 'Finance' if roll < 0.09 else 'Employee')
+            roll = rng.random()
+            status = 'Pending' if roll < 0.02 else 'Inactive' if roll < 0.05 else 'Active'
+            emp_salary[emp_id] = pos[2]
+            if status == 'Active':
+                active_ids.append(emp_id)
+            managers = dept_managers.get(dept_name)
+            manager_id = rng.choice(managers) if managers else owner_id
+            if role == 'Manager':
+                dept_managers.setdefault(dept_name, []).append(emp_id)
+            yield {'id': emp_id,
+                   'full_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                   'email': f"user{emp_id}@company.com", 'password': hashed_pw,
+                   'role': role, 'department': dept_name, 'status': status,
+                   'position_id': pos[0], 'manager_id': manager_id}
+
+    print("Generating dataset:", file=sys.stderr)
+    # Explicit ids, so manager_id can point at rows from the same load
+    bulk_insert(Employee.__table__, employee_rows(), args.chunk_size, 'employees')
+    sync_id_sequence(Employee.__table__)
+    started = time.perf_counter()
+    lines = rebuild_hierarchy(db.engine)
+    print(f"  {'hierarchy':<12} {lines:>10} rows in {time.perf_counter() - started:6.1f}s",
+          file=sys.stderr)
+    manager_ids = [row.id for row in db.session.query(Employee.id).filter_by(role='Manager')]
+
+    # --- 3. Attendance punches: consecutive workdays back from today ---
+    def attendance_rows():
+        if not n_punches:
+            return
+        per_emp, extra = divmod(n_punches, len(active_ids))
+        for idx, emp_id in enumerate(active_ids):
+            count = per_emp + (1 if idx < extra else 0)
+            day = today
+            for i in range(count):
+                while day.weekday() >= 5:
+                    day -= timedelta(days=1)
+                check_in = datetime(day.year, day.month, day.day,
+                                    8 + rng.randint(0, 2), rng.randint(0, 59))
+                # About one in ten people are still on the clock today
+                if i == 0 and day == today and rng.random() < 0.1:
+                    check_out = None
+                else:
+                    check_out = check_in + timedelta(hours=8, minutes=rng.randint(0, 90))
+                yield {'employee_id': emp_id, 'check_in': check_in, 'check_out': check_out}
+                day -= timedelta(days=1)
+
+    bulk_insert(Attendance.__table__, attendance_rows(), args.chunk_size, 'attendance')
+
+    # --- 4. Leave requests: a handful per employee per year ---
+    horizon_days = args.years * 365
+
+    def leave_rows():
+        for emp_id in range(1, n_employees + 1):
+            for _ in range(rng.randint(2, 6) * args.years):
+                start = today - timedelta(days=rng.randint(0, horizon_days))
+                end = start + timedelta(days=rng.randint(0, 9))
+                if start > today - timedelta(days=30):
+                    status = rng.choice(['Pending', 'Approved', 'Rejected'])
+                else:
+                    status = 'Approved' if rng.random() < 0.85 else 'Rejected'
+                yield {'leave_type': rng.choice(['Sick', 'Annual', 'Casual']),
+                       'start_date': start, 'end_date': end, 'status': status,
+                       'date_posted': datetime.combine(start, datetime.min.time())
+                       - timedelta(days=rng.randint(1, 20)),
+                       'employee_id': emp_id}
+
+    bulk_insert(LeaveRequest.__table__, leave_rows(), args.chunk_size, 'leaves')
+
+    # --- 5. Payroll history: one record per active employee per past month ---
+    months = month_starts(args.years, today)
+
+    def payroll_rows():
+        for month in months:
+            processed = datetime(month.year, month.month, 28, 17, 0)
+            label = month.strftime('%B %Y')
+            for emp_id in active_ids:
+                yield {'employee_id': emp_id,
+                       'amount_paid': monthly_pay(emp_salary[emp_id]),
+                       'date_processed': processed, 'month_year': label}
+
+    bulk_insert(PayrollRecord.__table__, payroll_rows(), args.chunk_size, 'payroll')
+
+    # --- 6. Expenses: a few hundred per month ---
+    def expense_rows():
+        for month in months:
+            for _ in range(max(1, int(300 * args.scale))):
+                incurred = month + timedelta(days=rng.randint(0, 27))
+                category = rng.choice(EXPENSE_CATEGORIES)
+                yield {'description': f"{category} invoice #{rng.randint(1000, 99999)}",
+                       'category': category,
+                       'amount': round(rng.uniform(20, 5000), 2),
+                       'date_incurred': incurred,
+                       'date_posted': datetime.combine(incurred, datetime.min.time())}
+
+    bulk_insert(Expense.__table__, expense_rows(), args.chunk_size, 'expenses')
+
+    # --- 7. Clients spread over the managers ---
+    def client_rows():
+        for i in range(1, n_clients + 1):
+            yield {'company_name': f"Client {i} {rng.choice(LAST_NAMES)} Holdings",
+                   'contact_person': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                   'email': f"contact{i}@client{i}.example.com",
+                   'phone': f"+1-555-{rng.randint(1000000, 9999999)}",
+                   'status': 'Active' if rng.random() < 0.9 else 'Inactive',
+                   'assigned_manager_id': rng.choice(manager_ids) if manager_ids else None}
+
+    bulk_insert(Client.__table__, client_rows(), args.chunk_size, 'clients')
+
+    # Bulk inserts bypass the ORM, so build the search index in one pass
+    started = time.perf_counter()
+    rebuild_search_index(db.engine)
+    print(f"  {'search':<12} {'':>10} index built in {time.perf_counter() - started:6.1f}s",
+          file=sys.stderr)
+
+    with db.engine.begin() as conn:
+        refresh_attendance_view(conn)
+        if db.engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('ANALYZE')
+    print(f"Done in {datetime.now() - now}.", file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = create_app()
+    with app.app_context():
+        # The archive view depends on attendance, so it goes first
+        drop_archives(db.engine)
+        db.drop_all()
+        db.create_all()
+        with tenant_scope(ensure_default_company().id):
+            generate(args)
+
+
+if __name__ == "__main__":
+    main()
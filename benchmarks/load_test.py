@@ -0,0 +1,169 @@
+"""Multi-threaded HTTP load generator for a running HRMS server.
+
+Start the app (e.g. ``gunicorn -w 4 'app:create_app()'`` or ``python run.py``) on a
+database built by ``benchmarks.generate_data``, then:
+    python -m benchmarks.load_test --base-url http://127.0.0.1:5000 \
+        --threads 16 --duration 60 --output results/load.json
+
+Each worker thread logs in as one of the benchmark accounts and loops over
+the route mix for its role until the duration is up.
+"""
+import argparse
+import http.cookiejar
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from benchmarks.common import summarize, run_metadata, write_results
+from benchmarks.generate_data import BENCH_ACCOUNTS, BENCH_PASSWORD
+
+
+# Route mix per role as (name, path, method); clock-in/out alternate so every
+# punch is a real write. The payroll run only does the full run the first
+# time in a month; after that it is timed on the duplicate-month check.
+# {payslip_id} is filled in from the worker's own payslip list.
+ROLE_MIX = {
+    'owner': [('dashboard_owner', '/dashboard', 'GET')],
+    'manager': [('dashboard_manager', '/dashboard', 'GET'), ('org_chart', '/org-chart', 'GET')],
+    'finance': [('payroll', '/payroll', 'GET'),
+                ('process_all_salaries', '/finance/process-payroll', 'POST')],
+    'employee': [('dashboard_employee', '/dashboard', 'GET'), ('attendance', '/attendance', 'GET'),
+                 ('clock_in', '/attendance/clock-in', 'GET'),
+                 ('clock_out', '/attendance/clock-out', 'GET'),
+                 ('my_payslips', '/my-payslips', 'GET'),
+                 ('download_payslip', '/download-payslip/{payslip_id}', 'GET')],
+}
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+PAYSLIP_RE = re.compile(r'/download-payslip/(\d+)')
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Time each request on its own; following redirects would double-count
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def make_opener():
+    jar = http.cookiejar.CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), NoRedirect())
+
+
+def fetch(opener, url, data=None, timeout=30):
+    """Return (status, seconds) for one request; network errors count as status 0."""
+    started = time.perf_counter()
+    try:
+        with opener.open(url, data=data, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as err:
+        err.read()
+        status = err.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def login(opener, base_url, role):
+    status, _ = fetch(opener, base_url + '/logout')
+    with opener.open(base_url + '/login', timeout=30) as response:
+        page = response.read().decode('utf-8', 'replace')
+    match = CSRF_RE.search(page)
+    form = {'email': BENCH_ACCOUNTS[role][0], 'password': BENCH_PASSWORD}
+    if match:
+        form['csrf_token'] = match.group(1)
+    return fetch(opener, base_url + '/login', urllib.parse.urlencode(form).encode())
+
+
+def route_mix(opener, base_url, role):
+    """The role's routes with placeholders filled in; routes that can't be are dropped."""
+    values = {}
+    if any('{payslip_id}' in path for _, path, _ in ROLE_MIX[role]):
+        with opener.open(base_url + '/my-payslips', timeout=30) as response:
+            match = PAYSLIP_RE.search(response.read().decode('utf-8', 'replace'))
+        if match:
+            values['payslip_id'] = match.group(1)
+    mix = []
+    for name, path, method in ROLE_MIX[role]:
+        try:
+            mix.append((name, path.format(**values), method))
+        except KeyError:
+            continue
+    return mix
+
+
+class Recorder:
+    """Thread-safe collection of latencies per route name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, name, status, took):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(took)
+            if status not in (200, 302):
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def worker(base_url, role, deadline, recorder, relogin_every):
+    opener = make_opener()
+    status, took = login(opener, base_url, role)
+    recorder.add('login', status, took)
+    mix = route_mix(opener, base_url, role)
+    i = 0
+    while time.perf_counter() < deadline:
+        name, path, method = mix[i % len(mix)]
+        status, took = fetch(opener, base_url + path, data=b'' if method == 'POST' else None)
+        recorder.add(name, status, took)
+        i += 1
+        if relogin_every and i % relogin_every == 0:
+            status, took = login(opener, base_url, role)
+            recorder.add('login', status, took)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run.')
+    parser.add_argument('--roles', nargs='*', default=list(ROLE_MIX),
+                        help='Roles to spread the threads over (round robin).')
+    parser.add_argument('--relogin-every', type=int, default=50,
+                        help='Log in again after this many requests (0 to disable).')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    base_url = args.base_url.rstrip('/')
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    threads = []
+    for n in range(args.threads):
+        role = args.roles[n % len(args.roles)]
+        t = threading.Thread(target=worker, daemon=True,
+                             args=(base_url, role, deadline, recorder, args.relogin_every))
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    # Throughput here is requests per wall-clock second across all threads
+    results = {name: summarize(values, wall, recorder.errors.get(name, 0))
+               for name, values in sorted(recorder.latencies.items())}
+    meta = run_metadata(harness='http_load', base_url=base_url, threads=args.threads,
+                        duration_s=round(wall, 2), roles=args.roles)
+    write_results('load', results, meta, args.output)
+
+
+if __name__ == "__main__":
+    main()
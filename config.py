@@ -3,5 +3,63 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'secret_hr_key_12345'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///hrms.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///hrms.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Read replica (app/replica.py): routes marked @use_replica read from it
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    # A user reads from the primary for this long after their last write
+    REPLICA_STICKY_SECONDS = 10
+    # Fall back to the primary when the replica is further behind than this
+    REPLICA_MAX_LAG_SECONDS = int(os.environ.get('REPLICA_MAX_LAG_SECONDS', 30))
+    REPLICA_CHECK_INTERVAL = 5
+
+    # Rendered-fragment cache (app/cache.py)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_SIZE = 512
+    # Tables whose writes bump a version stamp used by cached fragments
+    CACHE_VERSIONED_TABLES = {'employee', 'position', 'client', 'department', 'company_settings'}
+
+    # Fingerprinted static files and uploaded logos are cached for a year
+    STATIC_MAX_AGE = 31536000
+
+    # Response compression (app/compress.py)
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 5
+
+    # Live updates over Server-Sent Events (app/events.py)
+    EVENTS_HEARTBEAT_SECONDS = 15
+    # Streams are closed after this long; browsers reconnect and resume
+    EVENTS_STREAM_SECONDS = 300
+    EVENTS_HISTORY = 200
+    EVENTS_QUEUE_SIZE = 100
+
+    # Multi-company tenancy (app/tenancy.py): the company comes from this
+    # header, else the subdomain under TENANT_BASE_DOMAIN, else TENANT_DEFAULT
+    TENANT_HEADER = os.environ.get('TENANT_HEADER', 'X-Company')
+    TENANT_BASE_DOMAIN = os.environ.get('TENANT_BASE_DOMAIN')
+    TENANT_DEFAULT = os.environ.get('TENANT_DEFAULT', 'main')
+
+    # Write-behind audit log (app/audit.py): events are spooled to disk and
+    # written in batches every AUDIT_FLUSH_SECONDS or AUDIT_BATCH_SIZE events
+    AUDIT_FLUSH_SECONDS = float(os.environ.get('AUDIT_FLUSH_SECONDS', 2))
+    AUDIT_BATCH_SIZE = 500
+    # False: no background thread; each request writes its events at teardown
+    AUDIT_FLUSH_IN_BACKGROUND = os.environ.get('AUDIT_FLUSH_IN_BACKGROUND', '1') != '0'
+    # Defaults to <instance>/audit_spool
+    AUDIT_SPOOL_DIR = os.environ.get('AUDIT_SPOOL_DIR')
+    # fsync every event: survives power loss too, at the cost of a disk flush
+    AUDIT_SPOOL_FSYNC = os.environ.get('AUDIT_SPOOL_FSYNC') == '1'
+
+    # Payroll what-if simulation (app/simulation.py)
+    SIMULATION_MAX_SCENARIOS = 500
+
+    # Attendance archival (app/archive.py): closed sessions older than this
+    # many days leave the hot table. Format is 'table' or 'parquet'.
+    ATTENDANCE_ARCHIVE_DAYS = int(os.environ.get('ATTENDANCE_ARCHIVE_DAYS', 90))
+    ATTENDANCE_ARCHIVE_FORMAT = os.environ.get('ATTENDANCE_ARCHIVE_FORMAT', 'table')
+    # Defaults to <instance>/attendance_archive
+    ATTENDANCE_ARCHIVE_DIR = os.environ.get('ATTENDANCE_ARCHIVE_DIR')
@@ -1,14 +1,23 @@
+from flask import g
 from app import create_app, db, bcrypt
+from app.archive import drop_archives, refresh_attendance_view
 from app.models import Employee, Position
+from app.search import rebuild_search_index
+from app.tenancy import ensure_default_company
 
 app = create_app()
 
 
 def seed_database():
     with app.app_context():
-        # 1. Clear existing data
+        # 1. Clear existing data; the archive view depends on attendance, so it goes first
+        drop_archives(db.engine)
         db.drop_all()
         db.create_all()
+        with db.engine.begin() as conn:
+            refresh_attendance_view(conn)
+        # Everything seeded below belongs to the default company
+        g.tenant_id = ensure_default_company().id
 
         print("Creating positions...")
         # 2. Define Positions grouped by Department
@@ -51,6 +60,8 @@ def seed_database():
         db.session.add(admin)
 
         db.session.commit()
+        # The index is not a model table, so drop_all() left the old documents
+        rebuild_search_index(db.engine)
         print("Database seeded successfully!")
 
 
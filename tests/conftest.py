@@ -0,0 +1,88 @@
+"""Shared fixtures: a small generated company, copied fresh for every test.
+
+The dataset comes from ``benchmarks.generate_data``, so tests log in with the
+same fixed accounts as the benchmarks (``owner@company.com`` and so on,
+password ``bench123``).
+"""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from app import create_app, db
+from app.cache import data_cache, fragment_cache
+from app.tenancy import ensure_default_company, tenant_scope
+from benchmarks.generate_data import BENCH_ACCOUNTS, BENCH_PASSWORD, generate, parse_args
+from config import Config
+
+DATASET_ARGS = ['--employees', '60', '--punches', '600', '--clients', '24', '--years', '1']
+
+
+def make_config(path, **overrides):
+    settings = {
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_BINDS': {},
+        'BCRYPT_LOG_ROUNDS': 4,
+        'AUDIT_FLUSH_IN_BACKGROUND': False,
+        'AUDIT_SPOOL_DIR': os.path.join(os.path.dirname(path), 'audit_spool'),
+        'ATTENDANCE_ARCHIVE_DIR': os.path.join(os.path.dirname(path), 'attendance_archive'),
+    }
+    settings.update(overrides)
+    return type('TestConfig', (Config,), settings)
+
+
+@pytest.fixture(scope='session')
+def dataset(tmp_path_factory):
+    """Path of the generated database every test starts from."""
+    path = str(tmp_path_factory.mktemp('dataset') / 'hrms.db')
+    app = create_app(make_config(path))
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        with tenant_scope(ensure_default_company().id):
+            generate(parse_args(DATASET_ARGS))
+        db.session.remove()
+        db.engine.dispose()
+    # A single file that can be copied, rather than a WAL pair
+    with sqlite3.connect(path) as conn:
+        conn.execute('PRAGMA journal_mode=DELETE')
+    return path
+
+
+@pytest.fixture
+def make_app(dataset, tmp_path):
+    """Build an app on a fresh copy of the dataset; keyword arguments override config."""
+    path = str(tmp_path / 'hrms.db')
+    shutil.copy(dataset, path)
+
+    def build(**overrides):
+        # Fragments and query results are cached per process, keyed on
+        # version stamps that restart with every copy of the database
+        fragment_cache.clear()
+        data_cache.clear()
+        return create_app(make_config(path, **overrides))
+    return build
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, role):
+    email = BENCH_ACCOUNTS[role][0]
+    return client.post('/login', data={'email': email, 'password': BENCH_PASSWORD})
+
+
+def account_id(app, role):
+    from app.models import Employee
+    with app.app_context():
+        return db.session.query(Employee.id).filter_by(email=BENCH_ACCOUNTS[role][0]).scalar()
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+from app import db
+from app.models import Employee
+from tests.conftest import login
+
+BLUEPRINTS = {'main', 'auth', 'leave', 'attendance', 'finance', 'admin', 'search', 'events'}
+
+
+def test_run_module_exposes_app_without_heavy_imports():
+    # `gunicorn run:app` and `flask --app run` import the module-level app
+    probe = ("import sys, run; print(type(run.app).__name__, "
+             "sorted(m for m in ('fpdf', 'numpy', 'pyarrow') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                         check=True)
+    assert out.stdout.split() == ['Flask', '[]']
+
+
+def test_factory_registers_every_blueprint(app):
+    assert BLUEPRINTS <= set(app.blueprints)
+    assert 'init-db' in app.cli.commands
+
+
+def test_init_db_is_safe_to_rerun(app):
+    with app.app_context():
+        before = Employee.query.count()
+        result = app.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        assert Employee.query.count() == before
+
+
+def test_payslip_pdf_loads_fpdf_on_demand(app, client):
+    from app.models import PayrollRecord
+    login(client, 'employee')
+    with app.app_context():
+        employee_id = db.session.query(Employee.id).filter_by(email='employee@company.com').scalar()
+        record = PayrollRecord.query.filter_by(employee_id=employee_id).first()
+        record_id = record.id
+    response = client.get(f'/download-payslip/{record_id}')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
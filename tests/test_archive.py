@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import click
+import pytest
+
+from app import db
+from app.archive import archive_attendance, attendance_history, pyarrow, verify_archives
+from app.models import Attendance
+from tests.conftest import account_id, login
+
+
+def add_old_sessions(app, employee_id, months=3):
+    """Three closed sessions a month, starting four months back, plus one open."""
+    start = datetime.now() - timedelta(days=120)
+    with app.app_context():
+        for m in range(months):
+            for d in range(3):
+                check_in = start - timedelta(days=30 * m + d)
+                db.session.add(Attendance(employee_id=employee_id, check_in=check_in,
+                                          check_out=check_in + timedelta(hours=8), company_id=1))
+        db.session.add(Attendance(employee_id=employee_id, check_in=start, company_id=1))
+        db.session.commit()
+
+
+def test_old_closed_sessions_move_and_stay_visible(app):
+    employee_id = account_id(app, 'employee')
+    add_old_sessions(app, employee_id)
+    with app.app_context():
+        hot_before = Attendance.query.count()
+        history_before = attendance_history(employee_id)[0].count()
+        done = archive_attendance(90)
+        moved = sum(n for _, n in done)
+        assert moved == 9
+        assert Attendance.query.count() == hot_before - moved
+        # The open session is never archived
+        assert Attendance.query.filter_by(employee_id=employee_id, check_out=None).count() >= 1
+        assert attendance_history(employee_id)[0].count() == history_before
+        assert verify_archives() == []
+
+
+def test_verify_catches_lost_rows(app):
+    add_old_sessions(app, account_id(app, 'employee'))
+    with app.app_context():
+        month, _ = archive_attendance(90)[0]
+        db.session.execute(db.text(f"DELETE FROM attendance_archive_{month.replace('-', '_')} "
+                                   "WHERE id = (SELECT min(id) FROM "
+                                   f"attendance_archive_{month.replace('-', '_')})"))
+        db.session.commit()
+        problems = verify_archives()
+    assert len(problems) == 1 and 'expected 3 rows' in problems[0]
+
+
+def test_dry_run_moves_nothing(app):
+    add_old_sessions(app, account_id(app, 'employee'))
+    with app.app_context():
+        before = Attendance.query.count()
+        result = app.test_cli_runner().invoke(args=['archive-attendance', '--dry-run'])
+        assert '9 rows would be archived' in result.output
+        assert Attendance.query.count() == before
+
+
+def test_history_page_includes_archived_punches(app, client):
+    employee_id = account_id(app, 'employee')
+    add_old_sessions(app, employee_id, months=1)
+    with app.app_context():
+        archive_attendance(90)
+    oldest = (datetime.now() - timedelta(days=122)).strftime('%Y-%m-%d')
+    login(client, 'employee')
+    pages = [client.get(f'/attendance?page={n}').get_data(as_text=True) for n in range(1, 6)]
+    assert any(oldest in page for page in pages)
+
+
+@pytest.mark.skipif(pyarrow is not None, reason='pyarrow is installed')
+def test_parquet_needs_pyarrow(app):
+    with app.app_context(), pytest.raises(click.ClickException):
+        archive_attendance(90, 'parquet')
+
+
+def test_parquet_round_trip_keeps_microseconds(app, tmp_path):
+    pytest.importorskip('pyarrow')
+    from app.archive import read_parquet_archive
+    employee_id = account_id(app, 'employee')
+    add_old_sessions(app, employee_id, months=1)
+    with app.app_context():
+        punches = Attendance.query.filter(Attendance.employee_id == employee_id,
+                                          Attendance.check_out.isnot(None))
+        for n, punch in enumerate(punches):
+            punch.check_in = punch.check_in.replace(microsecond=1000 + n)
+        db.session.commit()
+        expected = {(p.id, p.check_in, p.check_out) for p in punches
+                    if p.check_in < datetime.now() - timedelta(days=90)}
+        history_before = attendance_history(employee_id)[0].count()
+
+        archive_attendance(90, 'parquet', directory=str(tmp_path))
+
+        table = read_parquet_archive(employee_id=employee_id, directory=str(tmp_path))
+        rows = set(zip(*(table.column(name).to_pylist()
+                         for name in ('id', 'check_in', 'check_out'))))
+        assert rows == expected
+        assert verify_archives() == []
+        # Export-only: the history view no longer shows these months
+        assert attendance_history(employee_id)[0].count() == history_before - len(expected)
+
+
+def test_parquet_file_is_removed_when_the_commit_fails(app, tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    from app import archive
+    add_old_sessions(app, account_id(app, 'employee'), months=1)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('commit failed')
+
+    with app.app_context():
+        before = Attendance.query.count()
+        monkeypatch.setattr(archive, 'delete', fail)
+        with pytest.raises(RuntimeError):
+            archive_attendance(90, 'parquet', directory=str(tmp_path))
+        assert list(tmp_path.rglob('*.parquet')) == []
+        assert Attendance.query.count() == before
+
+        monkeypatch.undo()
+        moved = sum(n for _, n in archive_attendance(90, 'parquet', directory=str(tmp_path)))
+        # A rerun archives each punch exactly once
+        assert archive.read_parquet_archive(directory=str(tmp_path)).num_rows == moved
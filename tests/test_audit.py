@@ -0,0 +1,173 @@
+from datetime import datetime
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app import audit, db
+from app.models import AuditEvent
+from app.tenancy import company_id_for, tenant_scope
+from tests.conftest import account_id, login
+
+
+def spooled_event(**fields):
+    return {'event_id': uuid.uuid4().hex, 'occurred_at': '2030-01-01T09:00:00',
+            'company_id': 1, 'actor_id': None, 'actor_email': None, 'action': 'test.event',
+            'target_type': None, 'target_id': None, 'details': None, 'ip': None, **fields}
+
+
+def test_recording_does_not_reload_the_actor(app, client):
+    hr_id = account_id(app, 'hr')
+    employee_id = account_id(app, 'employee')
+    login(client, 'hr')
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', collect)
+    try:
+        client.post(f'/employee/update_status/{employee_id}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', collect)
+
+    update = next(i for i, (sql, _) in enumerate(statements) if sql.startswith('UPDATE employee'))
+    reloads = [sql for sql, params in statements[update:]
+               if sql.startswith('SELECT') and 'FROM employee' in sql and hr_id in tuple(params)]
+    assert reloads == []
+    with app.app_context():
+        stored = AuditEvent.query.filter_by(action='employee.status_changed').one()
+        assert (stored.actor_id, stored.actor_email) == (hr_id, 'hr@company.com')
+        assert stored.target_id == employee_id
+
+
+def test_events_are_written_when_the_request_ends(app, client):
+    login(client, 'hr')
+    client.post(f'/employee/update_status/{account_id(app, "employee")}')
+    assert audit.writer.pending() == 0
+    # Committed, so the spool file is gone
+    assert os.listdir(app.config['AUDIT_SPOOL_DIR']) == []
+    with app.app_context():
+        assert AuditEvent.query.filter_by(action='employee.status_changed').count() == 1
+
+
+def test_spool_files_left_by_a_crash_are_replayed_once(app):
+    spool_dir = app.config['AUDIT_SPOOL_DIR']
+    os.makedirs(spool_dir, exist_ok=True)
+    events = [spooled_event(target_id=i) for i in range(3)]
+    with app.app_context():
+        # One of them made it to the database before the crash
+        audit.insert_events(db.engine, [dict(events[0], occurred_at=datetime(2030, 1, 1, 9))])
+    with open(os.path.join(spool_dir, '1-dead-1.jsonl'), 'w') as spool:
+        for e in events:
+            spool.write(json.dumps(e) + '\n')
+        # The last line of a process killed mid-write
+        spool.write('{"event_id": "cut')
+
+    assert audit.writer.recover() == 2
+    assert os.listdir(spool_dir) == []
+    with app.app_context():
+        assert AuditEvent.query.filter_by(action='test.event').count() == 3
+
+
+def test_audit_flush_command_replays_spools(app):
+    spool_dir = app.config['AUDIT_SPOOL_DIR']
+    os.makedirs(spool_dir, exist_ok=True)
+    with open(os.path.join(spool_dir, '1-dead-1.jsonl'), 'w') as spool:
+        spool.write(json.dumps(spooled_event()) + '\n')
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['audit-flush'])
+    assert '1 audit event(s) recovered' in result.output
+
+
+def test_api_pages_newest_first_with_filters(app, client):
+    with app.app_context():
+        audit.insert_events(db.engine, [
+            spooled_event(occurred_at=datetime(2030, 1, 1, 9), target_type='client',
+                          target_id=i, action='client.reassigned' if i % 2 else 'test.event')
+            for i in range(7)])
+    login(client, 'owner')
+
+    first = client.get('/api/audit', query_string={'per_page': 3}).get_json()
+    second = client.get('/api/audit', query_string={'per_page': 3,
+                                                    'before': first['next_before']}).get_json()
+    ids = [e['id'] for e in first['events'] + second['events']]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 6
+
+    filtered = client.get('/api/audit', query_string={'action': 'client.reassigned'}).get_json()
+    assert [e['target_id'] for e in filtered['events']] == [5, 3, 1]
+    assert filtered['next_before'] is None
+
+    client.get('/logout')
+    login(client, 'hr')
+    assert client.get('/api/audit').status_code in (302, 403)
+
+
+@pytest.mark.parametrize('per_page', [0, -5])
+def test_api_pages_at_least_one_event(app, client, per_page):
+    with app.app_context():
+        audit.insert_events(db.engine, [spooled_event(occurred_at=datetime(2030, 1, 1, 9),
+                                                      target_id=i) for i in range(3)])
+    login(client, 'owner')
+
+    seen, before = [], None
+    for _ in range(4):
+        page = client.get('/api/audit', query_string={'per_page': per_page, 'before': before,
+                                                      'action': 'test.event'}).get_json()
+        assert len(page['events']) <= 1
+        seen += [e['target_id'] for e in page['events']]
+        before = page['next_before']
+        if before is None:
+            break
+    # Following the cursor skips nothing
+    assert seen == [2, 1, 0]
+
+
+def test_audit_page_rejects_empty_pages(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        for per_page in (0, -5):
+            with pytest.raises(ValueError):
+                audit.audit_page(per_page=per_page)
+
+
+def test_settings_change_does_not_reload_the_settings(app, client):
+    login(client, 'owner')
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', collect)
+    try:
+        client.post('/settings', data={'company_name': 'Renamed Ltd'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', collect)
+
+    update = next(i for i, sql in enumerate(statements) if sql.startswith('UPDATE company_settings'))
+    assert [sql for sql in statements[update:]
+            if sql.startswith('SELECT') and 'FROM company_settings' in sql] == []
+    with app.app_context():
+        stored = AuditEvent.query.filter_by(action='settings.updated').one()
+        assert stored.target_type == 'company_settings' and stored.target_id is not None
+
+
+def test_each_company_sees_its_own_log(app):
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['create-company', 'acme'])
+        assert result.exit_code == 0, result.output
+        acme_id = company_id_for('acme')
+        audit.insert_events(db.engine, [
+            spooled_event(occurred_at=datetime(2030, 1, 1, 9), company_id=company_id)
+            for company_id in (1, acme_id, acme_id)])
+        with tenant_scope(acme_id):
+            events, _ = audit.audit_page(action='test.event')
+            assert len(events) == 2
+        with tenant_scope(company_id_for('main')):
+            events, _ = audit.audit_page(action='test.event')
+            assert len(events) == 1
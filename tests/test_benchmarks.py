@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+import io
+from urllib.parse import urlsplit
+
+from app import db
+from benchmarks import bench_routes, bench_startup, load_test
+from tests.conftest import login
+
+
+def test_every_bench_route_scenario_succeeds(app):
+    with app.app_context():
+        scenarios = bench_routes.build_scenarios()
+    names = {s.name for s in scenarios}
+    assert {'process_all_salaries', 'download_payslip', 'payroll_simulation'} <= names
+    for scenario in scenarios:
+        result = bench_routes.run_scenario(app, scenario, iterations=1, warmup=0)
+        assert result['errors'] == 0, scenario.name
+
+
+def test_load_mix_covers_the_heavy_finance_routes(app):
+    with app.app_context():
+        bench_names = {s.name for s in bench_routes.build_scenarios()}
+    load_names = {name for mix in load_test.ROLE_MIX.values() for name, _, _ in mix}
+    assert {'process_all_salaries', 'download_payslip'} <= load_names
+    assert load_names <= bench_names
+
+
+class ClientOpener:
+    """The urllib opener interface, answered by the Flask test client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @contextmanager
+    def open(self, url, data=None, timeout=None):
+        response = self.client.get(urlsplit(url).path)
+        yield io.BytesIO(response.data)
+
+
+def test_route_mix_fills_in_the_workers_own_payslip(client):
+    login(client, 'employee')
+    mix = load_test.route_mix(ClientOpener(client), 'http://localhost', 'employee')
+    paths = dict((name, path) for name, path, _ in mix)
+    assert paths['download_payslip'].startswith('/download-payslip/')
+    assert client.get(paths['download_payslip']).status_code == 200
+
+
+def test_route_mix_drops_routes_it_cannot_fill(app, client):
+    from app.models import PayrollRecord
+    with app.app_context():
+        PayrollRecord.query.delete()
+        db.session.commit()
+    login(client, 'employee')
+    mix = load_test.route_mix(ClientOpener(client), 'http://localhost', 'employee')
+    assert 'download_payslip' not in {name for name, _, _ in mix}
+    assert 'my_payslips' in {name for name, _, _ in mix}
+
+
+def test_startup_loads_no_heavy_modules():
+    assert bench_startup.sample()['heavy'] == []
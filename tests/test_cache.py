@@ -0,0 +1,80 @@
+import gzip
+
+from sqlalchemy import update
+
+from app import db
+from app.cache import fingerprinted_filename
+from app.models import Client, DataVersion
+from app.tenancy import company_id_for, tenant_scope
+from tests.conftest import login
+
+
+def client_version():
+    stamp = db.session.get(DataVersion, 'client@1')
+    return stamp.version if stamp else 0
+
+
+def test_orm_update_statement_bumps_the_version(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        before = client_version()
+        db.session.execute(update(Client).where(Client.id == 1).values(status='Inactive'))
+        db.session.commit()
+        assert client_version() == before + 1
+
+
+def test_legacy_query_update_and_delete_bump_once_each(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        before = client_version()
+        Client.query.filter_by(id=1).update({'status': 'Inactive'})
+        db.session.commit()
+        assert client_version() == before + 1
+        Client.query.filter_by(id=2).delete()
+        db.session.commit()
+        assert client_version() == before + 2
+
+
+def test_untracked_tables_get_no_stamp(app):
+    from app.models import Attendance
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        Attendance.query.filter_by(id=1).update({'check_out': None})
+        db.session.commit()
+        assert db.session.get(DataVersion, 'attendance@1') is None
+
+
+def test_bulk_update_invalidates_cached_fragment(app, client):
+    login(client, 'owner')
+    with app.app_context():
+        name = db.session.get(Client, 1).company_name
+    assert name in client.get('/clients').get_data(as_text=True)
+
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        db.session.execute(update(Client).where(Client.id == 1)
+                           .values(company_name='Renamed Holdings'))
+        db.session.commit()
+    page = client.get('/clients').get_data(as_text=True)
+    assert 'Renamed Holdings' in page
+    assert name not in page
+
+
+def test_orm_write_invalidates_cached_fragment(app, client):
+    login(client, 'owner')
+    client.get('/clients')
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        db.session.get(Client, 1).company_name = 'Flushed Holdings'
+        db.session.commit()
+    assert 'Flushed Holdings' in client.get('/clients').get_data(as_text=True)
+
+
+def test_fingerprinted_filename_follows_content():
+    first = fingerprinted_filename('logo.png', b'one')
+    assert first.startswith('logo-') and first.endswith('.png')
+    assert first == fingerprinted_filename('logo.png', b'one')
+    assert first != fingerprinted_filename('logo.png', b'two')
+
+
+def test_html_is_gzipped_when_accepted(client):
+    login(client, 'owner')
+    response = client.get('/dashboard', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'</html>' in gzip.decompress(response.data)
+    assert 'Content-Encoding' not in client.get('/dashboard').headers
@@ -0,0 +1,112 @@
+from datetime import date
+import time
+
+from app import db, events
+from app.events import EventBus, format_event
+from app.models import Employee
+from tests.conftest import account_id, login
+
+
+def drain(subscription):
+    received = []
+    while not subscription.queue.empty():
+        received.append(subscription.queue.get_nowait())
+    return received
+
+
+def test_events_reach_only_their_company_and_audience():
+    bus = EventBus()
+    hr = bus.subscribe('HR Team', 1, company_id=1)
+    other_company = bus.subscribe('HR Team', 2, company_id=2)
+    employee = bus.subscribe('Employee', 3, company_id=1)
+    addressed = bus.subscribe('Employee', 4, company_id=1)
+
+    bus.publish('leave.requested', {'id': 1}, roles=events.HR_ROLES, user_ids=[4], company_id=1)
+
+    assert [e.type for e in drain(hr)] == ['leave.requested']
+    assert drain(other_company) == []
+    assert drain(employee) == []
+    assert [e.data for e in drain(addressed)] == [{'id': 1}]
+
+
+def test_reconnect_replays_missed_events():
+    bus = EventBus()
+    first = bus.publish('user.registered', {'id': 1}, roles=['HR Team'])
+    bus.publish('user.registered', {'id': 2}, roles=['HR Team'])
+
+    subscription = bus.subscribe('HR Team', 1, last_event_id=first.id)
+
+    assert [e.data['id'] for e in drain(subscription)] == [2]
+
+
+def test_ids_keep_increasing_across_restarts():
+    before = EventBus().publish('user.registered', {}, roles=['HR Team'])
+    time.sleep(0.002)
+    restarted = EventBus()
+    after = restarted.publish('user.registered', {}, roles=['HR Team'])
+
+    # A browser still holding the old id is sent what the new process has
+    assert after.id > before.id
+    subscription = restarted.subscribe('HR Team', 1, last_event_id=before.id)
+    assert [e.id for e in drain(subscription)] == [after.id]
+
+
+def test_slow_subscriber_overflows_instead_of_blocking():
+    bus = EventBus(queue_size=2)
+    subscription = bus.subscribe('HR Team', 1)
+    for i in range(3):
+        bus.publish('user.registered', {'id': i}, roles=['HR Team'])
+
+    assert subscription.overflowed
+    frames = list(events.stream(subscription, heartbeat=0.01, lifetime=1))
+    assert frames[0].startswith('retry:')
+    assert len(frames) == 1
+
+
+def test_format_event():
+    event = EventBus().publish('leave.decided', {'id': 7, 'status': 'Approved'})
+    assert format_event(event) == (
+        f'id: {event.id}\nevent: leave.decided\ndata: {{"id": 7, "status": "Approved"}}\n\n')
+
+
+def test_stream_unsubscribes_when_the_body_is_never_read(client):
+    login(client, 'hr')
+    subscribers = set(events.bus._subscribers)
+
+    # A HEAD response never iterates the body
+    response = client.head('/events/stream')
+    assert response.mimetype == 'text/event-stream'
+    response.close()
+
+    assert events.bus._subscribers == subscribers
+
+
+def test_manager_is_not_sent_their_own_leave_request(app, client):
+    manager_id = account_id(app, 'manager')
+    with app.app_context():
+        boss_id = db.session.get(Employee, manager_id).manager_id
+    manager = events.bus.subscribe('Manager', manager_id, company_id=1)
+    boss = events.bus.subscribe('Manager', boss_id, company_id=1)
+    hr = events.bus.subscribe('HR Team', account_id(app, 'hr'), company_id=1)
+    try:
+        login(client, 'manager')
+        client.post('/apply-leave', data={'leave_type': 'Annual', 'start_date': date(2030, 1, 7),
+                                          'end_date': date(2030, 1, 9)})
+        assert drain(manager) == []
+        assert [e.type for e in drain(hr)] == ['leave.requested']
+        if boss_id:
+            assert [e.type for e in drain(boss)] == ['leave.requested']
+    finally:
+        for subscription in (manager, boss, hr):
+            events.bus.unsubscribe(subscription)
+
+
+def test_employee_is_sent_their_own_leave_request(app, client):
+    employee = events.bus.subscribe('Employee', account_id(app, 'employee'), company_id=1)
+    try:
+        login(client, 'employee')
+        client.post('/apply-leave', data={'leave_type': 'Sick', 'start_date': date(2030, 2, 4),
+                                          'end_date': date(2030, 2, 4)})
+        assert [e.data['leave_type'] for e in drain(employee)] == ['Sick']
+    finally:
+        events.bus.unsubscribe(employee)
@@ -0,0 +1,184 @@
+from datetime import date
+
+from app import db
+from app.hierarchy import manager_loops, pending_approvals, reports_under
+from app.models import Employee, LeaveRequest, ReportingLine
+from app.tenancy import company_id_for, tenant_scope
+from tests.conftest import account_id, login
+
+
+def expected_lines():
+    """The closure table as it should be, walked from manager_id."""
+    managers = dict(db.session.query(Employee.id, Employee.manager_id))
+    lines = set()
+    for employee_id in managers:
+        lines.add((employee_id, employee_id, 0))
+        ancestor, depth = managers[employee_id], 1
+        while ancestor is not None:
+            lines.add((ancestor, employee_id, depth))
+            ancestor, depth = managers[ancestor], depth + 1
+    return lines
+
+
+def stored_lines():
+    return set(db.session.query(ReportingLine.ancestor_id, ReportingLine.descendant_id,
+                                ReportingLine.depth))
+
+
+def add_employee(name, manager=None, role='Employee'):
+    employee = Employee(full_name=name, email=f'{name.lower().replace(" ", ".")}@company.com',
+                        password='x', role=role, department='IT', manager=manager)
+    db.session.add(employee)
+    return employee
+
+
+def test_generated_data_has_a_consistent_closure(app):
+    with app.app_context():
+        assert stored_lines() == expected_lines()
+
+
+def test_moving_someone_moves_their_team(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        top = add_employee('Top One', role='Manager')
+        lead = add_employee('Team Lead', manager=top, role='Manager')
+        member = add_employee('Team Member', manager=lead)
+        other = add_employee('Other Top', role='Manager')
+        db.session.commit()
+        assert [m.id for m, _ in reports_under(top.id)] == [lead.id, member.id]
+
+        lead.manager = other
+        db.session.commit()
+
+        assert reports_under(top.id).count() == 0
+        assert {(m.id, depth) for m, depth in reports_under(other.id)} == {
+            (lead.id, 1), (member.id, 2)}
+        assert stored_lines() == expected_lines()
+
+
+def test_deleting_a_manager_moves_their_reports_up(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        top = add_employee('Top One', role='Manager')
+        lead = add_employee('Team Lead', manager=top, role='Manager')
+        reports = [add_employee(f'Member {i}', manager=lead) for i in range(2)]
+        db.session.commit()
+
+        db.session.delete(lead)
+        db.session.commit()
+
+        assert {r.manager_id for r in reports} == {top.id}
+        assert stored_lines() == expected_lines()
+
+
+def test_set_manager_refuses_a_cycle(app, client):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        lead = add_employee('Team Lead', role='Manager')
+        member = add_employee('Team Member', manager=lead)
+        db.session.commit()
+        lead_id, member_email = lead.id, member.email
+
+    login(client, 'hr')
+    response = client.post(f'/employee/{lead_id}/manager', data={'manager_email': member_email},
+                           follow_redirects=True)
+
+    assert b'own team' in response.data
+    with app.app_context():
+        assert db.session.get(Employee, lead_id).manager_id is None
+        assert stored_lines() == expected_lines()
+
+
+def test_set_manager_reports_a_cycle_it_missed(app, client, monkeypatch):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        lead = add_employee('Team Lead', role='Manager')
+        member = add_employee('Team Member', manager=lead)
+        db.session.commit()
+        lead_id, member_email = lead.id, member.email
+    # As if the team changed between the check and the commit
+    monkeypatch.setattr('app.views.admin.would_create_cycle', lambda *ids: False)
+
+    login(client, 'hr')
+    response = client.post(f'/employee/{lead_id}/manager', data={'manager_email': member_email},
+                           follow_redirects=True)
+
+    assert response.status_code == 200 and b'own team' in response.data
+    with app.app_context():
+        assert db.session.get(Employee, lead_id).manager_id is None
+        assert stored_lines() == expected_lines()
+
+
+def test_set_manager_moves_the_reporting_line(app, client):
+    employee_id = account_id(app, 'employee')
+    login(client, 'hr')
+    client.post(f'/employee/{employee_id}/manager', data={'manager_email': 'owner@company.com'})
+
+    with app.app_context():
+        assert db.session.get(Employee, employee_id).manager_id == account_id(app, 'owner')
+        assert stored_lines() == expected_lines()
+
+
+def test_rebuild_hierarchy_restores_the_table(app):
+    with app.app_context():
+        db.session.query(ReportingLine).delete()
+        db.session.commit()
+        result = app.test_cli_runner().invoke(args=['rebuild-hierarchy'])
+        assert result.exit_code == 0, result.output
+        assert stored_lines() == expected_lines()
+
+
+def test_rebuild_hierarchy_refuses_a_loop(app):
+    lead_id, member_id = account_id(app, 'manager'), account_id(app, 'employee')
+    with app.app_context():
+        before = stored_lines()
+        db.session.execute(db.text('UPDATE employee SET manager_id = :m WHERE id = :e'),
+                           [{'e': lead_id, 'm': member_id}, {'e': member_id, 'm': lead_id}])
+        db.session.commit()
+        assert manager_loops(db.session.connection()) == sorted([lead_id, member_id])
+
+        result = app.test_cli_runner().invoke(args=['rebuild-hierarchy'])
+        assert result.exit_code != 0
+        assert f'loops through employee(s) {min(lead_id, member_id)}' in result.output
+        assert stored_lines() == before
+
+
+def test_managers_only_approve_their_own_team(app, client):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        manager = db.session.get(Employee, account_id(app, 'manager'))
+        mine = add_employee('Team Member', manager=manager)
+        outsider = add_employee('Outsider')
+        db.session.flush()
+        leaves = [LeaveRequest(employee_id=e.id, leave_type='Annual', status='Pending',
+                               start_date=date(2030, 3, 4), end_date=date(2030, 3, 5))
+                  for e in (mine, outsider)]
+        db.session.add_all(leaves)
+        db.session.commit()
+        mine_leave, outsider_leave = (leave.id for leave in leaves)
+        queue = {leave.id for leave in pending_approvals(manager)}
+        assert mine_leave in queue and outsider_leave not in queue
+
+    login(client, 'manager')
+    assert client.get(f'/leave/reject/{outsider_leave}').status_code == 403
+    assert client.get(f'/leave/approve/{mine_leave}').status_code == 302
+    with app.app_context():
+        assert db.session.get(LeaveRequest, mine_leave).status == 'Approved'
+        assert db.session.get(LeaveRequest, outsider_leave).status == 'Pending'
+
+
+def test_org_api_pages_the_team_and_hides_others(app, client):
+    manager_id = account_id(app, 'manager')
+    with app.app_context():
+        team = reports_under(manager_id).count()
+        assert team > 0
+
+    login(client, 'manager')
+    data = client.get(f'/api/org/{manager_id}/reports', query_string={'per_page': 5}).get_json()
+    assert data['total'] == team
+    assert [r['depth'] for r in data['reports']] == sorted(r['depth'] for r in data['reports'])
+    chain = client.get(f'/api/org/{manager_id}/chain').get_json()['chain']
+    with app.app_context():
+        assert [m['id'] for m in chain] == [
+            line.ancestor_id for line in ReportingLine.query.filter(
+                ReportingLine.descendant_id == manager_id, ReportingLine.depth > 0)
+            .order_by(ReportingLine.depth)]
+
+    client.get('/logout')
+    login(client, 'employee')
+    assert client.get(f'/api/org/{manager_id}/reports').status_code == 403
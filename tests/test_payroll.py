@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func
+
+from app import db
+from app.models import Employee, PayrollRecord, Position
+from app.payroll import monthly_cents_column, monthly_pay, register_summary, run_payroll
+from app.tenancy import company_id_for, tenant_scope
+from tests.conftest import login
+
+# Salaries whose monthly share sits on or near a half cent
+SALARIES = ['0.06', '100.06', '1000.18', '45000.00', '52345.67', '99999.99', '123456.78']
+
+
+@pytest.mark.parametrize('salary, expected', [
+    ('0.06', '0.01'),        # 0.005 rounds up, not to even
+    ('0.18', '0.02'),        # 0.015
+    ('100.06', '8.34'),
+    ('45000', '3750.00'),
+    (None, '0.00'),
+])
+def test_monthly_pay_rounds_half_up(salary, expected):
+    assert monthly_pay(salary) == Decimal(expected)
+
+
+def test_database_rounding_matches_monthly_pay(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        for i, salary in enumerate(SALARIES):
+            db.session.add(Position(title=f'Rounding {i}', department='IT',
+                                    base_salary=float(salary)))
+        db.session.commit()
+        rows = db.session.query(Position.base_salary, monthly_cents_column())\
+            .filter(Position.title.like('Rounding %')).all()
+    assert len(rows) == len(SALARIES)
+    for salary, cents in rows:
+        assert Decimal(cents) / 100 == monthly_pay(salary)
+
+
+def test_register_total_equals_the_run(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        summary = register_summary()
+        count, total = run_payroll('Test Month 2099')
+        db.session.commit()
+        written = db.session.query(func.count(PayrollRecord.id), func.sum(PayrollRecord.amount_paid))\
+            .filter_by(month_year='Test Month 2099').one()
+    assert count == summary['headcount'] == written[0]
+    assert total == summary['monthly_payout'] == Decimal(str(written[1])).quantize(Decimal('0.01'))
+    assert sum(d['monthly_payout'] for d in summary['departments']) == total
+
+
+def test_register_follows_salary_changes(app):
+    # Version stamps are read once per app context, as once per request
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        before = register_summary()['monthly_payout']
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        employee = Employee.query.filter_by(email='employee@company.com').one()
+        raised = Position(title='Raised', department=employee.department,
+                          base_salary=employee.job_position.base_salary + 1200)
+        db.session.add(raised)
+        db.session.flush()
+        employee.position_id = raised.id
+        db.session.commit()
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        assert register_summary()['monthly_payout'] == before + 100
+
+
+def test_payroll_page_shows_register_total(app, client):
+    login(client, 'finance')
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        total = register_summary()['monthly_payout']
+    assert f'{total:,.2f}' in client.get('/payroll').get_data(as_text=True)
+
+
+def test_payroll_run_refuses_the_same_month_twice(app, client):
+    login(client, 'finance')
+    client.post('/finance/process-payroll')
+    with app.app_context():
+        count = PayrollRecord.query.count()
+    response = client.post('/finance/process-payroll', follow_redirects=True)
+    assert b'already been processed' in response.data
+    with app.app_context():
+        assert PayrollRecord.query.count() == count
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import PayrollRecord
+from tests.conftest import account_id, login
+
+
+def test_history_is_paged_newest_first(app, client):
+    login(client, 'employee')
+    data = client.get('/api/my-payslips?per_page=5').get_json()
+    with app.app_context():
+        total = PayrollRecord.query.filter_by(employee_id=account_id(app, 'employee')).count()
+    assert data['total'] == total and total > 5
+    assert len(data['payslips']) == 5
+    dates = [p['date_processed'] for p in data['payslips']]
+    assert dates == sorted(dates, reverse=True)
+
+    second = client.get('/api/my-payslips?per_page=5&page=2').get_json()
+    assert not {p['id'] for p in second['payslips']} & {p['id'] for p in data['payslips']}
+
+
+def test_year_filter_and_totals(app, client):
+    employee_id = account_id(app, 'employee')
+    with app.app_context():
+        db.session.add(PayrollRecord(employee_id=employee_id, amount_paid=10, company_id=1,
+                                     month_year='January 2001',
+                                     date_processed=datetime(2001, 1, 28)))
+        db.session.commit()
+    login(client, 'employee')
+    data = client.get('/api/my-payslips?year=2001').get_json()
+    assert [p['month_year'] for p in data['payslips']] == ['January 2001']
+    years = {y['year']: y for y in data['years']}
+    assert years[2001] == {'year': 2001, 'payslips': 1, 'total': '10.00'}
+
+
+def test_employees_only_see_their_own_payslips(app, client):
+    with app.app_context():
+        others = PayrollRecord.query.filter(
+            PayrollRecord.employee_id != account_id(app, 'employee')).first().id
+    login(client, 'employee')
+    ids = {p['id'] for p in client.get('/api/my-payslips?per_page=100').get_json()['payslips']}
+    assert others not in ids
+    assert client.get(f'/download-payslip/{others}').status_code == 403
+
+
+def test_payslip_page_renders(client):
+    login(client, 'employee')
+    response = client.get('/my-payslips')
+    assert response.status_code == 200
+    assert b'/download-payslip/' in response.data
+
+
+@pytest.mark.parametrize('year', [0, -1, 9999, 99999])
+def test_out_of_range_years_are_rejected(client, year):
+    login(client, 'employee')
+    assert client.get(f'/my-payslips?year={year}').status_code == 400
+    assert client.get(f'/api/my-payslips?year={year}').status_code == 400
+    assert client.get(f'/my-payslips/tax-summary/{year}').status_code == 404
+
+
+def test_tax_summary_for_a_year_without_payslips(client):
+    login(client, 'employee')
+    assert client.get('/my-payslips/tax-summary/1').status_code == 404
+    assert client.get('/my-payslips/tax-summary/9998').status_code == 404
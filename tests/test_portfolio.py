@@ -0,0 +1,83 @@
+import re
+
+from app import db
+from app.models import Client, Employee
+from app.portfolio import _plan_moves, account_managers, rebalance, workload
+from app.tenancy import company_id_for, tenant_scope
+from tests.conftest import login
+
+
+def listed(client, manager_id):
+    """The active client count /clients shows for one manager."""
+    page = client.get('/clients', query_string={'manager': manager_id, 'status': 'Active'})\
+        .get_data(as_text=True)
+    return int(re.search(r'(\d+) client\(s\) for this manager', page).group(1))
+
+
+def pile_onto_first_manager(app):
+    """Give every active client to one manager; returns (that id, another manager's id)."""
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        managers = [m.id for m in account_managers()]
+        assert len(managers) > 1
+        for c in Client.query.filter_by(status='Active'):
+            c.assigned_manager_id = managers[0]
+        db.session.commit()
+    return managers[0], managers[1]
+
+
+def test_plan_moves_evens_out_with_fewest_moves():
+    loads = {1: [10, 11, 12, 13], 2: [], 3: [14]}
+    moves = _plan_moves(loads, [15])
+
+    owner = {c: m for m, ids in loads.items() for c in ids}
+    owner.update(dict(moves))
+    assert len(moves) == 3
+    assert sorted(list(owner.values()).count(m) for m in loads) == [2, 2, 2]
+
+
+def test_rebalance_shows_on_the_cached_client_list(app, client):
+    busy, idle = pile_onto_first_manager(app)
+    login(client, 'owner')
+    # Renders and caches the fragment for the idle manager
+    assert listed(client, idle) == 0
+
+    client.post('/clients/rebalance')
+
+    # The bulk UPDATE moved clients without a flush; the page must not be stale
+    assert listed(client, idle) > 0
+    with app.app_context():
+        assert listed(client, busy) == Client.query.filter_by(
+            assigned_manager_id=busy, status='Active').count()
+
+
+def test_rebalance_evens_out_active_clients(app):
+    pile_onto_first_manager(app)
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        assert rebalance(dry_run=True)
+        assert Client.query.filter_by(status='Active', assigned_manager_id=None).count() == 0
+        moves = rebalance()
+        active = [n for _, n, _ in workload()['managers']]
+        assert moves and max(active) - min(active) <= 1
+        assert rebalance() == []
+
+
+def test_workload_counts_every_client(app):
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        data = workload()
+        assigned = sum(total for _, _, total in data['managers'])
+        assert assigned + data['unassigned'] == Client.query.count()
+        assert sum(d['total'] for d in data['departments']) == assigned
+
+
+def test_clients_can_only_go_to_active_managers(app, client):
+    with app.app_context():
+        client_id = Client.query.first().id
+    login(client, 'owner')
+
+    response = client.post(f'/clients/{client_id}/assign',
+                           data={'manager_email': 'employee@company.com'}, follow_redirects=True)
+    assert b'not an active Manager' in response.data
+    client.post(f'/clients/{client_id}/assign', data={'manager_email': 'manager@company.com'})
+    with app.app_context():
+        manager = Employee.query.filter_by(email='manager@company.com').one()
+        assert db.session.get(Client, client_id).assigned_manager_id == manager.id
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+import sqlite3
+
+import pytest
+
+from tests.conftest import login
+
+
+@pytest.fixture
+def replica(make_app, tmp_path):
+    """An app whose replica is a synced copy of the primary; returns (app, replica path)."""
+    path = str(tmp_path / 'replica.db')
+    app = make_app(SQLALCHEMY_BINDS={'replica': f'sqlite:///{path}'}, REPLICA_CHECK_INTERVAL=0)
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['replica-sync'])
+    assert result.exit_code == 0, result.output
+    return app, path
+
+
+def on_replica(path, sql, *params):
+    with sqlite3.connect(path) as conn:
+        conn.execute(sql, params)
+
+
+def client_names(client):
+    return client.get('/clients').get_data(as_text=True)
+
+
+def test_marked_pages_read_from_the_replica(replica):
+    app, path = replica
+    on_replica(path, "UPDATE client SET company_name = 'Replica Only Ltd' WHERE id = 1")
+    client = app.test_client()
+    login(client, 'owner')
+    assert 'Replica Only Ltd' in client_names(client)
+
+
+def test_writes_go_to_primary_and_stick(replica):
+    app, path = replica
+    on_replica(path, "UPDATE client SET company_name = 'Replica Only Ltd' WHERE id = 1")
+    client = app.test_client()
+    login(client, 'owner')
+    response = client.post('/settings', data={'company_name': 'Written Corp'})
+    assert response.status_code == 302
+    # The owner now reads their own write from the primary
+    assert 'Replica Only Ltd' not in client_names(client)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT company_name FROM company_settings').fetchone()[0] \
+            != 'Written Corp'
+
+
+def test_lagging_replica_is_skipped(replica):
+    app, path = replica
+    on_replica(path, "UPDATE client SET company_name = 'Replica Only Ltd' WHERE id = 1")
+    on_replica(path, 'UPDATE replica_heartbeat SET beat_at = ?',
+               (datetime.utcnow() - timedelta(hours=1)).isoformat(sep=' '))
+    client = app.test_client()
+    login(client, 'owner')
+    assert 'Replica Only Ltd' not in client_names(client)
+
+
+def test_unreachable_replica_falls_back_to_primary(make_app, tmp_path):
+    app = make_app(SQLALCHEMY_BINDS={'replica': f'sqlite:///{tmp_path}/missing/replica.db'},
+                   REPLICA_CHECK_INTERVAL=0)
+    client = app.test_client()
+    login(client, 'owner')
+    assert client.get('/clients').status_code == 200
+
+
+def test_unmarked_routes_ignore_the_replica(replica):
+    app, path = replica
+    on_replica(path, "UPDATE employee SET full_name = 'Replica Person' "
+                     "WHERE email = 'owner@company.com'")
+    client = app.test_client()
+    login(client, 'owner')
+    assert b'Replica Person' not in client.get('/profile').data
@@ -0,0 +1,116 @@
+import random
+import statistics
+import time
+
+from app import db
+from app.models import Client, Employee
+from app.search import INDEX_TABLE, search
+from app.tenancy import company_id_for, tenant_scope
+from benchmarks.generate_data import FIRST_NAMES, LAST_NAMES
+from tests.conftest import login
+
+# Typeahead budget per query, median of several runs
+LATENCY_TARGET_MS = 20
+
+
+def suggest(client, q, **params):
+    return client.get('/search/suggest', query_string={'q': q, **params}).get_json()['results']
+
+
+def test_title_match_beats_many_weaker_matches(app, client):
+    # More weak (email) matches than any candidate cap, inserted before the
+    # one title match, so rowid order alone would never reach it
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        db.session.add_all(Client(company_name=f'Filler {i}', email=f'zephyr{i}@example.com',
+                                  status='Active') for i in range(400))
+        db.session.add(Client(company_name='Zephyr Holdings', email='hq@holdings.example.com',
+                              status='Active'))
+        db.session.commit()
+    login(client, 'owner')
+    results = suggest(client, 'zep', limit=5)
+    assert results[0]['title'] == 'Zephyr Holdings'
+    assert len(results) == 5
+
+
+def test_every_word_is_a_prefix(app, client):
+    login(client, 'owner')
+    titles = [r['title'] for r in suggest(client, 'bench own')]
+    assert titles == ['Bench Owner']
+    assert suggest(client, 'bench nobody') == []
+
+
+def test_index_follows_writes(app, client):
+    login(client, 'owner')
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        employee = Employee.query.filter_by(email='employee@company.com').one()
+        employee.full_name = 'Quillon Marsh'
+        db.session.commit()
+    assert [r['title'] for r in suggest(client, 'quill')] == ['Quillon Marsh']
+    assert suggest(client, 'bench empl') == []
+
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        db.session.delete(Client.query.first())
+        db.session.commit()
+        remaining = Client.query.count()
+        assert len(search('client', ['client'], limit=100)) == remaining
+
+
+def test_employees_cannot_find_clients_or_positions(client):
+    login(client, 'employee')
+    kinds = {r['kind'] for r in suggest(client, 'a', limit=25) + suggest(client, 'client')}
+    assert kinds <= {'employee'}
+
+
+def test_reindex_rebuilds_from_scratch(app):
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM search_index'))
+        db.session.commit()
+        result = app.test_cli_runner().invoke(args=['search-reindex'])
+        assert result.exit_code == 0
+        with tenant_scope(company_id_for('main')):
+            assert search('bench owner', ['employee'])[0]['title'] == 'Bench Owner'
+
+
+def test_suggest_limit_is_clamped(client):
+    login(client, 'owner')
+    assert len(suggest(client, 'company', limit=100)) == 25
+    assert len(suggest(client, 'company', limit=0)) == 1
+    assert len(suggest(client, 'company', limit=-1)) == 1
+
+
+def test_other_companies_rows_never_match(app):
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['create-company', 'acme'])
+        assert result.exit_code == 0, result.output
+        with tenant_scope(company_id_for('acme')):
+            db.session.add(Client(company_name='Acme Bench Supplies', email='hq@acme.example'))
+            db.session.commit()
+            assert [r['title'] for r in search('bench', ['employee', 'client'])] == [
+                'Acme Bench Supplies']
+        with tenant_scope(company_id_for('main')):
+            titles = [r['title'] for r in search('bench', ['employee', 'client'], limit=25)]
+            assert titles and 'Acme Bench Supplies' not in titles
+
+
+def test_short_prefixes_stay_fast_on_a_large_index(app):
+    # 120k documents: two-letter prefixes match tens of thousands of them
+    rng = random.Random(31)
+    departments = ['Finance', 'IT', 'HR', 'Executive', 'Sales', 'Customer Success', 'Operations']
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(
+                f'INSERT INTO {INDEX_TABLE} (kind, ref_id, company_id, title, subtitle, detail) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [('employee' if i % 3 else 'client', 100000 + i, 'c1',
+                  f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                  f'user{i}@company.com', rng.choice(departments)) for i in range(120000)])
+            conn.exec_driver_sql(f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}) VALUES ('optimize')")
+        for query in ['co', 'us', 'ma', 'jo', 'smi', 'john sm']:
+            search(query, ['employee', 'client'])
+            timings = []
+            for _ in range(5):
+                started = time.perf_counter()
+                results = search(query, ['employee', 'client'])
+                timings.append((time.perf_counter() - started) * 1000)
+            assert results
+            assert statistics.median(timings) < LATENCY_TARGET_MS, (query, timings)
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+import pytest
+
+from app.payroll import register_summary
+from tests.conftest import login
+
+pytest.importorskip('numpy')
+
+
+def simulate(client, *adjustments, scenarios=None):
+    if scenarios is None:
+        scenarios = [{'name': 'test', 'adjustments': list(adjustments)}]
+    return client.post('/finance/simulate', json={'scenarios': scenarios})
+
+
+@pytest.fixture
+def finance(client):
+    login(client, 'finance')
+    return client
+
+
+@pytest.fixture
+def department(finance):
+    return finance.get('/finance/simulate').get_json()['rows'][0]['department']
+
+
+def test_baseline_matches_the_register(app, finance):
+    result = simulate(finance).get_json()
+    with app.app_context():
+        register = register_summary()
+    baseline = result['baseline']
+    assert baseline['headcount'] == register['headcount']
+    assert Decimal(baseline['monthly_payout']) == register['monthly_payout']
+    assert result['scenarios'][0]['monthly_change'] == '0.00'
+
+
+def test_raise_and_hires_change_the_payout(finance, department):
+    flat = simulate(finance).get_json()['scenarios'][0]
+    raised = simulate(finance, {'department': department, 'raise_pct': 10},
+                      {'department': department, 'add_headcount': 1}).get_json()['scenarios'][0]
+    assert raised['headcount'] > flat['headcount']
+    assert Decimal(raised['monthly_change']) > 0
+
+
+@pytest.mark.parametrize('adjustment', [
+    {'raise_pct': float('nan')},
+    {'raise_pct': float('inf')},
+    {'raise_pct': 1e20},
+    {'raise_pct': -1001},
+    {'raise_pct': True},
+    {'raise_pct': '5'},
+    {'raise_amount': 1e30},
+    {'raise_amount': float('-inf')},
+    {'add_headcount': 1e13},
+    {'add_headcount': 1.5},
+    {'add_headcount': float('nan')},
+    {'department': ['IT'], 'raise_pct': 5},
+    {'position': {'title': 'x'}, 'raise_pct': 5},
+    {'position_id': '1', 'raise_pct': 5},
+    {'position_id': 1.5, 'raise_pct': 5},
+    {'colour': 'red', 'raise_pct': 5},
+    {'department': 'IT'},
+])
+def test_bad_adjustments_are_rejected(finance, adjustment):
+    response = simulate(finance, adjustment)
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_repeated_raises_cannot_overflow(finance, department):
+    # Each raise is in bounds; together they would wrap int64
+    response = simulate(finance, *[{'department': department, 'raise_pct': 1000}] * 20)
+    assert response.status_code == 400
+    response = simulate(finance, *[{'add_headcount': 1_000_000}] * 20)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('scenarios', [None, [], {'adjustments': []}, ['x'],
+                                       [{'adjustments': 'x'}], [{'adjustments': ['x']}]])
+def test_malformed_scenarios_are_rejected(finance, scenarios):
+    response = finance.post('/finance/simulate', json={'scenarios': scenarios})
+    assert response.status_code == 400
+
+
+def test_unknown_department_is_rejected(finance):
+    response = simulate(finance, {'department': 'Nowhere', 'raise_pct': 5})
+    assert response.status_code == 400
+    assert 'Nowhere' in response.get_json()['error']
+
+
+def test_simulation_is_finance_only(client):
+    login(client, 'employee')
+    assert simulate(client).status_code in (302, 403)
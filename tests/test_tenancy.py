@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from app import bcrypt, db
+from app.archive import archive_attendance, attendance_history, refresh_attendance_view
+from app.models import Attendance, Client, Employee
+from app.tenancy import company_id_for, tenant_scope
+from benchmarks.generate_data import BENCH_PASSWORD
+from tests.conftest import account_id, login
+
+ACME = {'X-Company': 'acme'}
+
+
+def add_acme(app):
+    """A second company with one HR user whose email is also used in 'main'."""
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['create-company', 'acme'])
+        assert result.exit_code == 0, result.output
+        company_id = company_id_for('acme')
+        with tenant_scope(company_id):
+            db.session.add(Employee(full_name='Acme Person', email='acme@acme.example',
+                                    password=bcrypt.generate_password_hash(BENCH_PASSWORD).decode(),
+                                    role='HR Team', department='HR'))
+            db.session.add(Client(company_name='Acme Client', email='hq@acme.example'))
+            db.session.commit()
+    return company_id
+
+
+def acme_login(client, email='acme@acme.example'):
+    return client.post('/login', data={'email': email, 'password': BENCH_PASSWORD},
+                       headers=ACME)
+
+
+def test_queries_only_see_the_current_company(app):
+    acme_id = add_acme(app)
+    with app.app_context():
+        with tenant_scope(acme_id):
+            assert [e.full_name for e in Employee.query] == ['Acme Person']
+            assert [c.company_name for c in Client.query] == ['Acme Client']
+        with tenant_scope(company_id_for('main')):
+            assert Employee.query.filter_by(email='acme@acme.example').first() is None
+            assert Employee.query.count() > 1
+
+
+def test_a_session_does_not_carry_over_to_another_company(app, client):
+    add_acme(app)
+    login(client, 'hr')
+    assert client.get('/admin/records').status_code == 200
+    # Same cookie, other company: the user is not found there
+    assert client.get('/admin/records', headers=ACME).status_code == 302
+    assert client.get('/admin/records', headers={'X-Company': 'nobody'}).status_code == 404
+
+
+def test_emails_are_unique_per_company(app, client):
+    acme_id = add_acme(app)
+    acme_login(client)
+    # Another company's address is free to use here
+    response = client.post('/profile', headers=ACME,
+                           data={'full_name': 'Acme Person', 'email': 'hr@company.com'})
+    assert response.status_code == 302
+    with app.app_context(), tenant_scope(acme_id):
+        assert Employee.query.one().email == 'hr@company.com'
+
+    client.get('/logout', headers=ACME)
+    login(client, 'hr')
+    # Still taken within the same company
+    client.post('/profile', data={'full_name': 'Bench HR', 'email': 'employee@company.com'})
+    with app.app_context(), tenant_scope(company_id_for('main')):
+        assert Employee.query.filter_by(email='hr@company.com').count() == 1
+
+
+def test_archived_attendance_stays_with_its_company(app):
+    acme_id = add_acme(app)
+    employee_id = account_id(app, 'employee')
+    old = datetime.now() - timedelta(days=200)
+    with app.app_context():
+        db.session.add(Attendance(employee_id=employee_id, check_in=old,
+                                  check_out=old + timedelta(hours=8), company_id=1))
+        db.session.commit()
+        assert archive_attendance(90)
+
+        rows = db.session.execute(db.text(
+            'SELECT company_id, count(*) FROM attendance_all GROUP BY company_id')).all()
+        assert {company_id for company_id, _ in rows} == {1}
+        with tenant_scope(acme_id):
+            assert attendance_history()[0].count() == 0
+        with tenant_scope(1):
+            query, columns = attendance_history(employee_id)
+            assert query.filter(columns.check_in == old).count() == 1
+
+
+def test_old_archive_tables_get_a_company_column(app):
+    employee_id = account_id(app, 'employee')
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('CREATE TABLE attendance_archive_2001_01 (id INTEGER PRIMARY KEY, '
+                                 'check_in DATETIME NOT NULL, check_out DATETIME, '
+                                 'employee_id INTEGER NOT NULL)')
+            conn.exec_driver_sql('INSERT INTO attendance_archive_2001_01 VALUES '
+                                 f"(999999, '2001-01-02 09:00:00', '2001-01-02 17:00:00', {employee_id})")
+            refresh_attendance_view(conn)
+        with tenant_scope(1):
+            query, columns = attendance_history(employee_id)
+            assert query.filter(columns.id == 999999).count() == 1